@@ -37,7 +37,12 @@ setup(
         "pyyaml>=6.0",
         "python-dotenv>=1.0.0",
         "tqdm>=4.66.0",
+        "numpy>=1.24.0",
     ],
+    extras_require={
+        # 关键词较多时使用Aho-Corasick自动机匹配
+        "fast-match": ["pyahocorasick>=2.0.0"],
+    },
     entry_points={
         "console_scripts": [
             "smart-tidy=src.cli.main:app",
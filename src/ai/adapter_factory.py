@@ -6,6 +6,7 @@ from .claude_adapter import ClaudeAdapter
 from .openai_adapter import OpenAIAdapter
 from .local_adapter import LocalLLMAdapter
 from .custom_adapter import CustomAPIAdapter
+from .rate_limiter import get_provider_guard
 
 
 class AIAdapterFactory:
@@ -36,6 +37,20 @@ class AIAdapterFactory:
         else:
             raise ValueError(f"不支持的AI提供商: {provider}")
     
+    @staticmethod
+    def _pool_kwargs(config: Dict[str, Any]) -> Dict[str, Any]:
+        """提取连接池配置"""
+        return {
+            key: config[key]
+            for key in ('max_connections', 'max_keepalive_connections')
+            if key in config
+        }
+    
+    @staticmethod
+    def _guard_kwargs(provider: str, config: Dict[str, Any]) -> Dict[str, Any]:
+        """获取提供商共享的限流、重试和熔断保护层"""
+        return {'guard': get_provider_guard(provider, config.get('rate_limit'))}
+    
     @staticmethod
     def _create_claude_adapter(config: Dict[str, Any]) -> ClaudeAdapter:
         """创建Claude适配器"""
@@ -47,7 +62,10 @@ class AIAdapterFactory:
             api_key=api_key,
             model=config.get('model', 'claude-3-5-sonnet-20241022'),
             max_tokens=config.get('max_tokens', 4096),
-            temperature=config.get('temperature', 0.7)
+            temperature=config.get('temperature', 0.7),
+            prompt_cache=config.get('prompt_cache', True),
+            **AIAdapterFactory._pool_kwargs(config),
+            **AIAdapterFactory._guard_kwargs('claude', config)
         )
     
     @staticmethod
@@ -61,7 +79,9 @@ class AIAdapterFactory:
             api_key=api_key,
             model=config.get('model', 'gpt-4-turbo-preview'),
             max_tokens=config.get('max_tokens', 4096),
-            temperature=config.get('temperature', 0.7)
+            temperature=config.get('temperature', 0.7),
+            **AIAdapterFactory._pool_kwargs(config),
+            **AIAdapterFactory._guard_kwargs('openai', config)
         )
     
     @staticmethod
@@ -70,7 +90,9 @@ class AIAdapterFactory:
         return LocalLLMAdapter(
             base_url=config.get('base_url', 'http://localhost:11434'),
             model=config.get('model', 'llama3.1'),
-            timeout=config.get('timeout', 120)
+            timeout=config.get('timeout', 120),
+            **AIAdapterFactory._pool_kwargs(config),
+            **AIAdapterFactory._guard_kwargs('local', config)
         )
     
     @staticmethod
@@ -94,5 +116,7 @@ class AIAdapterFactory:
             api_key=api_key,
             model=model,
             max_tokens=config.get('max_tokens', 4096),
-            temperature=config.get('temperature', 0.7)
+            temperature=config.get('temperature', 0.7),
+            **AIAdapterFactory._pool_kwargs(config),
+            **AIAdapterFactory._guard_kwargs('custom', config)
         )
\ No newline at end of file
@@ -1,9 +1,10 @@
 """AI适配器基类"""
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable
 
 from ..models import FileInfo
+from .rate_limiter import estimate_request_tokens
 
 
 class BaseAIAdapter(ABC):
@@ -49,6 +50,22 @@ class BaseAIAdapter(ABC):
         """
         pass
     
+    def _guarded_call(self, func: Callable[..., Any], **request) -> Any:
+        """
+        发起API请求（配置了提供商保护层时经过限流、重试和熔断）
+        
+        Args:
+            func: SDK的请求方法
+            **request: 请求参数
+            
+        Returns:
+            API响应
+        """
+        guard = getattr(self, 'guard', None)
+        if guard is None:
+            return func(**request)
+        return guard.call(func, tokens=estimate_request_tokens(request), **request)
+    
     def _validate_response(self, response: Dict[str, Any]) -> bool:
         """验证AI响应格式"""
         if not isinstance(response, dict):
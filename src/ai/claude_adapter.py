@@ -1,7 +1,7 @@
 """Claude AI适配器"""
 
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
 
 try:
     import anthropic
@@ -11,6 +11,10 @@ except ImportError:
 
 from .base_adapter import BaseAIAdapter
 from .prompt_builder import PromptBuilder
+from .prompt_cache import cacheable_text_block, get_prompt_cache_stats, min_cacheable_tokens
+from .token_budget import TokenCounter
+from .rate_limiter import ProviderGuard
+from .http_pool import build_limits, build_http_client, DEFAULT_MAX_CONNECTIONS, DEFAULT_MAX_KEEPALIVE_CONNECTIONS
 from ..models import FileInfo
 
 
@@ -18,7 +22,11 @@ class ClaudeAdapter(BaseAIAdapter):
     """Claude AI适配器"""
     
     def __init__(self, api_key: str, model: str = "claude-3-5-sonnet-20241022", 
-                 max_tokens: int = 4096, temperature: float = 0.7):
+                 max_tokens: int = 4096, temperature: float = 0.7,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+                 prompt_cache: bool = True,
+                 guard: Optional[ProviderGuard] = None):
         """
         初始化Claude适配器
         
@@ -27,6 +35,10 @@ class ClaudeAdapter(BaseAIAdapter):
             model: 模型名称
             max_tokens: 最大token数
             temperature: 温度参数
+            max_connections: 连接池最大连接数
+            max_keepalive_connections: 连接池最大保活连接数
+            prompt_cache: 是否将系统提示和批次内相同的Prompt前缀标记为可缓存
+            guard: 提供商保护层（限流、重试、熔断），为空时直接调用并使用SDK自带的重试
         """
         if not ANTHROPIC_AVAILABLE:
             raise ImportError("需要安装anthropic库: pip install anthropic")
@@ -34,12 +46,75 @@ class ClaudeAdapter(BaseAIAdapter):
         if not api_key:
             raise ValueError("Claude API Key不能为空")
         
-        self.client = anthropic.Anthropic(api_key=api_key)
+        self.api_key = api_key
+        self._client_kwargs = {"api_key": api_key}
+        if guard is not None:
+            # 重试由保护层统一处理，避免与SDK的重试叠加
+            self._client_kwargs["max_retries"] = 0
+        self.guard = guard
+        self.limits = build_limits(max_connections, max_keepalive_connections)
+        self.client = anthropic.Anthropic(
+            **self._client_kwargs,
+            http_client=build_http_client(anthropic, self.limits)
+        )
         self.model = model
         self.max_tokens = max_tokens
         self.temperature = temperature
+        self.prompt_cache = prompt_cache
         self.prompt_builder = PromptBuilder()
     
+    def _is_cacheable(self, *prefix: str) -> bool:
+        """前缀是否达到模型的最小缓存长度（不足时不设置缓存标记，避免占用断点却不生效）"""
+        return sum(TokenCounter.estimate(text) for text in prefix) >= min_cacheable_tokens(self.model)
+    
+    def _build_request(self, user_content: Union[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """构建API请求参数"""
+        system = self.prompt_builder.SYSTEM_PROMPT
+        if self.prompt_cache and self._is_cacheable(system):
+            system = [cacheable_text_block(system)]
+        
+        return {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "system": system,
+            "messages": [
+                {"role": "user", "content": user_content}
+            ],
+        }
+    
+    def _classification_content(
+        self,
+        files: List[FileInfo],
+        user_request: str,
+        context: Dict[str, Any]
+    ) -> Union[str, List[Dict[str, Any]]]:
+        """构建分类请求的用户消息（同一批次各分块共享的前缀足够长时单独标记为可缓存）"""
+        if not self.prompt_cache:
+            return self.prompt_builder.build_classification_prompt(files, user_request, context)
+        
+        header, body = self.prompt_builder.build_classification_prompt_parts(
+            files, user_request, context
+        )
+        if not self._is_cacheable(self.prompt_builder.SYSTEM_PROMPT, header):
+            return f"{header}\n{body}"
+        return [
+            cacheable_text_block(header),
+            {"type": "text", "text": body},
+        ]
+    
+    def _handle_message(self, response) -> Dict[str, Any]:
+        """解析并验证API响应"""
+        get_prompt_cache_stats().record_anthropic(getattr(response, 'usage', None))
+        
+        response_text = response.content[0].text
+        result = self._parse_response(response_text)
+        
+        if not self._validate_response(result):
+            raise ValueError("AI响应格式不正确")
+        
+        return result
+    
     def generate_classification(
         self,
         files: List[FileInfo],
@@ -48,30 +123,14 @@ class ClaudeAdapter(BaseAIAdapter):
     ) -> Dict[str, Any]:
         """生成文件分类方案"""
         # 构建prompt
-        user_prompt = self.prompt_builder.build_classification_prompt(
-            files, user_request, context
-        )
+        user_content = self._classification_content(files, user_request, context)
         
         try:
             # 调用Claude API
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                system=self.prompt_builder.SYSTEM_PROMPT,
-                messages=[
-                    {"role": "user", "content": user_prompt}
-                ]
+            response = self._guarded_call(
+                self.client.messages.create, **self._build_request(user_content)
             )
-            
-            # 解析响应
-            response_text = response.content[0].text
-            result = self._parse_response(response_text)
-            
-            if not self._validate_response(result):
-                raise ValueError("AI响应格式不正确")
-            
-            return result
+            return self._handle_message(response)
             
         except Exception as e:
             raise RuntimeError(f"Claude API调用失败: {str(e)}")
@@ -89,23 +148,10 @@ class ClaudeAdapter(BaseAIAdapter):
         )
         
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                system=self.prompt_builder.SYSTEM_PROMPT,
-                messages=[
-                    {"role": "user", "content": user_prompt}
-                ]
+            response = self._guarded_call(
+                self.client.messages.create, **self._build_request(user_prompt)
             )
-            
-            response_text = response.content[0].text
-            result = self._parse_response(response_text)
-            
-            if not self._validate_response(result):
-                raise ValueError("AI响应格式不正确")
-            
-            return result
+            return self._handle_message(response)
             
         except Exception as e:
             raise RuntimeError(f"Claude API调用失败: {str(e)}")
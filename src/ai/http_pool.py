@@ -0,0 +1,65 @@
+"""HTTP连接池配置"""
+
+from typing import Any
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+
+# 默认连接池大小
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 10
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+
+def build_limits(
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY
+) -> Any:
+    """
+    构建连接池限制
+
+    Args:
+        max_connections: 最大连接数
+        max_keepalive_connections: 最大保活连接数
+        keepalive_expiry: 保活连接的空闲过期时间（秒）
+
+    Returns:
+        httpx.Limits 对象（未安装httpx时返回 None）
+    """
+    if not HTTPX_AVAILABLE:
+        return None
+
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry
+    )
+
+
+def build_http_client(sdk: Any, limits: Any) -> Any:
+    """
+    构建使用指定连接池限制的HTTP客户端（供SDK的 http_client 参数使用）
+
+    SDK 提供 DefaultHttpxClient 时使用它（保持SDK的默认设置和HTTP库）；
+    较早版本的 anthropic / openai 库没有这个类，此时直接创建 httpx 客户端。
+
+    Args:
+        sdk: anthropic 或 openai 模块
+        limits: build_limits() 返回的连接池限制
+
+    Returns:
+        HTTP客户端（未安装httpx时返回 None，SDK使用自带的客户端）
+    """
+    if not HTTPX_AVAILABLE:
+        return None
+
+    factory = getattr(sdk, 'DefaultHttpxClient', None)
+    if factory is not None:
+        return factory(limits=limits)
+
+    return httpx.Client(limits=limits, follow_redirects=True)
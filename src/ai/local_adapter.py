@@ -2,10 +2,13 @@
 
 import json
 import requests
-from typing import List, Dict, Any
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Any, Optional
 
 from .base_adapter import BaseAIAdapter
 from .prompt_builder import PromptBuilder
+from .rate_limiter import ProviderGuard
+from .http_pool import DEFAULT_MAX_CONNECTIONS, DEFAULT_MAX_KEEPALIVE_CONNECTIONS
 from ..models import FileInfo
 
 
@@ -13,7 +16,10 @@ class LocalLLMAdapter(BaseAIAdapter):
     """本地大模型适配器（支持Ollama等）"""
     
     def __init__(self, base_url: str = "http://localhost:11434",
-                 model: str = "llama3.1", timeout: int = 120):
+                 model: str = "llama3.1", timeout: int = 120,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+                 guard: Optional[ProviderGuard] = None):
         """
         初始化本地模型适配器
         
@@ -21,19 +27,30 @@ class LocalLLMAdapter(BaseAIAdapter):
             base_url: Ollama服务地址
             model: 模型名称
             timeout: 请求超时时间（秒）
+            max_connections: 连接池最大连接数
+            max_keepalive_connections: 连接池最大保活连接数（requests连接池不单独区分，与其他适配器保持相同的参数）
+            guard: 提供商保护层（限流、重试、熔断）
         """
         self.base_url = base_url.rstrip('/')
         self.model = model
         self.timeout = timeout
+        self.guard = guard
         self.prompt_builder = PromptBuilder()
         
+        # 复用TCP连接，避免每次请求重新建立连接
+        self.session = requests.Session()
+        self.session.mount(
+            self.base_url,
+            HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+        )
+        
         # 测试连接
         self._test_connection()
     
     def _test_connection(self):
         """测试与本地模型的连接"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=5)
             response.raise_for_status()
         except Exception as e:
             raise ConnectionError(
@@ -89,24 +106,31 @@ class LocalLLMAdapter(BaseAIAdapter):
         except Exception as e:
             raise RuntimeError(f"本地模型调用失败: {str(e)}")
     
-    def _call_ollama(self, prompt: str) -> Dict[str, Any]:
-        """调用Ollama API"""
-        response = requests.post(
+    def _build_payload(self, prompt: str) -> Dict[str, Any]:
+        """构建Ollama请求体"""
+        return {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False,
+            "format": "json",
+            "options": {
+                "temperature": 0.7,
+            }
+        }
+    
+    def _post_generate(self, **payload) -> Dict[str, Any]:
+        """发送生成请求并返回响应JSON"""
+        response = self.session.post(
             f"{self.base_url}/api/generate",
-            json={
-                "model": self.model,
-                "prompt": prompt,
-                "stream": False,
-                "format": "json",
-                "options": {
-                    "temperature": 0.7,
-                }
-            },
+            json=payload,
             timeout=self.timeout
         )
-        
         response.raise_for_status()
-        result = response.json()
+        return response.json()
+    
+    def _call_ollama(self, prompt: str) -> Dict[str, Any]:
+        """调用Ollama API"""
+        result = self._guarded_call(self._post_generate, **self._build_payload(prompt))
         
         # 解析响应
         response_text = result.get('response', '')
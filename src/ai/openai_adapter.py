@@ -1,7 +1,7 @@
 """OpenAI适配器"""
 
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 try:
     import openai
@@ -11,6 +11,9 @@ except ImportError:
 
 from .base_adapter import BaseAIAdapter
 from .prompt_builder import PromptBuilder
+from .prompt_cache import get_prompt_cache_stats
+from .rate_limiter import ProviderGuard
+from .http_pool import build_limits, build_http_client, DEFAULT_MAX_CONNECTIONS, DEFAULT_MAX_KEEPALIVE_CONNECTIONS
 from ..models import FileInfo
 
 
@@ -18,7 +21,10 @@ class OpenAIAdapter(BaseAIAdapter):
     """OpenAI适配器"""
     
     def __init__(self, api_key: str, model: str = "gpt-4-turbo-preview",
-                 max_tokens: int = 4096, temperature: float = 0.7):
+                 max_tokens: int = 4096, temperature: float = 0.7,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+                 guard: Optional[ProviderGuard] = None):
         """
         初始化OpenAI适配器
         
@@ -27,6 +33,9 @@ class OpenAIAdapter(BaseAIAdapter):
             model: 模型名称
             max_tokens: 最大token数
             temperature: 温度参数
+            max_connections: 连接池最大连接数
+            max_keepalive_connections: 连接池最大保活连接数
+            guard: 提供商保护层（限流、重试、熔断），为空时直接调用并使用SDK自带的重试
         """
         if not OPENAI_AVAILABLE:
             raise ImportError("需要安装openai库: pip install openai")
@@ -34,12 +43,47 @@ class OpenAIAdapter(BaseAIAdapter):
         if not api_key:
             raise ValueError("OpenAI API Key不能为空")
         
-        self.client = openai.OpenAI(api_key=api_key)
+        self._client_kwargs = {"api_key": api_key}
+        if guard is not None:
+            # 重试由保护层统一处理，避免与SDK的重试叠加
+            self._client_kwargs["max_retries"] = 0
+        self.guard = guard
+        self.limits = build_limits(max_connections, max_keepalive_connections)
+        self.client = openai.OpenAI(
+            **self._client_kwargs,
+            http_client=build_http_client(openai, self.limits)
+        )
         self.model = model
         self.max_tokens = max_tokens
         self.temperature = temperature
         self.prompt_builder = PromptBuilder()
     
+    def _build_request(self, user_prompt: str) -> Dict[str, Any]:
+        """构建API请求参数"""
+        return {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "response_format": {"type": "json_object"},
+            "messages": [
+                {"role": "system", "content": self.prompt_builder.SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ],
+        }
+    
+    def _handle_completion(self, response) -> Dict[str, Any]:
+        """解析并验证API响应"""
+        # 静态前缀（系统提示、用户需求）在前，提供商可自动缓存，这里只记录命中情况
+        get_prompt_cache_stats().record_openai(getattr(response, 'usage', None), provider='openai')
+        
+        response_text = response.choices[0].message.content
+        result = json.loads(response_text)
+        
+        if not self._validate_response(result):
+            raise ValueError("AI响应格式不正确")
+        
+        return result
+    
     def generate_classification(
         self,
         files: List[FileInfo],
@@ -52,24 +96,10 @@ class OpenAIAdapter(BaseAIAdapter):
         )
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                response_format={"type": "json_object"},
-                messages=[
-                    {"role": "system", "content": self.prompt_builder.SYSTEM_PROMPT},
-                    {"role": "user", "content": user_prompt}
-                ]
+            response = self._guarded_call(
+                self.client.chat.completions.create, **self._build_request(user_prompt)
             )
-            
-            response_text = response.choices[0].message.content
-            result = json.loads(response_text)
-            
-            if not self._validate_response(result):
-                raise ValueError("AI响应格式不正确")
-            
-            return result
+            return self._handle_completion(response)
             
         except Exception as e:
             raise RuntimeError(f"OpenAI API调用失败: {str(e)}")
@@ -86,24 +116,10 @@ class OpenAIAdapter(BaseAIAdapter):
         )
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                response_format={"type": "json_object"},
-                messages=[
-                    {"role": "system", "content": self.prompt_builder.SYSTEM_PROMPT},
-                    {"role": "user", "content": user_prompt}
-                ]
+            response = self._guarded_call(
+                self.client.chat.completions.create, **self._build_request(user_prompt)
             )
-            
-            response_text = response.choices[0].message.content
-            result = json.loads(response_text)
-            
-            if not self._validate_response(result):
-                raise ValueError("AI响应格式不正确")
-            
-            return result
+            return self._handle_completion(response)
             
         except Exception as e:
             raise RuntimeError(f"OpenAI API调用失败: {str(e)}")
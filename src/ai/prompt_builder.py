@@ -1,12 +1,27 @@
 """Prompt构建器"""
 
-from typing import List, Dict, Any
+import os
+import re
+from pathlib import Path
+from typing import List, Dict, Any, Tuple
 from ..models import FileInfo
 
 
 class PromptBuilder:
     """Prompt构建器 - 构建发送给AI的提示"""
     
+    # 单个Prompt中最多列出的文件数
+    MAX_FILES_PER_PROMPT = 100
+    
+    # 文件记录中内容摘要的最大字符数
+    SAMPLE_CHARS = 80
+    
+    # 文件记录的列（制表符分隔）
+    FILE_TABLE_HEADER = "ID\t目录\t文件名\t大小\t元数据\t内容摘要"
+    
+    # AI响应中的短文件ID（容忍大小写和省略前缀）
+    FILE_ID_PATTERN = re.compile(r'[fF]?(\d+)')
+    
     # 系统提示
     SYSTEM_PROMPT = """你是一个专业的文件整理助手。你的任务是：
 1. 分析文件信息（文件名、类型、元数据、内容样本）
@@ -18,7 +33,7 @@ class PromptBuilder:
   "operations": [
     {
       "type": "move|rename|create_folder",
-      "file": "文件完整路径",
+      "file": "文件ID",
       "target": "目标路径或新名称",
       "reason": "分类依据说明",
       "confidence": 0.95
@@ -29,8 +44,8 @@ class PromptBuilder:
 
 重要规则：
 - type必须是move、rename或create_folder之一
-- file必须是原始文件的完整路径
-- target必须是完整的目标路径（对于move）或新文件名（对于rename）
+- file填写文件列表中的文件ID（如f3）
+- target对于move和create_folder是目标路径（完整路径，或相对于根目录的路径），对于rename是新文件名
 - reason简要说明为什么这样分类
 - confidence是0-1之间的数字，表示分类的置信度
 - 对于不确定的文件，可以将confidence设置为较低值
@@ -53,35 +68,60 @@ class PromptBuilder:
         Returns:
             完整的用户Prompt
         """
-        prompt_parts = []
+        header, body = PromptBuilder.build_classification_prompt_parts(files, user_request, context)
+        return f"{header}\n{body}"
+    
+    @staticmethod
+    def build_classification_prompt_parts(
+        files: List[FileInfo],
+        user_request: str,
+        context: Dict[str, Any]
+    ) -> Tuple[str, str]:
+        """
+        分两部分构建分类任务的Prompt
+        
+        前半部分（用户需求、已知规则、历史反馈）在同一批次的各个分块间相同，
+        可作为提供商侧Prompt缓存的前缀；后半部分是各分块不同的文件列表。
+        
+        Args:
+            files: 文件列表
+            user_request: 用户需求
+            context: 上下文信息
+            
+        Returns:
+            (静态前缀, 文件列表及任务说明)
+        """
+        header_parts = []
         
         # 1. 用户需求
-        prompt_parts.append(f"## 用户需求\n{user_request}\n")
+        header_parts.append(f"## 用户需求\n{user_request}\n")
         
         # 2. 已知规则（如果有）
         if context.get('learned_rules'):
-            prompt_parts.append("## 已知规则")
+            header_parts.append("## 已知规则")
             for rule in context['learned_rules']:
-                prompt_parts.append(f"- {rule}")
-            prompt_parts.append("")
+                header_parts.append(f"- {rule}")
+            header_parts.append("")
         
         # 3. 历史反馈（如果有）
         if context.get('history'):
-            prompt_parts.append("## 历史反馈")
+            header_parts.append("## 历史反馈")
             for h in context['history'][-3:]:  # 最近3次
                 if h.get('feedback'):
-                    prompt_parts.append(f"- {h['feedback']}")
-            prompt_parts.append("")
+                    header_parts.append(f"- {h['feedback']}")
+            header_parts.append("")
+        
+        body_parts = []
         
         # 4. 文件列表
-        prompt_parts.append("## 待整理文件")
-        prompt_parts.append(PromptBuilder._format_file_list(files))
+        body_parts.append("## 待整理文件")
+        body_parts.append(PromptBuilder._format_file_list(files))
         
         # 5. 任务说明
-        prompt_parts.append("\n## 任务")
-        prompt_parts.append("请根据以上信息生成文件操作方案，以JSON格式返回。")
+        body_parts.append("\n## 任务")
+        body_parts.append("请根据以上信息生成文件操作方案，以JSON格式返回。")
         
-        return "\n".join(prompt_parts)
+        return "\n".join(header_parts), "\n".join(body_parts)
     
     @staticmethod
     def build_refinement_prompt(
@@ -125,39 +165,149 @@ class PromptBuilder:
         return "\n".join(prompt_parts)
     
     @staticmethod
-    def _format_file_list(files: List[FileInfo], max_files: int = 100) -> str:
-        """格式化文件列表"""
-        lines = []
+    def _format_file_list(files: List[FileInfo], max_files: int = MAX_FILES_PER_PROMPT) -> str:
+        """
+        格式化文件列表（紧凑格式）
         
+        公共目录前缀只出现一次：先列出根目录和目录代号表，每个文件再占一行
+        制表符分隔的记录，用短文件ID代替完整路径。
+        """
         # 如果文件太多，只显示部分
         display_files = files[:max_files]
+        if not display_files:
+            return "（无文件）"
         
+        root, dir_aliases = PromptBuilder._build_dir_table(display_files)
+        
+        lines = [f"根目录: {root}", "目录代号:"]
+        for directory, alias in dir_aliases.items():
+            lines.append(f"{alias}={PromptBuilder._relative_dir(directory, root)}")
+        
+        lines.append("文件（制表符分隔）:")
+        lines.append(PromptBuilder.FILE_TABLE_HEADER)
         for i, file in enumerate(display_files, 1):
-            lines.append(f"{i}. 文件名: {file.name}")
-            lines.append(f"   路径: {file.path}")
-            lines.append(f"   类型: {file.extension}")
-            lines.append(f"   大小: {file.size_human}")
-            
-            # 添加元数据信息
-            if file.metadata:
-                metadata_str = PromptBuilder._format_metadata(file.metadata)
-                if metadata_str:
-                    lines.append(f"   元数据: {metadata_str}")
-            
-            # 添加内容样本
-            if file.content_sample and not file.content_sample.startswith('['):
-                sample = file.content_sample[:150]
-                if len(file.content_sample) > 150:
-                    sample += "..."
-                lines.append(f"   内容摘要: {sample}")
-            
-            lines.append("")
+            alias = dir_aliases[str(Path(file.path).parent)]
+            lines.append(PromptBuilder.format_file_row(i, file, alias))
         
         if len(files) > max_files:
             lines.append(f"... 还有 {len(files) - max_files} 个文件未显示")
         
         return "\n".join(lines)
     
+    @staticmethod
+    def _build_dir_table(files: List[FileInfo]) -> Tuple[str, Dict[str, str]]:
+        """
+        构建目录代号表
+        
+        Returns:
+            (根目录, 目录完整路径 -> 目录代号)，目录按首次出现的顺序编号
+        """
+        dir_aliases: Dict[str, str] = {}
+        for file in files:
+            directory = str(Path(file.path).parent)
+            if directory not in dir_aliases:
+                dir_aliases[directory] = f"D{len(dir_aliases)}"
+        
+        try:
+            root = os.path.commonpath(list(dir_aliases))
+        except ValueError:
+            # 不同盘符或绝对/相对路径混合时没有公共前缀
+            root = ""
+        
+        return root, dir_aliases
+    
+    @staticmethod
+    def _relative_dir(directory: str, root: str) -> str:
+        """目录相对于根目录的路径"""
+        if not root:
+            return directory
+        return os.path.relpath(directory, root)
+    
+    @staticmethod
+    def file_id(index: int) -> str:
+        """文件在Prompt中的短ID"""
+        return f"f{index}"
+    
+    @staticmethod
+    def format_file_row(index: int, file: FileInfo, dir_alias: str = "D0") -> str:
+        """格式化单个文件记录（制表符分隔的一行）"""
+        metadata_str = ""
+        if file.metadata:
+            metadata_str = PromptBuilder._format_metadata(file.metadata)
+        
+        sample = ""
+        if file.content_sample and not file.content_sample.startswith('['):
+            sample = " ".join(file.content_sample.split())[:PromptBuilder.SAMPLE_CHARS]
+        
+        fields = [
+            PromptBuilder.file_id(index),
+            dir_alias,
+            file.name,
+            PromptBuilder._compact_size(file.size),
+            metadata_str,
+            sample,
+        ]
+        return "\t".join(PromptBuilder._clean_field(field) for field in fields)
+    
+    @staticmethod
+    def _clean_field(value: str) -> str:
+        """去掉字段中的制表符和换行，避免破坏表格结构"""
+        return value.replace("\t", " ").replace("\r", " ").replace("\n", " ")
+    
+    @staticmethod
+    def _compact_size(size: int) -> str:
+        """紧凑的文件大小表示（如 1.2M）"""
+        value = float(size)
+        for unit in ['B', 'K', 'M', 'G']:
+            if value < 1024:
+                return f"{value:.0f}{unit}" if unit == 'B' else f"{value:.1f}{unit}"
+            value /= 1024
+        return f"{value:.1f}T"
+    
+    @staticmethod
+    def resolve_file_refs(
+        result: Dict[str, Any],
+        files: List[FileInfo],
+        max_files: int = MAX_FILES_PER_PROMPT
+    ) -> Dict[str, Any]:
+        """
+        将AI响应中的短文件ID和相对路径还原为完整路径
+        
+        Args:
+            result: AI返回的操作方案
+            files: 构建Prompt时使用的文件列表（顺序需与Prompt一致）
+            max_files: 构建Prompt时的文件数上限
+            
+        Returns:
+            还原后的操作方案（不修改原字典）
+        """
+        display_files = files[:max_files]
+        root, _ = PromptBuilder._build_dir_table(display_files)
+        
+        operations = []
+        for op in result.get('operations', []):
+            op = dict(op)
+            
+            ref = str(op.get('file') or '').strip()
+            match = PromptBuilder.FILE_ID_PATTERN.fullmatch(ref)
+            if match and 1 <= int(match.group(1)) <= len(display_files):
+                op['file'] = display_files[int(match.group(1)) - 1].path
+            elif ref and root and not Path(ref).is_absolute():
+                op['file'] = str(Path(root) / ref)
+            
+            # rename的target是新文件名，不做路径还原
+            target = op.get('target')
+            if (
+                target and root
+                and op.get('type') in ('move', 'create_folder')
+                and not Path(target).is_absolute()
+            ):
+                op['target'] = str(Path(root) / target)
+            
+            operations.append(op)
+        
+        return {**result, 'operations': operations}
+    
     @staticmethod
     def _format_metadata(metadata: Dict) -> str:
         """格式化元数据"""
@@ -168,4 +318,4 @@ class PromptBuilder:
             if key in metadata and metadata[key]:
                 parts.append(f"{key}={metadata[key]}")
         
-        return ", ".join(parts) if parts else ""
+        return ";".join(parts) if parts else ""
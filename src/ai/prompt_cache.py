@@ -0,0 +1,184 @@
+"""Prompt缓存 - 标记可缓存的静态前缀并统计提供商侧的缓存命中情况"""
+
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+
+# Anthropic的缓存标记（缓存约5分钟，每次命中后续期）
+EPHEMERAL_CACHE_CONTROL = {"type": "ephemeral"}
+
+# Anthropic可缓存前缀的最小长度（token），更短的前缀即使带缓存标记也不会被缓存
+MIN_CACHEABLE_TOKENS = 1024
+MIN_CACHEABLE_TOKENS_HAIKU = 2048
+
+
+def min_cacheable_tokens(model: str) -> int:
+    """模型可缓存前缀的最小token数（Haiku系列要求更长的前缀）"""
+    return MIN_CACHEABLE_TOKENS_HAIKU if 'haiku' in (model or '').lower() else MIN_CACHEABLE_TOKENS
+
+
+def cacheable_text_block(text: str) -> Dict[str, Any]:
+    """
+    构建带缓存标记的文本内容块
+
+    该块及之前的全部内容（工具、系统提示、先前消息）作为缓存前缀。
+
+    Args:
+        text: 文本内容
+
+    Returns:
+        Anthropic消息内容块
+    """
+    return {"type": "text", "text": text, "cache_control": dict(EPHEMERAL_CACHE_CONTROL)}
+
+
+def with_cache_breakpoints(messages: List[Any]) -> List[Any]:
+    """
+    为LangChain消息列表设置缓存断点（用于ChatAnthropic）
+
+    在系统消息和最后一条消息上设置缓存标记：系统提示单独缓存，最后一条消息
+    的断点随对话推进而后移，下一轮请求即可命中本轮写入的整段前缀。
+    返回新列表，不修改原消息。
+
+    Args:
+        messages: LangChain消息列表
+
+    Returns:
+        带缓存标记的消息列表
+    """
+    if not messages:
+        return messages
+
+    marked = list(messages)
+    indexes = {len(marked) - 1}
+    if getattr(marked[0], 'type', None) == 'system':
+        indexes.add(0)
+
+    for index in indexes:
+        message = marked[index]
+        if isinstance(message.content, str):
+            marked[index] = message.model_copy(
+                update={"content": [cacheable_text_block(message.content)]}
+            )
+    return marked
+
+
+def _field(obj: Any, name: str, default: Any = None) -> Any:
+    """读取SDK对象或字典中的字段"""
+    if obj is None:
+        return default
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+class PromptCacheStats:
+    """Prompt缓存统计 - 累计各提供商请求的输入token及缓存读写情况"""
+
+    def __init__(self):
+        """初始化缓存统计"""
+        self._lock = Lock()
+        self._providers: Dict[str, Dict[str, int]] = {}
+
+    def record(
+        self,
+        provider: str,
+        input_tokens: int = 0,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0
+    ):
+        """
+        记录一次请求的token用量
+
+        Args:
+            provider: 提供商名称
+            input_tokens: 未命中缓存的输入token数
+            cache_read_tokens: 从缓存读取的输入token数
+            cache_write_tokens: 写入缓存的输入token数
+        """
+        with self._lock:
+            stats = self._providers.setdefault(provider, {
+                'requests': 0,
+                'cache_hits': 0,
+                'input_tokens': 0,
+                'cache_read_tokens': 0,
+                'cache_write_tokens': 0,
+            })
+            stats['requests'] += 1
+            stats['input_tokens'] += input_tokens or 0
+            stats['cache_read_tokens'] += cache_read_tokens or 0
+            stats['cache_write_tokens'] += cache_write_tokens or 0
+            if cache_read_tokens:
+                stats['cache_hits'] += 1
+
+    def record_anthropic(self, usage: Any, provider: str = 'claude'):
+        """记录Anthropic响应的usage（input_tokens不含缓存读写部分）"""
+        if usage is None:
+            return
+        self.record(
+            provider,
+            input_tokens=_field(usage, 'input_tokens', 0),
+            cache_read_tokens=_field(usage, 'cache_read_input_tokens', 0),
+            cache_write_tokens=_field(usage, 'cache_creation_input_tokens', 0),
+        )
+
+    def record_openai(self, usage: Any, provider: str = 'openai'):
+        """记录OpenAI兼容响应的usage（prompt_tokens包含自动缓存命中的部分）"""
+        if usage is None:
+            return
+        prompt_tokens = _field(usage, 'prompt_tokens', 0) or 0
+        cached = _field(_field(usage, 'prompt_tokens_details'), 'cached_tokens', 0) or 0
+        self.record(
+            provider,
+            input_tokens=prompt_tokens - cached,
+            cache_read_tokens=cached,
+        )
+
+    def record_usage_metadata(self, usage_metadata: Optional[Dict[str, Any]], provider: str):
+        """记录LangChain消息的usage_metadata（input_tokens包含缓存读写部分）"""
+        if not isinstance(usage_metadata, dict):
+            return
+        details = usage_metadata.get('input_token_details') or {}
+        cache_read = details.get('cache_read', 0) or 0
+        cache_write = details.get('cache_creation', 0) or 0
+        self.record(
+            provider,
+            input_tokens=(usage_metadata.get('input_tokens', 0) or 0) - cache_read - cache_write,
+            cache_read_tokens=cache_read,
+            cache_write_tokens=cache_write,
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        获取统计快照
+
+        Returns:
+            各提供商的统计及缓存命中率
+        """
+        with self._lock:
+            providers = {name: dict(stats) for name, stats in self._providers.items()}
+
+        for stats in providers.values():
+            total = stats['input_tokens'] + stats['cache_read_tokens'] + stats['cache_write_tokens']
+            stats['token_hit_rate'] = round(stats['cache_read_tokens'] / total, 4) if total else 0.0
+            stats['request_hit_rate'] = (
+                round(stats['cache_hits'] / stats['requests'], 4) if stats['requests'] else 0.0
+            )
+        return providers
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._providers.clear()
+
+
+# 全局缓存统计实例
+_prompt_cache_stats: Optional[PromptCacheStats] = None
+
+
+def get_prompt_cache_stats() -> PromptCacheStats:
+    """获取Prompt缓存统计单例"""
+    global _prompt_cache_stats
+    if _prompt_cache_stats is None:
+        _prompt_cache_stats = PromptCacheStats()
+    return _prompt_cache_stats
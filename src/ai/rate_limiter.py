@@ -0,0 +1,445 @@
+"""限流与重试 - 按提供商共享的令牌桶限流、指数退避重试和熔断"""
+
+import asyncio
+import json
+import random
+import time
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .token_budget import TokenCounter
+
+
+# 可重试的HTTP状态码（限流、超时、服务端临时错误、Anthropic过载）
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+# 无状态码时按异常类名判断是否为网络类临时错误
+_RETRYABLE_NAME_KEYWORDS = ('Timeout', 'Connect', 'RateLimit', 'Overloaded', 'ServiceUnavailable')
+
+
+class CircuitOpenError(RuntimeError):
+    """熔断器打开时拒绝请求"""
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    """提取异常中的HTTP状态码（兼容各SDK异常和requests/httpx的HTTPError）"""
+    status = getattr(exc, 'status_code', None)
+    if isinstance(status, int):
+        return status
+    status = getattr(getattr(exc, 'response', None), 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    判断异常是否为可重试的临时错误
+
+    Args:
+        exc: 异常
+
+    Returns:
+        是否可重试
+    """
+    if isinstance(exc, CircuitOpenError):
+        return False
+    status = _status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    name = type(exc).__name__
+    return any(keyword in name for keyword in _RETRYABLE_NAME_KEYWORDS)
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """读取响应头中的Retry-After（秒），没有或无法解析时返回None"""
+    headers = getattr(getattr(exc, 'response', None), 'headers', None)
+    if not headers:
+        return None
+    try:
+        value = headers.get('retry-after')
+        return max(0.0, float(value)) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def estimate_request_tokens(request: Dict[str, Any]) -> int:
+    """
+    估算一次请求占用的token数（用于TPM限流）
+
+    按提示内容估算输入token，再加上输出上限（与提供商预扣额度的方式一致）。
+
+    Args:
+        request: API请求参数
+
+    Returns:
+        估算的token数
+    """
+    prompt = {key: request.get(key) for key in ('system', 'messages', 'prompt') if key in request}
+    text = json.dumps(prompt, ensure_ascii=False, default=str)
+    return TokenCounter.estimate(text) + int(request.get('max_tokens') or 0)
+
+
+class TokenBucket:
+    """令牌桶 - 按固定速率补充，允许透支并返回需要等待的时间"""
+
+    def __init__(self, rate_per_minute: float, burst_seconds: float = 10.0):
+        """
+        初始化令牌桶
+
+        Args:
+            rate_per_minute: 每分钟补充的令牌数
+            burst_seconds: 桶容量对应的补充时长（允许的突发量）
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        """补充令牌"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """
+        取出指定数量令牌需要等待的时间（不取出）
+
+        超过桶容量的请求只需等到桶满即可发出，超出部分在 take() 中全额扣除，由后续调用方等待补足。
+        """
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    def take(self, amount: float, now: float):
+        """取出令牌（全额扣除，可透支为负数，透支部分由后续调用方等待补足）"""
+        self._refill(now)
+        self.tokens -= amount
+
+
+class RateLimiter:
+    """限流器 - 同时按每分钟请求数（RPM）和每分钟token数（TPM）限流"""
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0):
+        """
+        初始化限流器
+
+        Args:
+            requests_per_minute: 每分钟请求数上限（0表示不限制）
+            tokens_per_minute: 每分钟token数上限（0表示不限制）
+        """
+        self._lock = Lock()
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._paused_until = 0.0
+
+    def reserve(self, tokens: int = 0, blocking: bool = True) -> Optional[float]:
+        """
+        预约一次请求的额度
+
+        Args:
+            tokens: 本次请求估算的token数
+            blocking: 为False时，额度不足则不预约并返回None
+
+        Returns:
+            调用方需要等待的秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._paused_until - now)
+            if self._requests is not None:
+                wait = max(wait, self._requests.wait_time(1, now))
+            if self._tokens is not None and tokens:
+                wait = max(wait, self._tokens.wait_time(tokens, now))
+
+            if wait > 0 and not blocking:
+                return None
+
+            if self._requests is not None:
+                self._requests.take(1, now)
+            if self._tokens is not None and tokens:
+                self._tokens.take(tokens, now)
+            return wait
+
+    def acquire(self, tokens: int = 0):
+        """同步等待额度"""
+        wait = self.reserve(tokens)
+        if wait:
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int = 0):
+        """异步等待额度"""
+        wait = self.reserve(tokens)
+        if wait:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """暂停放行（收到429时让同一提供商的所有调用方一起退避）"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class CircuitBreaker:
+    """熔断器 - 连续失败达到阈值后短时间内直接拒绝请求，超时后放行一个探测请求"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        初始化熔断器
+
+        Args:
+            failure_threshold: 连续失败多少次后熔断（0表示不熔断）
+            reset_timeout: 熔断持续时间（秒）
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = Lock()
+
+    def before_call(self):
+        """
+        请求前检查
+
+        Raises:
+            CircuitOpenError: 熔断中
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                remaining = self._opened_at + self.reset_timeout - time.monotonic()
+                if remaining > 0:
+                    raise CircuitOpenError(f"AI服务连续失败，已暂停请求（{remaining:.0f}秒后重试）")
+                self.state = self.HALF_OPEN
+                self._probing = False
+
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    raise CircuitOpenError("AI服务恢复探测中，请稍后重试")
+                self._probing = True
+
+    def record_success(self):
+        """记录成功"""
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        """记录一次临时性失败"""
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or (
+                self.failure_threshold and self._failures >= self.failure_threshold
+            ):
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def release(self):
+        """请求以非临时性错误结束（不计入失败，但释放探测名额）"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+
+
+class ProviderGuard:
+    """提供商保护层 - 组合限流、重试退避和熔断，同一提供商的所有调用共享"""
+
+    SETTING_KEYS = (
+        'requests_per_minute', 'tokens_per_minute', 'max_retries',
+        'base_delay', 'max_delay', 'failure_threshold', 'reset_timeout',
+    )
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_retries: int = 4,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0
+    ):
+        """
+        初始化提供商保护层
+
+        Args:
+            name: 提供商名称
+            requests_per_minute: 每分钟请求数上限（0表示不限制）
+            tokens_per_minute: 每分钟token数上限（0表示不限制）
+            max_retries: 临时错误的最大重试次数
+            base_delay: 首次重试的基础等待时间（秒）
+            max_delay: 单次重试的最长等待时间（秒）
+            failure_threshold: 连续失败多少次后熔断（0表示不熔断）
+            reset_timeout: 熔断持续时间（秒）
+        """
+        self.name = name
+        self.settings = {
+            'requests_per_minute': requests_per_minute,
+            'tokens_per_minute': tokens_per_minute,
+            'max_retries': max_retries,
+            'base_delay': base_delay,
+            'max_delay': max_delay,
+            'failure_threshold': failure_threshold,
+            'reset_timeout': reset_timeout,
+        }
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        self._lock = Lock()
+        self._stats = {'calls': 0, 'retries': 0, 'failures': 0, 'rejected': 0}
+
+    def backoff_delay(self, attempt: int, exc: Optional[BaseException] = None) -> float:
+        """
+        计算第 attempt 次重试前的等待时间
+
+        优先使用服务端给出的Retry-After，否则按指数退避并加入随机抖动，
+        避免并发请求在同一时刻集中重试。
+        """
+        retry_after = retry_after_seconds(exc) if exc is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+    def _count(self, key: str):
+        """累加统计"""
+        with self._lock:
+            self._stats[key] += 1
+
+    def _on_error(self, exc: Exception, attempt: int) -> Optional[float]:
+        """
+        处理一次失败
+
+        Returns:
+            需要重试时返回等待秒数，否则返回None
+        """
+        if not is_retryable(exc):
+            self.breaker.release()
+            return None
+
+        self.breaker.record_failure()
+        if attempt >= self.max_retries or self.breaker.state == CircuitBreaker.OPEN:
+            self._count('failures')
+            return None
+
+        delay = self.backoff_delay(attempt, exc)
+        if _status_code(exc) == 429:
+            self.limiter.pause(delay)
+        self._count('retries')
+        return delay
+
+    def _before_call(self, attempt: int):
+        """请求前检查熔断状态"""
+        if attempt == 0:
+            self._count('calls')
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            self._count('rejected')
+            raise
+
+    def call(self, func: Callable[..., Any], *args, tokens: int = 0, **kwargs) -> Any:
+        """
+        在限流、重试和熔断保护下同步调用
+
+        Args:
+            func: 实际发起请求的函数
+            tokens: 本次请求估算的token数（用于TPM限流）
+
+        Returns:
+            func 的返回值
+        """
+        attempt = 0
+        while True:
+            self._before_call(attempt)
+            self.limiter.acquire(tokens)
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                delay = self._on_error(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def acall(self, func: Callable[..., Awaitable[Any]], *args, tokens: int = 0, **kwargs) -> Any:
+        """
+        在限流、重试和熔断保护下异步调用
+
+        Args:
+            func: 实际发起请求的协程函数
+            tokens: 本次请求估算的token数（用于TPM限流）
+
+        Returns:
+            func 的返回值
+        """
+        attempt = 0
+        while True:
+            self._before_call(attempt)
+            await self.limiter.aacquire(tokens)
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                delay = self._on_error(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['circuit'] = self.breaker.state
+        return stats
+
+
+# 提供商名称 -> 保护层
+_guards: Dict[str, ProviderGuard] = {}
+_guards_lock = Lock()
+
+
+def get_provider_guard(provider: str, settings: Optional[Dict[str, Any]] = None) -> ProviderGuard:
+    """
+    获取提供商共享的保护层
+
+    同一提供商的适配器和LangChain模型共用一个实例；配置变化时重新创建。
+
+    Args:
+        provider: 提供商名称
+        settings: 限流与重试配置（为空时使用已有实例或默认值）
+
+    Returns:
+        提供商保护层
+    """
+    settings = {
+        key: value for key, value in (settings or {}).items()
+        if key in ProviderGuard.SETTING_KEYS and value is not None
+    }
+    with _guards_lock:
+        guard = _guards.get(provider)
+        if guard is None or (settings and any(guard.settings[k] != v for k, v in settings.items())):
+            guard = ProviderGuard(provider, **settings)
+            _guards[provider] = guard
+        return guard
+
+
+def get_guard_stats() -> Dict[str, Dict[str, Any]]:
+    """获取所有提供商保护层的统计信息"""
+    with _guards_lock:
+        guards = dict(_guards)
+    return {name: guard.stats() for name, guard in guards.items()}
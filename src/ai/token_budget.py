@@ -0,0 +1,191 @@
+"""Token预算 - 按模型上下文窗口和输出上限计算每次请求可容纳的文件数"""
+
+import re
+from threading import Lock
+from typing import Any, Dict, Optional
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+
+# 常见模型的上下文窗口（按模型名包含的关键字匹配，越具体的越靠前）
+MODEL_CONTEXT_WINDOWS = [
+    ('claude', 200000),
+    ('gpt-4o', 128000),
+    ('gpt-4.1', 1000000),
+    ('gpt-4-turbo', 128000),
+    ('gpt-4-32k', 32768),
+    ('gpt-4', 8192),
+    ('gpt-3.5-turbo', 16385),
+    ('moonshot-v1-8k', 8192),
+    ('moonshot-v1-32k', 32768),
+    ('moonshot-v1-128k', 131072),
+    ('deepseek', 64000),
+    ('glm-4', 128000),
+    ('qwen', 32768),
+    ('llama3', 8192),
+]
+
+# 未知模型的上下文窗口（保守取值）
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# 未知模型的输出上限
+DEFAULT_MAX_OUTPUT_TOKENS = 4096
+
+# 每个文件的操作在响应中大约占用的token数（使用短文件ID时）
+DEFAULT_OUTPUT_TOKENS_PER_FILE = 48
+
+# 响应中summary等固定部分预留的token数
+OUTPUT_OVERHEAD_TOKENS = 256
+
+# 文件列表的最小输入预算，避免上下文窗口较小时预算为负
+MIN_INPUT_BUDGET = 1024
+
+# 中日韩字符在各家分词器中通常各占约1个token
+_CJK_PATTERN = re.compile(r'[\u3000-\u9fff\uac00-\ud7af\uff00-\uffef]')
+
+
+def context_window_for(model: str) -> int:
+    """
+    查询模型的上下文窗口大小
+
+    Args:
+        model: 模型名称
+
+    Returns:
+        上下文窗口token数（未知模型返回保守的默认值）
+    """
+    name = (model or '').lower()
+    for keyword, window in MODEL_CONTEXT_WINDOWS:
+        if keyword in name:
+            return window
+    return DEFAULT_CONTEXT_WINDOW
+
+
+class TokenCounter:
+    """Token计数器 - 优先使用tiktoken，不可用时按字符类别估算"""
+
+    # 编码名 -> 编码对象（加载失败时为None），所有实例共享
+    _encodings: Dict[str, Any] = {}
+    _lock = Lock()
+
+    def __init__(self, model: str = ''):
+        """
+        初始化Token计数器
+
+        Args:
+            model: 模型名称（非OpenAI模型使用cl100k_base近似）
+        """
+        self.model = model or ''
+        self._encoding = None
+        self._loaded = False
+
+    @property
+    def encoding(self):
+        """tiktoken编码对象（首次使用时加载，不可用时为None）"""
+        if not self._loaded:
+            self._encoding = self._load_encoding(self.model)
+            self._loaded = True
+        return self._encoding
+
+    @classmethod
+    def _load_encoding(cls, model: str):
+        """加载模型对应的编码"""
+        if not TIKTOKEN_AVAILABLE:
+            return None
+
+        try:
+            name = tiktoken.encoding_name_for_model(model)
+        except KeyError:
+            name = 'cl100k_base'
+
+        with cls._lock:
+            if name not in cls._encodings:
+                try:
+                    cls._encodings[name] = tiktoken.get_encoding(name)
+                except Exception:
+                    # 词表需要联网下载，离线环境下退回估算
+                    cls._encodings[name] = None
+            return cls._encodings[name]
+
+    def count(self, text: str) -> int:
+        """
+        计算文本的token数
+
+        Args:
+            text: 文本
+
+        Returns:
+            token数
+        """
+        if not text:
+            return 0
+
+        encoding = self.encoding
+        if encoding is not None:
+            return len(encoding.encode(text, disallowed_special=()))
+
+        return self.estimate(text)
+
+    @staticmethod
+    def estimate(text: str) -> int:
+        """按字符类别估算token数（中日韩字符约1字符/token，其余约4字符/token）"""
+        cjk = len(_CJK_PATTERN.findall(text))
+        return cjk + (len(text) - cjk + 3) // 4
+
+
+class PromptBudgeter:
+    """Prompt预算器 - 计算文件列表可用的输入token数和单次请求的文件数上限"""
+
+    def __init__(
+        self,
+        model: str = '',
+        max_output_tokens: Optional[int] = None,
+        context_window: Optional[int] = None,
+        output_tokens_per_file: int = DEFAULT_OUTPUT_TOKENS_PER_FILE,
+        safety_ratio: float = 0.9
+    ):
+        """
+        初始化Prompt预算器
+
+        Args:
+            model: 模型名称
+            max_output_tokens: 模型单次输出的token上限
+            context_window: 上下文窗口大小（为空时按模型名查询）
+            output_tokens_per_file: 每个文件的操作在响应中占用的token数
+            safety_ratio: 上下文窗口的可用比例（为分词器误差留出余量）
+        """
+        self.counter = TokenCounter(model)
+        self.max_output_tokens = max_output_tokens or DEFAULT_MAX_OUTPUT_TOKENS
+        self.context_window = context_window or context_window_for(model)
+        self.output_tokens_per_file = max(1, output_tokens_per_file)
+        self.safety_ratio = safety_ratio
+
+    def count(self, text: str) -> int:
+        """计算文本的token数"""
+        return self.counter.count(text)
+
+    def input_budget(self, overhead_text: str = '') -> int:
+        """
+        计算文件列表可用的输入token数
+
+        Args:
+            overhead_text: 文件列表以外的Prompt内容（系统提示、用户需求等）
+
+        Returns:
+            输入token预算
+        """
+        available = (
+            int(self.context_window * self.safety_ratio)
+            - self.max_output_tokens
+            - self.count(overhead_text)
+        )
+        return max(available, MIN_INPUT_BUDGET)
+
+    def max_files_by_output(self) -> int:
+        """按输出上限计算单次请求最多能返回操作的文件数"""
+        available = self.max_output_tokens - OUTPUT_OVERHEAD_TOKENS
+        return max(1, available // self.output_tokens_per_file)
@@ -2,11 +2,26 @@
 Smart File Tidy API - FastAPI 入口
 """
 
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .routers import scan, organize, history, config, backup, ai
+from .services.executor import get_executor, run_blocking
+from .services.scan_service import get_scan_service
+from .services.controller_pool import get_controller_pool
+from ..utils.config import ConfigManager
+
+
+async def _scan_cache_cleanup_loop(interval_seconds: float):
+    """定期清理过期的扫描缓存"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await run_blocking("io", get_scan_service().cleanup_old_scans)
+        except Exception as e:
+            print(f"清理扫描缓存失败: {e}")
 
 
 @asynccontextmanager
@@ -14,9 +29,19 @@ async def lifespan(app: FastAPI):
     """应用生命周期管理"""
     # 启动时初始化
     print("Smart File Tidy API 启动中...")
+    controller_pool = get_controller_pool()
+    interval = ConfigManager().get('api.scan_cache.cleanup_interval_seconds', 300)
+    cleanup_task = asyncio.create_task(_scan_cache_cleanup_loop(interval))
     yield
     # 关闭时清理
     print("Smart File Tidy API 关闭中...")
+    cleanup_task.cancel()
+    try:
+        await cleanup_task
+    except asyncio.CancelledError:
+        pass
+    controller_pool.clear()
+    get_executor().shutdown(wait=False)
 
 
 app = FastAPI(
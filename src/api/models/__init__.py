@@ -11,6 +11,7 @@ from .requests import (
 )
 from .responses import (
     ScanResponse,
+    ScanPageResponse,
     FileInfoResponse,
     TaskResponse,
     OperationResponse,
@@ -33,6 +34,7 @@ __all__ = [
     "AIConfigRequest",
     # Responses
     "ScanResponse",
+    "ScanPageResponse",
     "FileInfoResponse",
     "TaskResponse",
     "OperationResponse",
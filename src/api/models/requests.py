@@ -45,6 +45,7 @@ class ExecuteRequest(BaseModel):
     """执行操作请求"""
     operations: List[OperationModel] = Field(..., description="要执行的操作列表")
     create_backup: bool = Field(default=True, description="是否创建备份")
+    request: Optional[str] = Field(default=None, description="生成这些操作的用户需求（用于从执行结果中学习）")
 
 
 class RefineRequest(BaseModel):
@@ -38,6 +38,14 @@ class ScanResponse(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.now, description="扫描时间")
 
 
+class ScanPageResponse(ScanResponse):
+    """扫描结果分页响应"""
+    total_matched: int = Field(..., description="满足过滤条件的文件数")
+    offset: int = Field(default=0, description="当前页起始位置")
+    limit: int = Field(default=100, description="每页数量")
+    next_cursor: Optional[str] = Field(default=None, description="下一页游标，没有更多数据时为空")
+
+
 class OperationResponse(BaseModel):
     """操作响应"""
     id: str = Field(..., description="操作ID")
@@ -16,11 +16,32 @@ from ..models.responses import (
     ErrorResponse,
 )
 from ..dependencies import get_config, get_controller
-from ...core.controller import Controller
+from ..services.executor import run_blocking
+from ..services.controller_pool import get_controller_pool
+from ...ai.prompt_cache import get_prompt_cache_stats
+from ...ai.rate_limiter import get_guard_stats
 
 router = APIRouter()
 
 
+def _suggest_organization(provider: Optional[str], directory: str):
+    """获取整理建议（阻塞）"""
+    with get_controller_pool().acquire(get_config(), provider, use_agent=True) as controller:
+        return controller.suggest_organization_with_agent(directory)
+
+
+def _analyze_file(provider: Optional[str], file_path: str):
+    """分析文件（阻塞）"""
+    with get_controller_pool().acquire(get_config(), provider, use_agent=True) as controller:
+        return controller.analyze_file_with_agent(file_path)
+
+
+def _chat(provider: Optional[str], message: str) -> str:
+    """AI对话（阻塞）"""
+    with get_controller_pool().acquire(get_config(), provider, use_agent=True) as controller:
+        return controller.chat_with_agent(message)
+
+
 @router.post(
     "/suggest",
     response_model=SuggestionResponse,
@@ -31,15 +52,10 @@ router = APIRouter()
 async def get_suggestions(request: SuggestRequest):
     """获取整理建议"""
     try:
-        config = get_config()
-        controller = Controller(
-            config=config,
-            ai_provider=request.provider,
-            use_agent=True
+        result = await run_blocking(
+            "ai", _suggest_organization, request.provider, request.directory
         )
         
-        result = controller.suggest_organization_with_agent(request.directory)
-        
         if not result.get('success', True):
             raise HTTPException(
                 status_code=500,
@@ -80,15 +96,10 @@ async def get_suggestions(request: SuggestRequest):
 async def analyze_file(request: AnalyzeRequest):
     """分析文件"""
     try:
-        config = get_config()
-        controller = Controller(
-            config=config,
-            ai_provider=request.provider,
-            use_agent=True
+        result = await run_blocking(
+            "ai", _analyze_file, request.provider, request.file_path
         )
         
-        result = controller.analyze_file_with_agent(request.file_path)
-        
         if not result.get('success', True):
             raise HTTPException(
                 status_code=500,
@@ -120,13 +131,7 @@ async def chat(request: ChatRequest):
     """AI对话"""
     try:
         config = get_config()
-        controller = Controller(
-            config=config,
-            ai_provider=request.provider,
-            use_agent=True
-        )
-        
-        response = controller.chat_with_agent(request.message)
+        response = await run_blocking("ai", _chat, request.provider, request.message)
         
         return ChatResponse(
             message=response,
@@ -150,14 +155,8 @@ async def chat_stream(request: ChatRequest):
         
         async def generate():
             try:
-                controller = Controller(
-                    config=config,
-                    ai_provider=provider,
-                    use_agent=True
-                )
-                
                 # 获取完整响应
-                response = controller.chat_with_agent(request.message)
+                response = await run_blocking("ai", _chat, provider, request.message)
                 
                 # 模拟流式输出（按句子分割）
                 sentences = response.replace('。', '。\n').replace('！', '！\n').replace('？', '？\n').split('\n')
@@ -193,3 +192,23 @@ async def chat_stream(request: ChatRequest):
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"对话失败: {str(e)}")
+
+
+@router.get(
+    "/cache-stats",
+    summary="Prompt缓存统计",
+    description="各AI提供商的输入token用量及Prompt缓存命中率",
+)
+async def get_cache_stats():
+    """Prompt缓存统计"""
+    return {"providers": get_prompt_cache_stats().snapshot()}
+
+
+@router.get(
+    "/rate-limit-stats",
+    summary="限流与熔断状态",
+    description="各AI提供商的请求数、重试次数、失败次数及熔断器状态",
+)
+async def get_rate_limit_stats():
+    """限流与熔断状态"""
+    return {"providers": get_guard_stats()}
@@ -8,6 +8,7 @@ from typing import List
 from ..models.requests import BackupRestoreRequest
 from ..models.responses import BackupResponse, ErrorResponse
 from ..services.history_service import get_history_service
+from ..services.executor import run_blocking
 
 router = APIRouter()
 
@@ -39,7 +40,7 @@ async def create_backup(file_paths: List[str]):
             raise HTTPException(status_code=400, detail="文件路径列表不能为空")
         
         service = get_history_service()
-        backup_id = service.create_backup(file_paths)
+        backup_id = await run_blocking("io", service.create_backup, file_paths)
         
         return {
             "message": "备份创建成功",
@@ -60,7 +61,7 @@ async def restore_backup(request: BackupRestoreRequest):
     """恢复备份"""
     try:
         service = get_history_service()
-        success = service.restore_backup(request.backup_id)
+        success = await run_blocking("io", service.restore_backup, request.backup_id)
         
         if success:
             return {
@@ -8,6 +8,7 @@ from typing import Optional
 from ..models.requests import UndoRequest
 from ..models.responses import HistoryResponse, ErrorResponse
 from ..services.history_service import get_history_service
+from ..services.executor import run_blocking
 
 router = APIRouter()
 
@@ -54,7 +55,7 @@ async def undo_last_operation(request: UndoRequest):
                 }
             raise HTTPException(status_code=400, detail="没有可撤销的操作")
         
-        success = service.undo_last_operation()
+        success = await run_blocking("io", service.undo_last_operation)
         
         if success:
             return {"message": "撤销成功", "success": True}
@@ -23,6 +23,7 @@ from ..models.responses import (
 )
 from ..services.organize_service import get_organize_service
 from ..services.task_manager import get_task_manager
+from ..services.executor import run_blocking
 
 router = APIRouter()
 
@@ -38,7 +39,9 @@ async def generate_plan(request: OrganizePlanRequest):
     """生成整理方案"""
     try:
         service = get_organize_service()
-        operations = service.generate_plan(
+        operations = await run_blocking(
+            "ai",
+            service.generate_plan,
             scan_id=request.scan_id,
             user_request=request.request,
             ai_provider=request.provider,
@@ -61,7 +64,9 @@ async def refine_plan(request: RefineRequest):
     """优化整理方案"""
     try:
         service = get_organize_service()
-        operations = service.refine_plan(
+        operations = await run_blocking(
+            "ai",
+            service.refine_plan,
             scan_id=request.scan_id,
             operations=request.operations,
             feedback=request.feedback,
@@ -87,6 +92,7 @@ async def execute_operations(request: ExecuteRequest):
         task_id = service.execute_operations_async(
             operations=request.operations,
             create_backup=request.create_backup,
+            user_request=request.request,
         )
         
         # 返回任务状态
@@ -210,7 +216,7 @@ async def preview_operations(operations: List[OperationModel]):
     """预览操作"""
     try:
         service = get_organize_service()
-        preview = service.preview_operations(operations)
+        preview = await run_blocking("io", service.preview_operations, operations)
         return preview
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"预览失败: {str(e)}")
@@ -225,7 +231,7 @@ async def validate_operations(operations: List[OperationModel]):
     """验证操作"""
     try:
         service = get_organize_service()
-        validation = service.validate_operations(operations)
+        validation = await run_blocking("io", service.validate_operations, operations)
         return validation
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"验证失败: {str(e)}")
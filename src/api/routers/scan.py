@@ -2,12 +2,18 @@
 扫描路由
 """
 
+import json
+from datetime import datetime
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from typing import Optional, List
 
 from ..models.requests import ScanRequest
-from ..models.responses import ScanResponse, ErrorResponse
+from ..models.responses import ScanResponse, ScanPageResponse, ScanStatsResponse, ErrorResponse
 from ..services.scan_service import get_scan_service
+from ..services.executor import run_blocking
+from ..sse.stream import create_sse_message
+from ...core.file_scanner import FileScanner
 
 router = APIRouter()
 
@@ -23,7 +29,9 @@ async def scan_directory(request: ScanRequest):
     """扫描目录"""
     try:
         service = get_scan_service()
-        result = service.scan_directory(
+        result = await run_blocking(
+            "scan",
+            service.scan_directory,
             directory=request.directory,
             recursive=request.recursive,
             extensions=request.extensions,
@@ -41,63 +49,117 @@ async def scan_directory(request: ScanRequest):
         raise HTTPException(status_code=500, detail=f"扫描失败: {str(e)}")
 
 
+@router.post(
+    "/stream",
+    responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+    summary="流式扫描目录",
+    description="边扫描边返回文件块和进度事件，格式为 NDJSON 或 SSE",
+)
+async def stream_scan_directory(
+    request: ScanRequest,
+    format: str = Query(default="ndjson", pattern="^(ndjson|sse)$", description="输出格式 (ndjson/sse)"),
+    chunk_size: int = Query(default=200, ge=1, le=5000, description="每块的文件数"),
+):
+    """流式扫描目录"""
+    try:
+        FileScanner.check_directory(request.directory)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except NotADirectoryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    service = get_scan_service()
+    events = service.stream_scan(
+        directory=request.directory,
+        recursive=request.recursive,
+        extensions=request.extensions,
+        include_metadata=request.include_metadata,
+        include_content=request.include_content,
+        chunk_size=chunk_size,
+    )
+    
+    if format == "sse":
+        async def sse_generator():
+            async for event in events:
+                yield await create_sse_message(event, event=event["type"])
+        
+        return StreamingResponse(
+            sse_generator(),
+            media_type="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+            }
+        )
+    
+    async def ndjson_generator():
+        async for event in events:
+            yield json.dumps(event, ensure_ascii=False, default=str) + "\n"
+    
+    return StreamingResponse(
+        ndjson_generator(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
 @router.get(
     "/{scan_id}",
-    response_model=ScanResponse,
-    responses={404: {"model": ErrorResponse}},
+    response_model=ScanPageResponse,
+    responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
     summary="获取扫描结果",
-    description="获取之前扫描的结果",
+    description="分页获取之前扫描的结果，支持过滤和排序",
 )
-async def get_scan_result(scan_id: str):
+async def get_scan_result(
+    scan_id: str,
+    offset: int = Query(default=0, ge=0, description="起始位置"),
+    limit: int = Query(default=100, ge=1, le=1000, description="每页数量"),
+    cursor: Optional[str] = Query(default=None, description="分页游标（优先于 offset）"),
+    extensions: Optional[List[str]] = Query(default=None, description="扩展名过滤"),
+    min_size: Optional[int] = Query(default=None, ge=0, description="最小文件大小（字节）"),
+    max_size: Optional[int] = Query(default=None, ge=0, description="最大文件大小（字节）"),
+    modified_after: Optional[datetime] = Query(default=None, description="修改时间下限"),
+    modified_before: Optional[datetime] = Query(default=None, description="修改时间上限"),
+    name: Optional[str] = Query(default=None, description="文件名通配符，如 *.pdf"),
+    sort_by: str = Query(default="path", description="排序字段 (path/name/extension/size/modified_time/created_time)"),
+    order: str = Query(default="asc", description="排序方向 (asc/desc)"),
+):
     """获取扫描结果"""
     service = get_scan_service()
-    result = service.get_scan_result(scan_id)
+    try:
+        result = await run_blocking(
+            "io",
+            service.query_scan_files,
+            scan_id,
+            offset=offset,
+            limit=limit,
+            cursor=cursor,
+            extensions=extensions,
+            min_size=min_size,
+            max_size=max_size,
+            modified_after=modified_after,
+            modified_before=modified_before,
+            name_pattern=name,
+            sort_by=sort_by,
+            order=order,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     if not result:
         raise HTTPException(status_code=404, detail=f"扫描结果不存在: {scan_id}")
     
-    # 重新构建响应
-    from ..models.responses import FileInfoResponse, ScanStatsResponse
-    from datetime import datetime
-    
-    files = result.get("files", [])
-    file_responses = []
-    for f in files:
-        file_responses.append(FileInfoResponse(
-            path=f.path,
-            name=f.name,
-            extension=f.extension,
-            size=f.size,
-            size_human=f.size_human,
-            created_time=f.created_time,
-            modified_time=f.modified_time,
-            metadata=f.metadata,
-            content_sample=f.content_sample,
-        ))
-    
-    # 简单统计
-    total_size = sum(f.size for f in files)
-    size = total_size
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size < 1024.0:
-            total_size_human = f"{size:.2f} {unit}"
-            break
-        size /= 1024.0
-    else:
-        total_size_human = f"{size:.2f} TB"
-    
-    return ScanResponse(
+    return ScanPageResponse(
         scan_id=scan_id,
-        directory=result.get("directory", ""),
-        total_files=len(files),
-        files=file_responses,
-        stats=ScanStatsResponse(
-            total_size=total_size,
-            total_size_human=total_size_human,
-            by_extension={},
-            by_category={},
-        ),
-        timestamp=result.get("timestamp", datetime.now()),
+        directory=result["directory"],
+        total_files=result["total_files"],
+        files=result["files"],
+        stats=ScanStatsResponse(**result["stats"]),
+        timestamp=result["timestamp"] or datetime.now(),
+        total_matched=result["total_matched"],
+        offset=result["offset"],
+        limit=result["limit"],
+        next_cursor=result["next_cursor"],
     )
 
 
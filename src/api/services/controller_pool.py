@@ -0,0 +1,128 @@
+"""
+控制器池 - 复用控制器及其 AI 客户端、HTTP 连接和安全组件
+"""
+
+from collections import defaultdict
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ...core.controller import Controller
+from ...utils.config import ConfigManager
+
+
+# 池键：(配置对象, 配置版本, AI提供商, 是否Agent模式)
+PoolKey = Tuple[int, int, str, bool]
+
+
+class ControllerPool:
+    """控制器池 - 按提供商和配置版本缓存空闲控制器，每次借出独占使用"""
+
+    def __init__(self, max_idle_per_key: int = 4):
+        """
+        初始化控制器池
+
+        Args:
+            max_idle_per_key: 每个池键最多保留的空闲控制器数
+        """
+        self.max_idle_per_key = max_idle_per_key
+        self._idle: Dict[PoolKey, List[Controller]] = defaultdict(list)
+        self._lock = Lock()
+        self._created = 0
+        self._reused = 0
+
+    @staticmethod
+    def _make_key(config: ConfigManager, provider: str, use_agent: bool) -> PoolKey:
+        """生成池键"""
+        return (id(config), config.version, provider, use_agent)
+
+    @contextmanager
+    def acquire(
+        self,
+        config: ConfigManager,
+        ai_provider: Optional[str] = None,
+        use_agent: bool = True,
+    ) -> Iterator[Controller]:
+        """
+        借出控制器，使用完毕后自动归还
+
+        配置变更（版本号变化）后旧的空闲控制器会被丢弃。控制器在借出期间
+        由调用方独占，归还前会清除会话状态。
+
+        Args:
+            config: 配置管理器
+            ai_provider: AI提供商（如不指定则使用配置中的默认值）
+            use_agent: 是否使用Agent模式
+
+        Yields:
+            控制器
+        """
+        provider = ai_provider or config.get_default_provider()
+        key = self._make_key(config, provider, use_agent)
+
+        controller = self._take_idle(key)
+        if controller is None:
+            controller = Controller(
+                config=config,
+                ai_provider=provider,
+                use_agent=use_agent
+            )
+            with self._lock:
+                self._created += 1
+
+        # 出错时不归还：控制器可能处于不一致状态
+        yield controller
+        self._release(key, controller)
+
+    def _take_idle(self, key: PoolKey) -> Optional[Controller]:
+        """取出一个空闲控制器，同时清理过期版本"""
+        with self._lock:
+            stale = [
+                k for k in self._idle
+                if k[0] == key[0] and k[1] != key[1]
+            ]
+            for k in stale:
+                del self._idle[k]
+
+            idle = self._idle.get(key)
+            if idle:
+                self._reused += 1
+                return idle.pop()
+        return None
+
+    def _release(self, key: PoolKey, controller: Controller):
+        """归还控制器"""
+        controller.reset_session()
+        with self._lock:
+            idle = self._idle[key]
+            if len(idle) < self.max_idle_per_key:
+                idle.append(controller)
+
+    def stats(self) -> Dict[str, int]:
+        """获取控制器池状态"""
+        with self._lock:
+            return {
+                "idle": sum(len(v) for v in self._idle.values()),
+                "keys": len(self._idle),
+                "created": self._created,
+                "reused": self._reused,
+            }
+
+    def clear(self):
+        """清空所有空闲控制器"""
+        with self._lock:
+            self._idle.clear()
+
+
+# 全局控制器池实例
+_controller_pool: Optional[ControllerPool] = None
+
+
+def get_controller_pool() -> ControllerPool:
+    """获取控制器池单例"""
+    global _controller_pool
+    if _controller_pool is None:
+        _controller_pool = ControllerPool(
+            max_idle_per_key=ConfigManager().get('api.controller_pool.max_idle_per_key', 4)
+        )
+    return _controller_pool
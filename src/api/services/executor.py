@@ -0,0 +1,111 @@
+"""
+执行层 - 将阻塞的扫描、AI 和文件系统调用移出事件循环
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from ...utils.config import ConfigManager
+
+
+# 默认执行池配置：max_workers 为线程数，max_concurrency 为同时执行的请求数上限
+DEFAULT_POOLS: Dict[str, Dict[str, int]] = {
+    "scan": {"max_workers": 4, "max_concurrency": 2},
+    "ai": {"max_workers": 8, "max_concurrency": 4},
+    "io": {"max_workers": 4, "max_concurrency": 4},
+}
+
+
+class BlockingExecutor:
+    """阻塞任务执行器 - 按类别划分线程池，并限制每类任务的并发数"""
+
+    def __init__(self, config: Optional[ConfigManager] = None):
+        self._config = config or ConfigManager()
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _pool_config(self, pool: str) -> Dict[str, int]:
+        """获取执行池配置"""
+        if pool not in DEFAULT_POOLS:
+            raise ValueError(f"未知的执行池: {pool}")
+
+        pool_config = dict(DEFAULT_POOLS[pool])
+        pool_config.update(self._config.get(f"api.executors.{pool}", {}) or {})
+        return pool_config
+
+    def _get_executor(self, pool: str) -> ThreadPoolExecutor:
+        """获取（或创建）线程池"""
+        if pool not in self._executors:
+            self._executors[pool] = ThreadPoolExecutor(
+                max_workers=self._pool_config(pool)["max_workers"],
+                thread_name_prefix=f"smart-tidy-{pool}",
+            )
+        return self._executors[pool]
+
+    def _get_semaphore(self, pool: str) -> asyncio.Semaphore:
+        """获取（或创建）并发限制信号量"""
+        if pool not in self._semaphores:
+            self._semaphores[pool] = asyncio.Semaphore(
+                self._pool_config(pool)["max_concurrency"]
+            )
+        return self._semaphores[pool]
+
+    async def run(self, pool: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        在指定执行池中运行阻塞函数
+
+        Args:
+            pool: 执行池名称（scan/ai/io）
+            func: 阻塞函数
+            *args, **kwargs: 函数参数
+
+        Returns:
+            函数返回值
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor(pool)
+
+        async with self._get_semaphore(pool):
+            return await loop.run_in_executor(
+                executor, functools.partial(func, *args, **kwargs)
+            )
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """获取各执行池的状态"""
+        stats = {}
+        for pool in DEFAULT_POOLS:
+            pool_config = self._pool_config(pool)
+            semaphore = self._semaphores.get(pool)
+            available = semaphore._value if semaphore else pool_config["max_concurrency"]
+            stats[pool] = {
+                "max_workers": pool_config["max_workers"],
+                "max_concurrency": pool_config["max_concurrency"],
+                "active": pool_config["max_concurrency"] - available,
+            }
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        """关闭所有线程池"""
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait)
+        self._executors.clear()
+        self._semaphores.clear()
+
+
+# 全局执行器实例
+_executor: Optional[BlockingExecutor] = None
+
+
+def get_executor() -> BlockingExecutor:
+    """获取执行器单例"""
+    global _executor
+    if _executor is None:
+        _executor = BlockingExecutor()
+    return _executor
+
+
+async def run_blocking(pool: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """在全局执行器的指定执行池中运行阻塞函数"""
+    return await get_executor().run(pool, func, *args, **kwargs)
@@ -3,10 +3,11 @@
 """
 
 import asyncio
+import functools
+import time
 from typing import Dict, List, Optional, Any, Callable
 from datetime import datetime
 
-from ...core.controller import Controller
 from ...core.file_operator import FileOperator
 from ...models import FileInfo, Operation, OperationResult, OperationType
 from ...utils.config import ConfigManager
@@ -18,6 +19,8 @@ from ..models.responses import (
 )
 from .task_manager import TaskManager, TaskStatus, get_task_manager
 from .scan_service import get_scan_service
+from .executor import run_blocking
+from .controller_pool import get_controller_pool
 
 
 class OrganizeService:
@@ -27,6 +30,7 @@ class OrganizeService:
         self._config = ConfigManager()
         self._task_manager = get_task_manager()
         self._scan_service = get_scan_service()
+        self._controller_pool = get_controller_pool()
     
     def _operation_to_response(self, op: Operation) -> OperationResponse:
         """转换 Operation 为响应模型"""
@@ -86,15 +90,9 @@ class OrganizeService:
         if not files:
             raise ValueError(f"扫描结果不存在: {scan_id}")
         
-        # 创建控制器
-        controller = Controller(
-            config=self._config,
-            ai_provider=ai_provider,
-            use_agent=False  # 生成方案时不使用Agent
-        )
-        
-        # 生成方案
-        operations = controller.generate_plan(files, user_request)
+        # 生成方案（生成方案时不使用Agent）
+        with self._controller_pool.acquire(self._config, ai_provider, use_agent=False) as controller:
+            operations = controller.generate_plan(files, user_request)
         
         return [self._operation_to_response(op) for op in operations]
     
@@ -125,16 +123,10 @@ class OrganizeService:
         # 转换操作
         ops = [self._operation_model_to_operation(m) for m in operations]
         
-        # 创建控制器
-        controller = Controller(
-            config=self._config,
-            ai_provider=ai_provider,
-            use_agent=False
-        )
-        controller.current_files = files
-        
         # 优化方案
-        refined_ops = controller.refine_plan(ops, feedback)
+        with self._controller_pool.acquire(self._config, ai_provider, use_agent=False) as controller:
+            controller.current_files = files
+            refined_ops = controller.refine_plan(ops, feedback)
         
         return [self._operation_to_response(op) for op in refined_ops]
     
@@ -143,6 +135,7 @@ class OrganizeService:
         operations: List[OperationModel],
         create_backup: bool = True,
         progress_callback: Optional[Callable[[int, str, str], None]] = None,
+        user_request: Optional[str] = None,
     ) -> OperationResultResponse:
         """
         执行操作
@@ -151,6 +144,7 @@ class OrganizeService:
             operations: 操作列表
             create_backup: 是否创建备份
             progress_callback: 进度回调 (progress, current_file, message)
+            user_request: 生成这些操作的用户需求
         
         Returns:
             操作结果
@@ -158,21 +152,36 @@ class OrganizeService:
         # 转换操作
         ops = [self._operation_model_to_operation(m) for m in operations]
         
-        # 创建控制器
-        controller = Controller(
-            config=self._config,
-            use_agent=False
-        )
-        
         # 执行操作
-        result = controller.execute_operations(ops, create_backup=create_backup)
+        result = await run_blocking(
+            "io", self._run_operations, ops, create_backup, None, True, user_request
+        )
         
         return self._result_to_response(result)
     
+    def _run_operations(
+        self,
+        ops: List[Operation],
+        create_backup: bool,
+        progress_callback: Optional[Callable[[int, int, Operation], None]] = None,
+        strict: bool = True,
+        user_request: Optional[str] = None,
+    ) -> OperationResult:
+        """在工作线程中借出控制器并执行操作（池中的控制器不知道方案对应的需求，需由调用方传入）"""
+        with self._controller_pool.acquire(self._config, use_agent=False) as controller:
+            return controller.execute_operations(
+                ops,
+                create_backup=create_backup,
+                progress_callback=progress_callback,
+                strict=strict,
+                user_request=user_request,
+            )
+    
     def execute_operations_async(
         self,
         operations: List[OperationModel],
         create_backup: bool = True,
+        user_request: Optional[str] = None,
     ) -> str:
         """
         异步执行操作
@@ -180,6 +189,7 @@ class OrganizeService:
         Args:
             operations: 操作列表
             create_backup: 是否创建备份
+            user_request: 生成这些操作的用户需求
         
         Returns:
             任务ID
@@ -191,7 +201,7 @@ class OrganizeService:
         
         # 启动后台任务
         asyncio.create_task(
-            self._execute_task(task_id, operations, create_backup)
+            self._execute_task(task_id, operations, create_backup, user_request)
         )
         
         return task_id
@@ -201,8 +211,9 @@ class OrganizeService:
         task_id: str,
         operations: List[OperationModel],
         create_backup: bool,
+        user_request: Optional[str] = None,
     ):
-        """执行任务"""
+        """执行任务（整批在线程池中执行，进度通过节流回调上报）"""
         try:
             self._task_manager.update_task(
                 task_id,
@@ -212,64 +223,27 @@ class OrganizeService:
             
             # 转换操作
             ops = [self._operation_model_to_operation(m) for m in operations]
-            total = len(ops)
             
-            # 创建控制器
-            controller = Controller(
-                config=self._config,
-                use_agent=False
+            progress_callback = self._make_progress_callback(
+                task_id, asyncio.get_running_loop()
             )
             
-            # 逐个执行并更新进度
-            success_count = 0
-            failed_count = 0
-            errors = []
-            
-            for i, op in enumerate(ops):
-                try:
-                    # 更新进度
-                    progress = int((i / total) * 100)
-                    self._task_manager.update_task(
-                        task_id,
-                        progress=progress,
-                        current_file=op.source,
-                        message=f"处理中: {op.source}"
-                    )
-                    
-                    # 执行单个操作
-                    single_result = controller.execute_operations([op], create_backup=create_backup and i == 0)
-                    
-                    if single_result.success_count > 0:
-                        success_count += 1
-                    else:
-                        failed_count += 1
-                        if single_result.errors:
-                            errors.extend(single_result.errors)
-                    
-                    # 短暂延迟以便前端接收更新
-                    await asyncio.sleep(0.1)
-                    
-                except Exception as e:
-                    failed_count += 1
-                    errors.append(f"{op.source}: {str(e)}")
-            
-            # 构建结果
-            result = OperationResultResponse(
-                total=total,
-                success_count=success_count,
-                failed_count=failed_count,
-                skipped_count=0,
-                success_rate=success_count / total if total > 0 else 0,
-                operations=[self._operation_to_response(self._operation_model_to_operation(m)) for m in operations],
-                errors=errors,
-                duration=0.0,
+            # 整批执行：只验证、备份、写日志一次；失败的操作单独计入结果
+            result = await run_blocking(
+                "io",
+                self._run_operations,
+                ops,
+                create_backup,
+                progress_callback,
+                False,
+                user_request,
             )
             
             self._task_manager.update_task(
                 task_id,
                 status=TaskStatus.COMPLETED,
                 progress=100,
-                result=result.model_dump(),
+                result=self._result_to_response(result).model_dump(),
                 message="执行完成"
             )
             
@@ -281,6 +255,44 @@ class OrganizeService:
                 message=f"执行失败: {str(e)}"
             )
     
+    def _make_progress_callback(
+        self,
+        task_id: str,
+        loop: asyncio.AbstractEventLoop,
+    ) -> Callable[[int, int, Operation], None]:
+        """
+        创建节流的进度回调
+        
+        回调在工作线程中被调用，按时间间隔节流后切回事件循环更新任务状态，
+        避免每个操作都产生一次推送。
+        
+        Args:
+            task_id: 任务ID
+            loop: 事件循环
+        
+        Returns:
+            进度回调 (已完成数, 总数, 当前操作)
+        """
+        min_interval = self._config.get('file_operations.progress_interval', 0.2)
+        last_report = [0.0]
+        
+        def callback(done: int, total: int, op: Operation):
+            now = time.monotonic()
+            if done < total and now - last_report[0] < min_interval:
+                return
+            last_report[0] = now
+            
+            progress = int((done / total) * 100) if total > 0 else 100
+            loop.call_soon_threadsafe(functools.partial(
+                self._task_manager.update_task,
+                task_id,
+                progress=min(progress, 99),
+                current_file=op.source,
+                message=f"处理中: {done}/{total}",
+            ))
+        
+        return callback
+    
     def organize_with_agent(
         self,
         directory: str,
@@ -329,21 +341,15 @@ class OrganizeService:
                 message="Agent 正在分析..."
             )
             
-            # 创建控制器
-            controller = Controller(
-                config=self._config,
-                ai_provider=ai_provider,
-                use_agent=True
-            )
-            
-            # 更新配置
-            if dry_run:
-                self._config.set('langchain.tools.file_operator.dry_run', True)
-            
-            # 执行Agent
-            result = controller.organize_with_agent(
-                directory=directory,
-                user_request=user_request
+            # 借出控制器并执行Agent（LLM调用和文件操作均为阻塞调用）
+            # 模拟执行按次传入，不修改共享配置（修改配置会使控制器池中的控制器全部失效）
+            result = await run_blocking(
+                "ai",
+                self._run_agent,
+                directory,
+                user_request,
+                ai_provider,
+                dry_run,
             )
             
             self._task_manager.update_task(
@@ -362,6 +368,21 @@ class OrganizeService:
                 message=f"Agent 执行失败: {str(e)}"
             )
     
+    def _run_agent(
+        self,
+        directory: str,
+        user_request: str,
+        ai_provider: Optional[str],
+        dry_run: bool = False,
+    ) -> Dict[str, Any]:
+        """在工作线程中借出控制器并执行Agent（未要求模拟执行时沿用配置中的设置）"""
+        with self._controller_pool.acquire(self._config, ai_provider, use_agent=True) as controller:
+            return controller.organize_with_agent(
+                directory=directory,
+                user_request=user_request,
+                dry_run=True if dry_run else None,
+            )
+    
     def get_task_status(self, task_id: str) -> Optional[TaskResponse]:
         """获取任务状态"""
         task = self._task_manager.get_task(task_id)
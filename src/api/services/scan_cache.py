@@ -0,0 +1,287 @@
+"""
+扫描结果缓存 - 按内存预算进行 LRU 淘汰，被淘汰的结果溢写到磁盘
+"""
+
+import gzip
+import json
+import os
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from ...models import FileInfo
+
+
+# 每个 FileInfo 对象的固定开销估算（字节）
+_FILE_INFO_OVERHEAD = 600
+
+
+def estimate_files_size(files: List[FileInfo]) -> int:
+    """估算文件列表占用的内存（字节）"""
+    total = 0
+    for f in files:
+        total += _FILE_INFO_OVERHEAD + 2 * (len(f.path) + len(f.name) + len(f.extension))
+        if f.content_sample:
+            total += 2 * len(f.content_sample)
+        if f.metadata:
+            total += 2 * len(json.dumps(f.metadata, ensure_ascii=False, default=str))
+    return total
+
+
+class ScanCache:
+    """
+    扫描结果缓存 - 内存中保留最近使用的结果，超出预算时溢写到磁盘
+
+    溢写（序列化、压缩）和重新加载（解压、解析）在锁外进行，锁内只更新索引和重命名文件。
+    单个超出预算的结果始终保存在磁盘上，另外在内存中保留最近使用的一个，避免每次读取都重新解析。
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int = 512 * 1024 * 1024,
+        spill_dir: str = "data/scan_cache",
+    ):
+        """
+        初始化扫描结果缓存
+
+        Args:
+            max_memory_bytes: 内存预算（字节）
+            spill_dir: 溢写目录
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.spill_dir = Path(spill_dir)
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._memory_bytes = 0
+        # 正在溢写的结果（写入完成前仍可读取）
+        self._spilling: Dict[str, Dict[str, Any]] = {}
+        # 最近使用的超出预算的结果
+        self._oversized: Optional[Tuple[str, Dict[str, Any]]] = None
+        self._lock = Lock()
+
+    @property
+    def memory_bytes(self) -> int:
+        """当前内存占用估算（字节）"""
+        return self._memory_bytes
+
+    def _spill_path(self, scan_id: str) -> Path:
+        """获取溢写文件路径"""
+        return self.spill_dir / f"{scan_id}.json.gz"
+
+    def put(self, scan_id: str, entry: Dict[str, Any]):
+        """
+        缓存扫描结果
+
+        Args:
+            scan_id: 扫描ID
+            entry: 扫描结果，必须包含 files（List[FileInfo]）和 timestamp（datetime）
+        """
+        entry = dict(entry)
+        entry["size_bytes"] = estimate_files_size(entry.get("files", []))
+
+        with self._lock:
+            self._remove_locked(scan_id)
+            if entry["size_bytes"] > self.max_memory_bytes:
+                # 单个结果超出预算时直接溢写，不挤占其他结果
+                self._oversized = (scan_id, entry)
+                self._spilling[scan_id] = entry
+                evicted = [(scan_id, entry)]
+            else:
+                self._entries[scan_id] = entry
+                self._memory_bytes += entry["size_bytes"]
+                evicted = self._enforce_budget_locked()
+
+        self._spill_all(evicted)
+
+    def get(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取扫描结果（内存未命中时从磁盘重新加载）
+
+        Args:
+            scan_id: 扫描ID
+
+        Returns:
+            扫描结果，不存在时返回 None
+        """
+        with self._lock:
+            entry = self._lookup_locked(scan_id)
+            if entry is not None:
+                return entry
+
+        loaded = self._load_spilled(scan_id)
+        if loaded is None:
+            return None
+
+        with self._lock:
+            # 加载期间其他线程可能已载入或删除该结果
+            entry = self._lookup_locked(scan_id)
+            if entry is not None:
+                return entry
+            if not self._spill_path(scan_id).exists():
+                return None
+
+            if loaded["size_bytes"] > self.max_memory_bytes:
+                self._oversized = (scan_id, loaded)
+                return loaded
+
+            # 重新载入内存（可能导致其他结果被溢写）
+            self._spill_path(scan_id).unlink(missing_ok=True)
+            self._entries[scan_id] = loaded
+            self._memory_bytes += loaded["size_bytes"]
+            evicted = self._enforce_budget_locked()
+
+        self._spill_all(evicted)
+        return loaded
+
+    def delete(self, scan_id: str):
+        """删除扫描结果（内存和磁盘）"""
+        with self._lock:
+            self._remove_locked(scan_id)
+
+    def expire(self, max_age_seconds: float) -> int:
+        """
+        清理超过存活时间的扫描结果
+
+        Args:
+            max_age_seconds: 最大存活时间（秒）
+
+        Returns:
+            清理的数量
+        """
+        now = datetime.now()
+        removed = 0
+
+        with self._lock:
+            expired = [
+                scan_id for scan_id, entry in self._entries.items()
+                if (now - entry["timestamp"]).total_seconds() > max_age_seconds
+            ]
+            for scan_id in expired:
+                self._remove_locked(scan_id)
+            removed += len(expired)
+
+            # 溢写文件的修改时间即扫描时间
+            cutoff = now.timestamp() - max_age_seconds
+            for spill_file in self.spill_dir.glob("*.json.gz"):
+                try:
+                    if spill_file.stat().st_mtime < cutoff:
+                        self._remove_locked(spill_file.name[:-len(".json.gz")])
+                        removed += 1
+                except OSError:
+                    continue
+
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        """获取缓存状态"""
+        with self._lock:
+            return {
+                "memory_entries": len(self._entries),
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "spilled_entries": len(list(self.spill_dir.glob("*.json.gz"))),
+                "oversized_loaded": int(self._oversized is not None),
+            }
+
+    def _lookup_locked(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        """在内存、正在溢写的结果和最近使用的超大结果中查找（调用方需持有锁）"""
+        entry = self._entries.get(scan_id)
+        if entry is not None:
+            self._entries.move_to_end(scan_id)
+            return entry
+        entry = self._spilling.get(scan_id)
+        if entry is not None:
+            return entry
+        if self._oversized is not None and self._oversized[0] == scan_id:
+            return self._oversized[1]
+        return None
+
+    def _remove_locked(self, scan_id: str):
+        """移除扫描结果（调用方需持有锁）"""
+        entry = self._entries.pop(scan_id, None)
+        if entry is not None:
+            self._memory_bytes -= entry["size_bytes"]
+        self._spilling.pop(scan_id, None)
+        if self._oversized is not None and self._oversized[0] == scan_id:
+            self._oversized = None
+        self._spill_path(scan_id).unlink(missing_ok=True)
+
+    def _enforce_budget_locked(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        按LRU顺序移出结果，直到满足内存预算（调用方需持有锁）
+
+        Returns:
+            需要溢写的结果（调用方在锁外调用 _spill_all）
+        """
+        evicted = []
+        while self._memory_bytes > self.max_memory_bytes and self._entries:
+            scan_id, entry = self._entries.popitem(last=False)
+            self._memory_bytes -= entry["size_bytes"]
+            self._spilling[scan_id] = entry
+            evicted.append((scan_id, entry))
+        return evicted
+
+    def _spill_all(self, evicted: List[Tuple[str, Dict[str, Any]]]):
+        """在锁外写入溢写文件，写完后在锁内换入正式路径（期间被删除或替换的结果丢弃）"""
+        for scan_id, entry in evicted:
+            try:
+                tmp_path = self._write_spill(scan_id, entry)
+            except Exception as e:
+                print(f"扫描结果溢写失败 {scan_id}: {e}")
+                with self._lock:
+                    if self._spilling.get(scan_id) is entry:
+                        del self._spilling[scan_id]
+                continue
+
+            with self._lock:
+                if self._spilling.get(scan_id) is entry:
+                    del self._spilling[scan_id]
+                    os.replace(tmp_path, self._spill_path(scan_id))
+                    continue
+            tmp_path.unlink(missing_ok=True)
+
+    def _write_spill(self, scan_id: str, entry: Dict[str, Any]) -> Path:
+        """
+        将扫描结果写入临时文件
+
+        Returns:
+            临时文件路径
+        """
+        # 以下划线开头的键为运行时派生数据（如排序索引），不写入磁盘
+        payload = {
+            key: value for key, value in entry.items()
+            if key not in ("files", "timestamp", "size_bytes") and not key.startswith("_")
+        }
+        payload["timestamp"] = entry["timestamp"].isoformat()
+        payload["files"] = [f.model_dump(mode="json") for f in entry.get("files", [])]
+
+        tmp_path = self.spill_dir / f"{scan_id}.{uuid.uuid4().hex}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, default=str)
+
+        # 以扫描时间作为文件修改时间，供过期清理使用（重命名后保留）
+        timestamp = entry["timestamp"].timestamp()
+        os.utime(tmp_path, (timestamp, timestamp))
+        return tmp_path
+
+    def _load_spilled(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        """从磁盘加载扫描结果"""
+        spill_path = self._spill_path(scan_id)
+        if not spill_path.exists():
+            return None
+
+        try:
+            with gzip.open(spill_path, "rt", encoding="utf-8") as f:
+                payload = json.load(f)
+        except Exception as e:
+            print(f"读取溢写的扫描结果失败 {scan_id}: {e}")
+            return None
+
+        payload["timestamp"] = datetime.fromisoformat(payload["timestamp"])
+        payload["files"] = [FileInfo.model_validate(f) for f in payload.get("files", [])]
+        payload["size_bytes"] = estimate_files_size(payload["files"])
+        return payload
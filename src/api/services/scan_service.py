@@ -2,12 +2,23 @@
 扫描服务 - 封装文件扫描功能
 """
 
+import asyncio
+import base64
+import binascii
+import concurrent.futures
+import fnmatch
+import json
+import threading
 import uuid
-from typing import Dict, List, Optional, Set
+from typing import Any, AsyncGenerator, Dict, List, Optional, Set
 from datetime import datetime
 
 from ...core.file_scanner import FileScanner
 from ...models import FileInfo
+from ...utils.config import ConfigManager
+from .scan_cache import ScanCache
+from .executor import run_blocking
+from ..sse.stream import ProgressReporter
 from ..models.responses import (
     ScanResponse,
     FileInfoResponse,
@@ -15,11 +26,22 @@ from ..models.responses import (
 )
 
 
+# 支持的排序字段
+SORT_FIELDS = ("path", "name", "extension", "size", "modified_time", "created_time")
+
+# 流式扫描的事件队列长度（客户端读取过慢时扫描线程会在此等待）
+STREAM_QUEUE_SIZE = 8
+
+
 class ScanService:
     """扫描服务"""
     
     def __init__(self):
-        self._scan_cache: Dict[str, Dict] = {}
+        self._config = ConfigManager()
+        self._scan_cache = ScanCache(
+            max_memory_bytes=int(self._config.get('api.scan_cache.max_memory_mb', 512) * 1024 * 1024),
+            spill_dir=self._config.get('api.scan_cache.spill_dir', 'data/scan_cache'),
+        )
     
     def _file_info_to_response(self, file_info: FileInfo) -> FileInfoResponse:
         """转换 FileInfo 为响应模型"""
@@ -138,12 +160,13 @@ class ScanService:
         file_responses = [self._file_info_to_response(f) for f in files]
         stats = self._calculate_stats(files)
         
-        # 缓存扫描结果
-        self._scan_cache[scan_id] = {
+        # 缓存扫描结果（统计信息在扫描时一次性计算）
+        self._scan_cache.put(scan_id, {
             "directory": directory,
             "files": files,
             "timestamp": datetime.now(),
-        }
+            "stats": stats.model_dump(),
+        })
         
         return ScanResponse(
             scan_id=scan_id,
@@ -158,8 +181,269 @@ class ScanService:
         """获取缓存的扫描结果"""
         return self._scan_cache.get(scan_id)
     
+    async def stream_scan(
+        self,
+        directory: str,
+        recursive: bool = False,
+        extensions: Optional[List[str]] = None,
+        include_metadata: bool = True,
+        include_content: bool = False,
+        max_file_size_mb: int = 100,
+        max_depth: int = 5,
+        chunk_size: int = 200,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        流式扫描目录，边扫描边产生事件
+        
+        事件类型：start（扫描ID）、files（一块文件）、progress（已遍历目录数、
+        已处理文件数、速率）、complete（统计信息）、error。扫描完成后结果
+        同样写入缓存，可通过扫描ID继续使用。
+        
+        Args:
+            directory: 目录路径
+            recursive: 是否递归扫描
+            extensions: 扩展名过滤
+            include_metadata: 是否包含元数据
+            include_content: 是否包含内容样本
+            max_file_size_mb: 最大文件大小限制
+            max_depth: 最大扫描深度
+            chunk_size: 每块的文件数
+        
+        Yields:
+            事件字典
+        """
+        scanner = FileScanner(
+            max_file_size_mb=max_file_size_mb,
+            max_depth=max_depth
+        )
+        
+        ext_set: Optional[Set[str]] = None
+        if extensions:
+            ext_set = set(ext if ext.startswith('.') else f'.{ext}' for ext in extensions)
+        
+        scan_id = str(uuid.uuid4())
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        reporter = ProgressReporter(total=0, queue=queue)
+        cancelled = threading.Event()
+        
+        def emit(coro) -> bool:
+            """在扫描线程中向事件队列投递消息，客户端断开时放弃"""
+            future = asyncio.run_coroutine_threadsafe(coro, loop)
+            while True:
+                try:
+                    future.result(timeout=0.5)
+                    return True
+                except concurrent.futures.TimeoutError:
+                    if cancelled.is_set():
+                        future.cancel()
+                        return False
+        
+        def on_progress(counters: Dict[str, int]):
+            reporter.total = counters['files_found']
+            emit(reporter.report(
+                current=counters['files_done'],
+                extra={'dirs_walked': counters['dirs_walked']},
+            ))
+        
+        def produce():
+            files: List[FileInfo] = []
+            try:
+                for chunk in scanner.iter_scan(
+                    directory=directory,
+                    recursive=recursive,
+                    extensions=ext_set,
+                    include_metadata=include_metadata,
+                    include_content=include_content,
+                    chunk_size=chunk_size,
+                    progress_callback=on_progress,
+                ):
+                    if cancelled.is_set():
+                        return
+                    files.extend(chunk)
+                    emit(queue.put({
+                        "type": "files",
+                        "files": [
+                            self._file_info_to_response(f).model_dump(mode="json")
+                            for f in chunk
+                        ],
+                    }))
+                
+                stats = self._calculate_stats(files)
+                self._scan_cache.put(scan_id, {
+                    "directory": directory,
+                    "files": files,
+                    "timestamp": datetime.now(),
+                    "stats": stats.model_dump(),
+                })
+                emit(reporter.complete({
+                    "scan_id": scan_id,
+                    "directory": directory,
+                    "total_files": len(files),
+                    "stats": stats.model_dump(),
+                }))
+            except Exception as e:
+                emit(reporter.error(str(e)))
+        
+        def on_producer_done(future: asyncio.Future):
+            """扫描任务未能报告结果就异常结束（如执行池拒绝任务）时补发错误事件，避免客户端一直等待"""
+            if not future.cancelled() and future.exception() is not None:
+                asyncio.ensure_future(reporter.error(str(future.exception())))
+        
+        producer = asyncio.ensure_future(run_blocking("scan", produce))
+        producer.add_done_callback(on_producer_done)
+        try:
+            yield {"type": "start", "scan_id": scan_id, "directory": directory}
+            while True:
+                event = await queue.get()
+                yield event
+                if event["type"] in ("complete", "error"):
+                    break
+            # 异常已作为错误事件发出
+            await asyncio.gather(producer, return_exceptions=True)
+        finally:
+            cancelled.set()
+    
+    def query_scan_files(
+        self,
+        scan_id: str,
+        offset: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        extensions: Optional[List[str]] = None,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        modified_after: Optional[datetime] = None,
+        modified_before: Optional[datetime] = None,
+        name_pattern: Optional[str] = None,
+        sort_by: str = "path",
+        order: str = "asc",
+    ) -> Optional[Dict[str, Any]]:
+        """
+        分页查询扫描结果中的文件
+        
+        Args:
+            scan_id: 扫描ID
+            offset: 起始位置（提供 cursor 时忽略）
+            limit: 每页数量
+            cursor: 上一页返回的游标
+            extensions: 扩展名过滤
+            min_size: 最小文件大小（字节）
+            max_size: 最大文件大小（字节）
+            modified_after: 修改时间下限
+            modified_before: 修改时间上限
+            name_pattern: 文件名通配符（不区分大小写，如 *.pdf、report_*）
+            sort_by: 排序字段
+            order: 排序方向（asc/desc）
+        
+        Returns:
+            查询结果字典，扫描结果不存在时返回 None
+        
+        Raises:
+            ValueError: 排序字段或游标无效
+        """
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"不支持的排序字段: {sort_by}")
+        if order not in ("asc", "desc"):
+            raise ValueError(f"不支持的排序方向: {order}")
+        
+        result = self._scan_cache.get(scan_id)
+        if not result:
+            return None
+        
+        if cursor:
+            offset = self._decode_cursor(cursor)
+        
+        # 文件修改时间是本地时间（不带时区），带时区的过滤条件先转换为本地时间
+        modified_after = self._to_local_naive(modified_after)
+        modified_before = self._to_local_naive(modified_before)
+        
+        files = self._sorted_files(result, sort_by)
+        if order == "desc":
+            files = files[::-1]
+        
+        ext_set: Optional[Set[str]] = None
+        if extensions:
+            ext_set = set(
+                (ext if ext.startswith('.') else f'.{ext}').lower() for ext in extensions
+            )
+        pattern = name_pattern.lower() if name_pattern else None
+        
+        def matches(f: FileInfo) -> bool:
+            if ext_set is not None and f.extension.lower() not in ext_set:
+                return False
+            if min_size is not None and f.size < min_size:
+                return False
+            if max_size is not None and f.size > max_size:
+                return False
+            if modified_after is not None and f.modified_time < modified_after:
+                return False
+            if modified_before is not None and f.modified_time > modified_before:
+                return False
+            if pattern is not None and not fnmatch.fnmatchcase(f.name.lower(), pattern):
+                return False
+            return True
+        
+        has_filter = any(v is not None for v in (
+            ext_set, min_size, max_size, modified_after, modified_before, pattern
+        ))
+        matched = [f for f in files if matches(f)] if has_filter else files
+        
+        page = matched[offset:offset + limit]
+        next_offset = offset + len(page)
+        
+        if "stats" not in result:
+            result["stats"] = self._calculate_stats(result.get("files", [])).model_dump()
+        
+        return {
+            "directory": result.get("directory", ""),
+            "timestamp": result.get("timestamp"),
+            "total_files": len(result.get("files", [])),
+            "total_matched": len(matched),
+            "files": [self._file_info_to_response(f) for f in page],
+            "stats": result["stats"],
+            "offset": offset,
+            "limit": limit,
+            "next_cursor": self._encode_cursor(next_offset) if next_offset < len(matched) else None,
+        }
+    
+    def _sorted_files(self, result: Dict, sort_by: str) -> List[FileInfo]:
+        """获取按指定字段升序排列的文件列表（按扫描结果缓存排序索引）"""
+        sort_index = result.setdefault("_sort_index", {})
+        if sort_by not in sort_index:
+            sort_index[sort_by] = sorted(
+                result.get("files", []),
+                key=lambda f: (getattr(f, sort_by), f.path)
+            )
+        return sort_index[sort_by]
+    
+    @staticmethod
+    def _to_local_naive(value: Optional[datetime]) -> Optional[datetime]:
+        """将带时区的时间转换为不带时区的本地时间"""
+        if value is None or value.tzinfo is None:
+            return value
+        return value.astimezone().replace(tzinfo=None)
+    
+    @staticmethod
+    def _encode_cursor(offset: int) -> str:
+        """生成分页游标"""
+        raw = json.dumps({"offset": offset}).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii")
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> int:
+        """解析分页游标"""
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            offset = int(data["offset"])
+        except (binascii.Error, ValueError, KeyError, TypeError, UnicodeEncodeError):
+            raise ValueError(f"无效的分页游标: {cursor}")
+        if offset < 0:
+            raise ValueError(f"无效的分页游标: {cursor}")
+        return offset
+    
     def get_scan_files(self, scan_id: str) -> Optional[List[FileInfo]]:
-        """获取扫描结果中的文件列表"""
+        """获取扫描结果中的文件列表（已溢写到磁盘的结果会被重新加载）"""
         result = self._scan_cache.get(scan_id)
         if result:
             return result.get("files")
@@ -167,20 +451,25 @@ class ScanService:
     
     def delete_scan_result(self, scan_id: str):
         """删除扫描结果缓存"""
-        if scan_id in self._scan_cache:
-            del self._scan_cache[scan_id]
+        self._scan_cache.delete(scan_id)
+    
+    def cleanup_old_scans(self, max_age_hours: Optional[float] = None) -> int:
+        """
+        清理旧的扫描缓存（包括已溢写到磁盘的结果）
+        
+        Args:
+            max_age_hours: 最大保留时间（小时），默认读取 api.scan_cache.ttl_hours
+        
+        Returns:
+            清理的数量
+        """
+        if max_age_hours is None:
+            max_age_hours = self._config.get('api.scan_cache.ttl_hours', 1)
+        return self._scan_cache.expire(max_age_hours * 3600)
     
-    def cleanup_old_scans(self, max_age_hours: int = 1):
-        """清理旧的扫描缓存"""
-        now = datetime.now()
-        to_delete = []
-        for scan_id, data in self._scan_cache.items():
-            age = (now - data["timestamp"]).total_seconds() / 3600
-            if age > max_age_hours:
-                to_delete.append(scan_id)
-        
-        for scan_id in to_delete:
-            self.delete_scan_result(scan_id)
+    def get_cache_stats(self) -> Dict[str, int]:
+        """获取扫描缓存状态"""
+        return self._scan_cache.stats()
 
 
 # 全局扫描服务实例
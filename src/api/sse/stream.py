@@ -106,6 +106,7 @@ class ProgressReporter:
         current: Optional[int] = None,
         message: Optional[str] = None,
         current_item: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None,
     ):
         """报告进度"""
         if current is not None:
@@ -122,6 +123,7 @@ class ProgressReporter:
             "current": self.current,
             "total": self.total,
             "elapsed": elapsed,
+            "rate": self.current / elapsed if elapsed > 0 else 0.0,
         }
         
         if message:
@@ -130,6 +132,9 @@ class ProgressReporter:
         if current_item:
             data["current_item"] = current_item
         
+        if extra:
+            data.update(extra)
+        
         await self.queue.put(data)
     
     async def complete(self, result: Any = None):
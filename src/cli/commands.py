@@ -114,6 +114,15 @@ def organize_command(
                 for error in result.errors:
                     console.print(f"  • {error}")
         else:
+            simulation = controller.simulate_operations(operations)
+            if simulation['conflicts']:
+                console.print("\n[yellow]方案内冲突（将自动重命名）：[/yellow]")
+                for conflict in simulation['conflicts']:
+                    console.print(f"  • {conflict['target']} -> {conflict['resolved_target']}")
+            if simulation['errors']:
+                console.print("\n[red]模拟执行失败的操作：[/red]")
+                for error in simulation['errors']:
+                    console.print(f"  • {error['source']}: {error['error']}")
             console.print("\n[yellow]预览模式 - 未实际执行[/yellow]")
     
     except Exception as e:
@@ -315,6 +324,45 @@ def history_command(limit: int):
         console.print(f"[red]错误: {str(e)}[/red]")
 
 
+def rules_command(clear: bool, clear_history: bool, confirm: bool):
+    """学习规则命令：查看或清除从反馈中学习的规则和保存的对话历史"""
+    from ..core.rule_store import RuleStore
+    
+    try:
+        config = ConfigManager()
+        store = RuleStore(db_path=config.get_data_path('ai.rule_store.db_path', 'rules/rules.db'))
+        rules = store.load_rules()
+        
+        if rules:
+            table = Table(title=f"学习到的规则（{len(rules)} 条）")
+            table.add_column("ID", style="cyan")
+            table.add_column("动作", style="magenta")
+            table.add_column("说明", style="green")
+            for rule in rules:
+                table.add_row(rule.id, rule.action.value, rule.description)
+            console.print(table)
+        else:
+            console.print("[yellow]没有学习到的规则[/yellow]")
+        console.print(f"规则存储: {store.db_path}")
+        
+        if not clear and not clear_history:
+            return
+        
+        targets = (["学习到的规则"] if clear else []) + (["对话历史"] if clear_history else [])
+        if not confirm and not Confirm.ask(f"\n确定要清除{'和'.join(targets)}吗？"):
+            console.print("[yellow]已取消[/yellow]")
+            return
+        
+        if clear:
+            store.clear_rules()
+        if clear_history:
+            store.clear_history()
+        console.print(f"[green]✓ 已清除{'和'.join(targets)}[/green]")
+    
+    except Exception as e:
+        console.print(f"[red]错误: {str(e)}[/red]")
+
+
 def display_operations_table(operations: list):
     """显示操作表格"""
     table = Table()
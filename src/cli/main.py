@@ -12,6 +12,7 @@ from .commands import (
     interactive_command,
     undo_command,
     history_command,
+    rules_command,
     organize_agent_command,
     suggest_command,
     analyze_file_command,
@@ -84,6 +85,16 @@ def history(
     history_command(limit=limit)
 
 
+@app.command("rules")
+def rules(
+    clear: bool = typer.Option(False, "--clear", help="清除所有学习到的规则"),
+    clear_history: bool = typer.Option(False, "--clear-history", help="清除保存的对话历史"),
+    confirm: bool = typer.Option(False, "--yes", "-y", help="跳过确认")
+):
+    """查看或清除从反馈中学习的规则"""
+    rules_command(clear=clear, clear_history=clear_history, confirm=confirm)
+
+
 @app.command("agent")
 def agent_organize(
     directory: str = typer.Argument(..., help="要整理的目录路径"),
@@ -126,6 +137,34 @@ def chat(
     chat_command(provider=provider)
 
 
+@app.command("mock-llm")
+def mock_llm(
+    host: str = typer.Option("127.0.0.1", "--host", help="监听地址"),
+    port: int = typer.Option(8900, "--port", help="监听端口"),
+    latency_ms: float = typer.Option(0, "--latency-ms", help="每次请求的固定延迟（毫秒）"),
+    jitter_ms: float = typer.Option(0, "--jitter-ms", help="随机附加延迟上限（毫秒）"),
+    tokens_per_second: float = typer.Option(0, "--tokens-per-second", help="输出速度（token/秒）"),
+    error_rate: float = typer.Option(0, "--error-rate", help="请求失败的概率（0-1）"),
+    seed: int = typer.Option(0, "--seed", help="随机数种子"),
+    script: Optional[Path] = typer.Option(None, "--script", help="ReAct脚本文件（JSON/YAML）"),
+):
+    """启动模拟LLM服务（OpenAI/Ollama兼容，用于离线压测）"""
+    from ..mock_llm import MockLLMSettings, load_react_script, run_mock_server
+
+    settings = MockLLMSettings(
+        latency_ms=latency_ms,
+        latency_jitter_ms=jitter_ms,
+        tokens_per_second=tokens_per_second,
+        error_rate=error_rate,
+        seed=seed,
+        react_script=load_react_script(str(script)) if script else [],
+    )
+    console.print(f"[bold green]模拟LLM服务[/bold green] http://{host}:{port}")
+    console.print(f"  custom 提供商 base_url: http://{host}:{port}/v1")
+    console.print(f"  local 提供商 base_url: http://{host}:{port}")
+    run_mock_server(settings, host=host, port=port)
+
+
 @app.command("version")
 def version():
     """显示版本信息"""
@@ -4,5 +4,11 @@ from .file_scanner import FileScanner
 from .file_operator import FileOperator
 from .classifier import SmartClassifier
 from .controller import Controller
+from .virtual_fs import VirtualFileSystem
+from .classification_scheduler import ClassificationScheduler
+from .paper_detector import PaperPrePass
 
-__all__ = ["FileScanner", "FileOperator", "SmartClassifier", "Controller"]
+__all__ = [
+    "FileScanner", "FileOperator", "SmartClassifier", "Controller", "VirtualFileSystem",
+    "ClassificationScheduler", "PaperPrePass",
+]
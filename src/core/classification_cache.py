@@ -0,0 +1,215 @@
+"""分类结果缓存 - 持久化AI分类结果，重复整理时只为新增或变更的文件调用AI"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from threading import Lock
+from typing import List, Dict, Any, Iterable
+
+from ..models import FileInfo
+from ..utils.config import resolve_data_path
+
+
+class ClassificationCache:
+    """分类结果缓存 - 按（文件指纹, 用户需求, 已学习规则, 模型）缓存单个文件的AI分类结果"""
+
+    def __init__(
+        self,
+        db_path: str = "cache/classification.db",
+        ttl_hours: float = 168,
+        max_entries: int = 50000
+    ):
+        """
+        初始化分类结果缓存
+
+        Args:
+            db_path: SQLite数据库路径（相对路径位于用户数据目录下）
+            ttl_hours: 缓存有效期（小时）
+            max_entries: 最大缓存条目数，超出时淘汰最久未使用的条目
+        """
+        self.db_path = resolve_data_path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_entries = max_entries
+
+        self._lock = Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS classification_cache (
+                key TEXT PRIMARY KEY,
+                operations TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_accessed ON classification_cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def fingerprint(file: FileInfo) -> str:
+        """文件指纹（路径、大小、修改时间）"""
+        return f"{file.path}|{file.size}|{file.modified_time.isoformat()}"
+
+    @staticmethod
+    def normalize_request(user_request: str) -> str:
+        """规范化用户需求（忽略大小写和多余空白）"""
+        return " ".join(user_request.lower().split())
+
+    @staticmethod
+    def rules_hash(rules: Iterable[Any]) -> str:
+        """已学习规则的哈希"""
+        data = json.dumps(list(rules), ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def model_id(ai_adapter: Any) -> str:
+        """模型标识（适配器类型 + 模型名）"""
+        model = getattr(ai_adapter, 'model', None) or ''
+        return f"{type(ai_adapter).__name__}:{model}"
+
+    @classmethod
+    def make_key(
+        cls,
+        file: FileInfo,
+        user_request: str,
+        rules_hash: str,
+        model_id: str
+    ) -> str:
+        """
+        生成缓存键
+
+        Args:
+            file: 文件信息
+            user_request: 用户需求
+            rules_hash: 已学习规则的哈希
+            model_id: 模型标识
+
+        Returns:
+            缓存键
+        """
+        raw = "\n".join([
+            cls.fingerprint(file),
+            cls.normalize_request(user_request),
+            rules_hash,
+            model_id,
+        ])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        批量查询缓存
+
+        Args:
+            keys: 缓存键列表
+
+        Returns:
+            命中的缓存键 -> 操作字典列表
+        """
+        if not keys:
+            return {}
+
+        now = time.time()
+        cutoff = now - self.ttl_seconds
+        hits: Dict[str, List[Dict[str, Any]]] = {}
+
+        with self._lock:
+            # 分批查询，避免超出SQLite的参数个数限制
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, operations FROM classification_cache "
+                    f"WHERE key IN ({placeholders}) AND created_at >= ?",
+                    (*batch, cutoff)
+                ).fetchall()
+                for key, operations in rows:
+                    hits[key] = json.loads(operations)
+
+            if hits:
+                self._conn.executemany(
+                    "UPDATE classification_cache SET accessed_at = ? WHERE key = ?",
+                    [(now, key) for key in hits]
+                )
+                self._conn.commit()
+
+        return hits
+
+    def put_many(self, entries: Dict[str, List[Dict[str, Any]]]):
+        """
+        批量写入缓存
+
+        Args:
+            entries: 缓存键 -> 操作字典列表（空列表表示AI未对该文件给出操作）
+        """
+        if not entries:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO classification_cache "
+                "(key, operations, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                [
+                    (key, json.dumps(ops, ensure_ascii=False, default=str), now, now)
+                    for key, ops in entries.items()
+                ]
+            )
+            self._evict_locked(now)
+            self._conn.commit()
+
+    def evict(self) -> int:
+        """
+        清理过期和超出数量上限的条目
+
+        Returns:
+            清理的条目数
+        """
+        with self._lock:
+            removed = self._evict_locked(time.time())
+            self._conn.commit()
+        return removed
+
+    def _evict_locked(self, now: float) -> int:
+        """清理条目（调用方需持有锁）"""
+        removed = self._conn.execute(
+            "DELETE FROM classification_cache WHERE created_at < ?",
+            (now - self.ttl_seconds,)
+        ).rowcount
+
+        count = self._conn.execute("SELECT COUNT(*) FROM classification_cache").fetchone()[0]
+        if count > self.max_entries:
+            removed += self._conn.execute(
+                "DELETE FROM classification_cache WHERE key IN ("
+                "SELECT key FROM classification_cache ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,)
+            ).rowcount
+
+        return removed
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM classification_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存状态"""
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM classification_cache").fetchone()[0]
+        return {
+            'entries': count,
+            'max_entries': self.max_entries,
+            'ttl_hours': self.ttl_seconds / 3600,
+            'db_path': str(self.db_path),
+        }
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
@@ -0,0 +1,217 @@
+"""分类调度器 - 按token预算分块并发调用AI分类"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+from ..models import FileInfo
+from ..ai import BaseAIAdapter
+from ..ai.prompt_builder import PromptBuilder
+from ..ai.token_budget import PromptBudgeter
+
+
+class ClassificationScheduler:
+    """分类调度器 - 将文件切分为不超过token预算的块，并发分类后合并去重"""
+
+    def __init__(
+        self,
+        ai_adapter: BaseAIAdapter,
+        chunk_token_budget: Optional[int] = None,
+        max_files_per_chunk: int = PromptBuilder.MAX_FILES_PER_PROMPT,
+        max_concurrency: int = 4,
+        context_window: Optional[int] = None
+    ):
+        """
+        初始化分类调度器
+
+        Args:
+            ai_adapter: AI适配器实例
+            chunk_token_budget: 每块文件列表的token预算上限（为空时按模型上下文窗口自动计算）
+            max_files_per_chunk: 每块最多文件数（不超过Prompt的文件数上限）
+            max_concurrency: 同时进行的AI请求数上限
+            context_window: 模型上下文窗口大小（为空时按模型名查询）
+        """
+        self.ai_adapter = ai_adapter
+        self.chunk_token_budget = chunk_token_budget
+        self.max_concurrency = max(1, max_concurrency)
+
+        model = getattr(ai_adapter, 'model', '')
+        max_tokens = getattr(ai_adapter, 'max_tokens', None)
+        self.budgeter = PromptBudgeter(
+            model=model if isinstance(model, str) else '',
+            max_output_tokens=max_tokens if isinstance(max_tokens, int) else None,
+            context_window=context_window
+        )
+
+        # 每块的文件数同时受Prompt上限和模型输出上限约束（每个文件都要在响应中返回一个操作）
+        self.max_files_per_chunk = min(
+            max_files_per_chunk,
+            PromptBuilder.MAX_FILES_PER_PROMPT,
+            self.budgeter.max_files_by_output()
+        )
+
+    def estimate_tokens(self, file: FileInfo) -> int:
+        """计算单个文件记录在Prompt中占用的token数"""
+        # 文件ID和目录代号按最长情况计算，每行另加1个换行符
+        row = PromptBuilder.format_file_row(self.max_files_per_chunk, file, "D99")
+        return self.budgeter.count(row) + 1
+
+    def token_budget(self, user_request: str = "", context: Optional[Dict[str, Any]] = None) -> int:
+        """
+        计算每块文件列表的token预算
+
+        从模型上下文窗口中扣除输出上限、系统提示和文件列表以外的Prompt内容，
+        剩余部分全部用于文件列表；配置了预算上限时取两者较小值。
+
+        Args:
+            user_request: 用户需求
+            context: 上下文信息
+
+        Returns:
+            token预算
+        """
+        overhead = "\n".join([
+            PromptBuilder.SYSTEM_PROMPT,
+            PromptBuilder.build_classification_prompt([], user_request, context or {}),
+        ])
+        budget = self.budgeter.input_budget(overhead)
+        if self.chunk_token_budget:
+            budget = min(budget, self.chunk_token_budget)
+        return budget
+
+    def make_chunks(
+        self,
+        files: List[FileInfo],
+        token_budget: Optional[int] = None
+    ) -> List[List[FileInfo]]:
+        """
+        将文件切分为多个块
+
+        同一目录的文件尽量放在同一块中，便于AI给出一致的分类，也让目录代号表更短。
+
+        Args:
+            files: 文件列表
+            token_budget: 每块文件列表的token预算（为空时使用 token_budget() 的结果）
+
+        Returns:
+            文件块列表
+        """
+        if token_budget is None:
+            token_budget = self.token_budget()
+
+        ordered = sorted(files, key=lambda f: str(Path(f.path).parent))
+
+        chunks: List[List[FileInfo]] = []
+        current: List[FileInfo] = []
+        current_dirs: set = set()
+        current_tokens = 0
+
+        for file in ordered:
+            directory = str(Path(file.path).parent)
+            row_tokens = self.estimate_tokens(file)
+            # 新目录需要在目录代号表中占一行（按完整路径估算，偏保守）
+            dir_tokens = self.budgeter.count(directory) + 2
+            tokens = row_tokens if directory in current_dirs else row_tokens + dir_tokens
+
+            if current and (
+                current_tokens + tokens > token_budget
+                or len(current) >= self.max_files_per_chunk
+            ):
+                chunks.append(current)
+                current = []
+                current_dirs = set()
+                current_tokens = 0
+                tokens = row_tokens + dir_tokens
+
+            current.append(file)
+            current_dirs.add(directory)
+            current_tokens += tokens
+
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def classify(
+        self,
+        files: List[FileInfo],
+        user_request: str,
+        context: Dict[str, Any]
+    ) -> Tuple[List[Dict[str, Any]], List[FileInfo]]:
+        """
+        分块并发分类（使用线程池调用同步接口）
+
+        Args:
+            files: 文件列表
+            user_request: 用户需求
+            context: 上下文信息
+
+        Returns:
+            (合并去重后的操作字典列表, 分类失败的文件列表)
+        """
+        chunks = self.make_chunks(files, self.token_budget(user_request, context))
+        if not chunks:
+            return [], []
+
+        def run(chunk: List[FileInfo]):
+            try:
+                return self.ai_adapter.generate_classification(chunk, user_request, context)
+            except Exception as e:
+                return e
+
+        if len(chunks) == 1:
+            results = [run(chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(chunks))) as executor:
+                results = list(executor.map(run, chunks))
+
+        return self._collect(chunks, results)
+
+    def _collect(
+        self,
+        chunks: List[List[FileInfo]],
+        results: List[Any]
+    ) -> Tuple[List[Dict[str, Any]], List[FileInfo]]:
+        """汇总各块结果"""
+        operations: List[Dict[str, Any]] = []
+        failed: List[FileInfo] = []
+
+        for index, (chunk, result) in enumerate(zip(chunks, results), 1):
+            if isinstance(result, BaseException):
+                print(f"AI分类失败（第 {index}/{len(chunks)} 块，{len(chunk)} 个文件）: {result}")
+                failed.extend(chunk)
+                continue
+            # 响应中的文件ID和相对路径按该块的文件列表还原
+            resolved = PromptBuilder.resolve_file_refs(result, chunk)
+            operations.extend(resolved.get('operations', []))
+
+        return self.merge_operations(operations), failed
+
+    @staticmethod
+    def merge_operations(operations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        合并去重操作
+
+        同一文件的多个操作只保留置信度最高的一个；多个块重复创建的同一文件夹只保留一次。
+
+        Args:
+            operations: 操作字典列表
+
+        Returns:
+            去重后的操作字典列表（保持首次出现的顺序）
+        """
+        merged: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+        for op in operations:
+            if op.get('type') == 'create_folder':
+                key = ('create_folder', op.get('target', ''))
+            else:
+                key = ('file', op.get('file', ''))
+
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = op
+            elif op.get('confidence', 1.0) > existing.get('confidence', 1.0):
+                # 替换为置信度更高的操作，但保持原有位置
+                merged[key] = op
+
+        return list(merged.values())
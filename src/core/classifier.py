@@ -2,24 +2,73 @@
 
 import re
 from pathlib import Path
-from typing import List, Dict, Any
-from ..models import FileInfo, Operation, OperationType
-from ..ai import BaseAIAdapter
-from ..utils import PDFReader
+from typing import List, Dict, Any, Optional
+from ..models import FileInfo, Operation, OperationType, ClassificationRule, RuleAction
+from ..ai import BaseAIAdapter, PromptBuilder
+from ..utils import PDFReader, KeywordMatcher
+from .classification_scheduler import ClassificationScheduler
+from .classification_cache import ClassificationCache
+from .rule_engine import RuleEngine
+from .rule_store import RuleStore
+from .local_classifier import LocalClassifier
+from .file_clusterer import FileClusterer
+
+
+# 反馈中表示需要单独分类的文件类别关键词
+FEEDBACK_KEYWORDS = ['简历', '发票', '收据', '报销', '证书', '手册']
+
+FEEDBACK_KEYWORD_MATCHER = KeywordMatcher({keyword: [keyword] for keyword in FEEDBACK_KEYWORDS})
+
+# 反馈的分句分隔符
+FEEDBACK_CLAUSE_SEPARATOR = re.compile(r'[，。；;！？!?\n]+')
+
+# 反馈中表示否定/暂缓的说法（这类分句不生成移动规则）
+FEEDBACK_NEGATION_PATTERN = re.compile(
+    r'不要|不用|不必|无需|先不|先别|别动|别放|别移|别管|不动|不是|不应|don\'?t|do not|\bnot\b|never', re.IGNORECASE
+)
+
+# 反馈中指定目标文件夹的说法，如"放到 财务 文件夹"（文件夹名不能含花括号，花括号是规则目标的占位符）
+FEEDBACK_TARGET_PATTERN = re.compile(
+    r'(?:放到|移到|移动到|归入|放进|放在|归档到)\s*["“「\']?([^\s"”」\'，。！？,{}]+?)["”」\']?\s*(?:文件夹|目录)?(?=$|[\s，。！？,])'
+)
 
 
 class SmartClassifier:
     """智能分类器 - 使用AI进行文件分类"""
     
-    def __init__(self, ai_adapter: BaseAIAdapter):
+    def __init__(
+        self,
+        ai_adapter: BaseAIAdapter,
+        chunk_token_budget: Optional[int] = None,
+        max_concurrency: int = 4,
+        cache: Optional[ClassificationCache] = None,
+        rule_engine: Optional[RuleEngine] = None,
+        local_classifier: Optional[LocalClassifier] = None,
+        clusterer: Optional[FileClusterer] = None
+    ):
         """
         初始化智能分类器
         
         Args:
             ai_adapter: AI适配器实例
+            chunk_token_budget: 每次AI请求中文件列表的token预算上限（为空时按模型上下文窗口自动计算）
+            max_concurrency: 同时进行的AI请求数上限
+            cache: 分类结果缓存（为空时不缓存）
+            rule_engine: 本地规则引擎（为空时只使用从反馈中学习到的规则；
+                设置了规则存储时，启动时加载之前会话学习的规则）
+            local_classifier: 本地预分类器（为空时规则和缓存未解决的文件全部交给AI）
+            clusterer: 文件聚类器（设置时每组相似文件只把代表交给AI，为空时逐个分类）
         """
         self.ai_adapter = ai_adapter
-        self.learned_rules = []  # 学习到的规则
+        self.rule_engine = rule_engine or RuleEngine()
+        self.cache = cache
+        self.local_classifier = local_classifier
+        self.clusterer = clusterer
+        self.scheduler = ClassificationScheduler(
+            ai_adapter,
+            chunk_token_budget=chunk_token_budget,
+            max_concurrency=max_concurrency
+        )
     
     def classify_batch(
         self,
@@ -44,27 +93,129 @@ class SmartClassifier:
         # 添加学习到的规则到上下文
         context['learned_rules'] = self.learned_rules
         
-        # 1. 快速预分类（基于扩展名和已知规则）
+        # 1. 快速预分类（本地规则引擎：扩展名、文件名、元数据等规则）
         quick_classified, uncertain = self._quick_classify(files, user_request)
         
-        # 2. 对不确定的文件使用AI分类
+        # 2. 对不确定的文件使用AI分类（先查缓存，再由本地预分类器处理与历史记录相似的文件，
+        #    其余的按相似文件分组后，只将每组的代表按token预算分块并发请求）
         ai_operations = []
         if uncertain:
-            try:
-                ai_result = self.ai_adapter.generate_classification(
-                    uncertain, user_request, context
-                )
-                ai_operations = self._parse_ai_result(ai_result)
-            except Exception as e:
-                print(f"AI分类失败: {e}")
-                # 降级处理：使用简单规则
-                ai_operations = self._fallback_classify(uncertain, user_request)
+            cached_results, uncertain, cache_keys = self._lookup_cache(uncertain, user_request)
+            if self.local_classifier and uncertain:
+                local_operations, uncertain = self.local_classifier.classify(uncertain, user_request)
+                quick_classified += local_operations
+            ai_results, failed = [], []
+            if uncertain:
+                ai_results, failed = self._classify_with_ai(uncertain, user_request, context)
+                self._store_cache(uncertain, failed, ai_results, cache_keys)
+            
+            ai_operations = self._parse_ai_result({'operations': cached_results + ai_results})
+            if failed:
+                # 降级处理：分类失败的块使用简单规则
+                ai_operations += self._fallback_classify(failed, user_request)
         
         # 3. 合并结果
         all_operations = quick_classified + ai_operations
         
         return all_operations
     
+    def _classify_with_ai(
+        self,
+        files: List[FileInfo],
+        user_request: str,
+        context: Dict[str, Any]
+    ) -> tuple[List[Dict[str, Any]], List[FileInfo]]:
+        """
+        调用AI分类（设置了聚类器时只发送每组的代表文件，再将结果推广到同组文件）
+        
+        Returns:
+            (操作字典列表, 分类失败的文件列表)
+        """
+        if self.clusterer is None:
+            return self.scheduler.classify(files, user_request, context)
+        
+        representatives, groups = self.clusterer.cluster(files)
+        ai_results, failed = self.scheduler.classify(representatives, user_request, context)
+        ai_results, retry, omitted = self.clusterer.expand(ai_results, groups)
+        if omitted:
+            # AI遗漏的代表文件连同同组文件按分类失败处理
+            missing = set(omitted) - {f.path for f in failed}
+            failed += [f for f in representatives if f.path in missing]
+        failed = self.clusterer.expand_files(failed, groups)
+        if retry:
+            # 代表文件的操作无法推广（如重命名）时，同组文件单独分类
+            retry_results, retry_failed = self.scheduler.classify(retry, user_request, context)
+            ai_results += retry_results
+            failed += retry_failed
+        return ai_results, failed
+    
+    def _lookup_cache(
+        self,
+        files: List[FileInfo],
+        user_request: str
+    ) -> tuple[List[Dict[str, Any]], List[FileInfo], Dict[str, str]]:
+        """
+        查询分类缓存
+        
+        Returns:
+            (命中的操作字典列表, 未命中的文件列表, 文件路径 -> 缓存键)
+        """
+        if self.cache is None:
+            return [], files, {}
+        
+        rules_hash = ClassificationCache.rules_hash(self.learned_rules)
+        model_id = ClassificationCache.model_id(self.ai_adapter)
+        keys = {
+            f.path: ClassificationCache.make_key(f, user_request, rules_hash, model_id)
+            for f in files
+        }
+        
+        try:
+            hits = self.cache.get_many(list(keys.values()))
+        except Exception as e:
+            print(f"读取分类缓存失败: {e}")
+            return [], files, {}
+        
+        cached_results = []
+        misses = []
+        for f in files:
+            ops = hits.get(keys[f.path])
+            if ops is None:
+                misses.append(f)
+            else:
+                cached_results.extend(ops)
+        
+        return cached_results, misses, keys
+    
+    def _store_cache(
+        self,
+        files: List[FileInfo],
+        failed: List[FileInfo],
+        ai_results: List[Dict[str, Any]],
+        cache_keys: Dict[str, str]
+    ):
+        """
+        将AI分类结果按文件写入缓存
+
+        只缓存AI响应中明确给出操作的文件；分类失败或被AI遗漏的文件不缓存，下次整理时重新分类
+        """
+        if self.cache is None or not cache_keys:
+            return
+        
+        pending = {f.path for f in files} - {f.path for f in failed}
+        entries: Dict[str, List[Dict[str, Any]]] = {}
+        for op in ai_results:
+            path = op.get('file', '')
+            if path in pending and path in cache_keys:
+                entries.setdefault(cache_keys[path], []).append(op)
+        if not entries:
+            return
+        
+        try:
+            self.cache.put_many(entries)
+        except Exception as e:
+            print(f"写入分类缓存失败: {e}")
+    
     def refine_with_feedback(
         self,
         previous_operations: List[Operation],
@@ -104,7 +255,7 @@ class SmartClassifier:
             refined_result = self.ai_adapter.refine_with_feedback(
                 previous_result, feedback, files
             )
-            return self._parse_ai_result(refined_result)
+            return self._parse_ai_result(PromptBuilder.resolve_file_refs(refined_result, files))
         except Exception as e:
             print(f"AI优化失败: {e}")
             # 返回原操作
@@ -115,44 +266,83 @@ class SmartClassifier:
         files: List[FileInfo],
         user_request: str
     ) -> tuple[List[Operation], List[FileInfo]]:
-        """快速预分类（基于规则）"""
-        operations = []
-        uncertain = []
-        
-        for file in files:
-            # 应用已知规则
-            op = self._apply_rules(file, user_request)
-            if op:
-                operations.append(op)
-            else:
-                uncertain.append(file)
+        """
+        快速预分类（基于规则）
         
+        Returns:
+            (规则生成的操作, 需要AI分类的文件)；规则判定保持原位的文件不再交给AI
+        """
+        operations, _kept, uncertain = self.rule_engine.classify(files, user_request)
         return operations, uncertain
     
-    def _apply_rules(self, file: FileInfo, user_request: str) -> Operation:
-        """应用已知规则"""
-        # 这里可以实现基于规则的分类
-        # 例如：特定扩展名、文件名模式等
-        return None
+    @property
+    def learned_rules(self) -> List[str]:
+        """学习到的规则（说明文字，提供给AI）"""
+        return list(dict.fromkeys(rule.description for rule in self.rule_engine.learned_rules()))
+    
+    def reset_learned_rules(self):
+        """清除本会话学习到的规则（已持久化到规则存储的规则保留）"""
+        self.rule_engine.reset_learned()
+    
+    def _learn_rule(self, rule: ClassificationRule):
+        """记录学习到的规则：加入规则引擎（设置了规则存储时同时持久化），说明提供给AI"""
+        self.rule_engine.learn(rule)
     
     def _learn_from_feedback(self, feedback: str):
-        """从用户反馈中学习规则"""
+        """从用户反馈中学习可执行的规则（按分句分别提取，每句的目标文件夹只用于该句）"""
+        for clause in FEEDBACK_CLAUSE_SEPARATOR.split(feedback):
+            if clause.strip():
+                self._learn_from_clause(clause)
+    
+    def _learn_from_clause(self, feedback: str):
+        """从反馈的一个分句中学习规则"""
         feedback_lower = feedback.lower()
+        target = self._extract_feedback_target(feedback)
         
         # 提取规则模式
         # 例如："数字文件名不是论文"
         if '数字' in feedback_lower and '文件名' in feedback_lower:
-            rule = "纯数字文件名的PDF通常不是学术论文"
-            if rule not in self.learned_rules:
-                self.learned_rules.append(rule)
-        
-        # "简历"、"发票"等关键词
-        keywords = ['简历', '发票', '收据', '报销', '证书', '手册']
-        for keyword in keywords:
-            if keyword in feedback:
-                rule = f"文件名包含'{keyword}'的文件应单独分类"
-                if rule not in self.learned_rules:
-                    self.learned_rules.append(rule)
+            self._learn_rule(ClassificationRule(
+                description="纯数字文件名的PDF通常不是学术论文",
+                action=RuleAction.KEEP,
+                extensions=['.pdf'],
+                name_pattern=r'^[\d_\-\s]+$',
+                request_keywords=['论文', 'paper'],
+                source='feedback'
+            ))
+        
+        # "简历"、"发票"等关键词（按列表顺序添加规则）
+        # 只有明确指定了目标文件夹且不是否定说法时才生成移动规则，否则只作为提示提供给AI
+        movable = target is not None and not FEEDBACK_NEGATION_PATTERN.search(feedback)
+        found = FEEDBACK_KEYWORD_MATCHER.categories(feedback)
+        for keyword in FEEDBACK_KEYWORDS:
+            if keyword in found:
+                self._learn_rule(ClassificationRule(
+                    description=f"文件名包含'{keyword}'的文件应单独分类（移动到 {target}）" if movable
+                                else f"用户反馈（{keyword}）: {feedback.strip()}",
+                    action=RuleAction.MOVE if movable else RuleAction.HINT,
+                    target=target if movable else '',
+                    name_keywords=[keyword],
+                    priority=10,
+                    source='feedback'
+                ))
+        
+        # 例如：".psd 文件放到 设计稿"
+        extensions = re.findall(r'(?<![A-Za-z0-9.])(\.[A-Za-z0-9]{1,8})(?![A-Za-z0-9])', feedback)
+        if extensions and movable:
+            self._learn_rule(ClassificationRule(
+                description=f"{'/'.join(extensions)} 文件移动到 {target}",
+                target=target,
+                extensions=extensions,
+                priority=5,
+                source='feedback'
+            ))
+    
+    @staticmethod
+    def _extract_feedback_target(feedback: str) -> Optional[str]:
+        """从反馈中提取目标文件夹（如"发票放到 财务 文件夹"中的"财务"）"""
+        match = FEEDBACK_TARGET_PATTERN.search(feedback)
+        return match.group(1) if match else None
     
     def _parse_ai_result(self, ai_result: Dict[str, Any]) -> List[Operation]:
         """解析AI返回的结果"""
@@ -232,8 +422,15 @@ class SmartClassifier:
 class ConversationManager:
     """对话管理器 - 管理多轮对话历史"""
     
-    def __init__(self):
-        self.history = []
+    def __init__(self, store: Optional[RuleStore] = None):
+        """
+        初始化对话管理器
+        
+        Args:
+            store: 对话历史的持久化存储（设置时加载最近的历史，新的交互同时保存）
+        """
+        self.store = store
+        self.history = store.load_history() if store else []
         self.context = {}
     
     def add_interaction(
@@ -245,12 +442,24 @@ class ConversationManager:
         """记录交互历史"""
         from datetime import datetime
         
-        self.history.append({
+        entry = {
             'user_input': user_input,
             'ai_response': ai_response,
             'feedback': user_feedback,
             'timestamp': datetime.now()
-        })
+        }
+        if self.store:
+            entry['id'] = self.store.add_history(entry)
+        self.history.append(entry)
+    
+    def add_feedback(self, feedback: str):
+        """为最近一次交互补充用户反馈"""
+        if not self.history:
+            return
+        entry = self.history[-1]
+        entry['feedback'] = feedback
+        if self.store and entry.get('id') is not None:
+            self.store.set_feedback(entry['id'], feedback)
     
     def get_context(self) -> Dict[str, Any]:
         """获取当前上下文"""
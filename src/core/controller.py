@@ -1,6 +1,6 @@
 """主控制器"""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 from pathlib import Path
 
 from ..models import FileInfo, Operation, OperationResult
@@ -9,6 +9,11 @@ from ..utils import ConfigManager
 from .file_scanner import FileScanner
 from .file_operator import FileOperator
 from .classifier import SmartClassifier, ConversationManager
+from .classification_cache import ClassificationCache
+from .rule_engine import RuleEngine
+from .rule_store import RuleStore
+from .local_classifier import LocalClassifier
+from .file_clusterer import FileClusterer
 from ..safety import OperationLogger, BackupManager, UndoManager
 
 
@@ -32,6 +37,17 @@ class Controller:
         self.config = config
         self.use_agent = use_agent
         
+        # 操作日志（同时作为本地预分类器的训练数据）
+        self.logger = OperationLogger()
+        
+        # 学习规则和对话历史的持久化存储（跨会话、跨控制器共享）
+        self.rule_store = None
+        if config.get('ai.rule_store.enabled', True):
+            self.rule_store = RuleStore(
+                db_path=config.get_data_path('ai.rule_store.db_path', 'rules/rules.db'),
+                history_limit=config.get('ai.rule_store.history_limit', 20)
+            )
+        
         # 获取AI配置
         provider = ai_provider or config.get_default_provider()
         ai_config = config.get_ai_config(provider)
@@ -49,7 +65,11 @@ class Controller:
                     llm_provider=provider,
                     config=ai_config,
                     dry_run=dry_run,
-                    verbose=verbose
+                    verbose=verbose,
+                    context_config=config.get('langchain.agent.context'),
+                    agent_type=config.get('langchain.agent.type', 'openai-tools'),
+                    max_parallel_tools=config.get('langchain.agent.max_parallel_tools', 4),
+                    paper_prepass=config.get('langchain.agent.paper_prepass')
                 )
                 self.ai_adapter = None
                 self.classifier = None
@@ -60,7 +80,28 @@ class Controller:
         if not use_agent or not hasattr(self, 'agent'):
             # 使用传统AI适配器模式
             self.ai_adapter = AIAdapterFactory.create_adapter(provider, ai_config)
-            self.classifier = SmartClassifier(self.ai_adapter)
+            cache = None
+            if config.get('ai.classification_cache.enabled', True):
+                cache = ClassificationCache(
+                    db_path=config.get_data_path('ai.classification_cache.db_path', 'cache/classification.db'),
+                    ttl_hours=config.get('ai.classification_cache.ttl_hours', 168),
+                    max_entries=config.get('ai.classification_cache.max_entries', 50000)
+                )
+            self.classifier = SmartClassifier(
+                self.ai_adapter,
+                chunk_token_budget=config.get('ai.classification.chunk_token_budget'),
+                max_concurrency=config.get('ai.classification.max_concurrency', 4),
+                cache=cache,
+                rule_engine=RuleEngine.from_config(
+                    config.get('ai.classification.rules'),
+                    include_builtin=config.get('ai.classification.builtin_rules', True),
+                    store=self.rule_store
+                ),
+                local_classifier=LocalClassifier.from_config(
+                    config.get('ai.local_classifier'), logger=self.logger
+                ),
+                clusterer=FileClusterer.from_config(config.get('ai.classification.clustering'))
+            )
             self.agent = None
         
         # 初始化各个组件
@@ -70,15 +111,30 @@ class Controller:
         )
         
         self.file_operator = FileOperator(dry_run=False)
-        self.conversation_manager = ConversationManager()
+        self.conversation_manager = ConversationManager(self.rule_store)
         
         # 安全组件
-        self.logger = OperationLogger()
         self.backup_manager = BackupManager()
         self.undo_manager = UndoManager()
         
         # 当前扫描的文件列表
         self.current_files: List[FileInfo] = []
+        # 当前方案对应的用户需求（记录到操作日志）
+        self.current_request: Optional[str] = None
+    
+    def reset_session(self):
+        """清除会话状态（扫描结果、对话历史、学习到的规则），以便复用控制器
+
+        已持久化到规则存储的规则和对话历史会重新加载。
+        """
+        self.current_files = []
+        self.current_request = None
+        self.file_operator.file_index = None
+        self.conversation_manager = ConversationManager(self.rule_store)
+        if self.classifier:
+            self.classifier.reset_learned_rules()
+        if self.agent:
+            self.agent.clear_memory()
     
     def scan_directory(
         self,
@@ -104,6 +160,8 @@ class Controller:
             include_metadata=True,
             include_content=False  # 默认不读取内容，需要时再读取
         )
+        # 扫描结果作为预演时虚拟文件系统的索引
+        self.file_operator.file_index = self.current_files
         return self.current_files
     
     def generate_plan(
@@ -132,6 +190,7 @@ class Controller:
             operations = self.classifier.classify_batch(files, user_request, context)
         
         # 记录交互
+        self.current_request = user_request
         self.conversation_manager.add_interaction(
             user_input=user_request,
             ai_response={'operations': operations}
@@ -143,7 +202,8 @@ class Controller:
         self,
         directory: str,
         user_request: str,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        dry_run: Optional[bool] = None
     ) -> Dict[str, Any]:
         """
         使用Agent模式整理文件
@@ -152,6 +212,7 @@ class Controller:
             directory: 目标目录
             user_request: 用户需求
             context: 额外上下文
+            dry_run: 本次是否仅模拟执行（为空时使用配置中的设置，调用结束后恢复）
             
         Returns:
             执行结果
@@ -162,7 +223,13 @@ class Controller:
                 'error': 'Agent模式未启用或未初始化'
             }
         
-        result = self.agent.organize_files(directory, user_request, context)
+        default_dry_run = self.agent.dry_run
+        if dry_run is not None:
+            self.agent.set_dry_run(dry_run)
+        try:
+            result = self.agent.organize_files(directory, user_request, context)
+        finally:
+            self.agent.set_dry_run(default_dry_run)
         
         # 注意: Agent 操作不需要记录为单个 Operation
         # Agent 内部执行的具体操作会由工具自己记录
@@ -200,10 +267,18 @@ class Controller:
         """预览操作"""
         return self.file_operator.preview_operations(operations)
     
+    def simulate_operations(self, operations: List[Operation]) -> Dict:
+        """在虚拟文件系统中模拟整个方案（基于当前扫描结果，不访问磁盘）"""
+        files = self.current_files if self.current_files else None
+        return self.file_operator.simulate_operations(operations, files)
+    
     def execute_operations(
         self,
         operations: List[Operation],
-        create_backup: bool = True
+        create_backup: bool = True,
+        progress_callback: Optional[Callable[[int, int, Operation], None]] = None,
+        strict: bool = True,
+        user_request: Optional[str] = None
     ) -> OperationResult:
         """
         执行操作
@@ -211,14 +286,20 @@ class Controller:
         Args:
             operations: 操作列表
             create_backup: 是否创建备份
+            progress_callback: 进度回调 (已完成数, 总数, 当前操作)
+            strict: 为True时任一操作验证失败即整体拒绝；
+                    为False时跳过整体验证，失败的操作单独计入结果
+            user_request: 生成这些操作的用户需求（写入操作日志供本地预分类器学习），
+                          为空时使用本控制器最近一次生成方案的需求
             
         Returns:
             操作结果
         """
         # 验证操作
-        validation = self.file_operator.validate_operations(operations)
-        if not validation['valid']:
-            raise ValueError(f"操作验证失败: {validation['issues']}")
+        if strict:
+            validation = self.file_operator.validate_operations(operations)
+            if not validation['valid']:
+                raise ValueError(f"操作验证失败: {validation['issues']}")
         
         # 创建备份点
         backup_id = None
@@ -229,11 +310,12 @@ class Controller:
         try:
             # 执行操作
             batch_size = self.config.get('file_operations.batch_size', 50)
-            result = self.file_operator.execute_batch(operations, batch_size)
+            result = self.file_operator.execute_batch(operations, batch_size, progress_callback)
             
             # 记录操作日志
-            for op in result.operations:
-                self.logger.log_operation(op, 'success')
+            self.logger.log_operations(
+                result.operations, 'success', request=user_request or self.current_request
+            )
             
             # 记录到撤销栈
             self.undo_manager.record_operations(result.operations)
@@ -242,8 +324,7 @@ class Controller:
             
         except Exception as e:
             # 记录错误
-            for op in operations:
-                self.logger.log_operation(op, 'failed', str(e))
+            self.logger.log_operations(operations, 'failed', str(e))
             
             # 如果有备份，尝试恢复
             if backup_id:
@@ -286,8 +367,13 @@ class Controller:
     
     def undo_last_operation(self) -> bool:
         """撤销最后一次操作"""
+        undone = []
+        if self.undo_manager.can_undo():
+            undone = [item['original'] for item in self.undo_manager.undo_stack[-1]['operations']]
         success = self.undo_manager.undo_last()
         if success:
+            # 被撤销的操作不再作为本地预分类器的训练样本
+            self.logger.log_operations(undone, 'reverted')
             self.logger.log_operation(
                 Operation(
                     type='undo',
@@ -305,5 +391,4 @@ class Controller:
     
     def add_feedback(self, feedback: str):
         """添加用户反馈"""
-        if self.conversation_manager.history:
-            self.conversation_manager.history[-1]['feedback'] = feedback
+        self.conversation_manager.add_feedback(feedback)
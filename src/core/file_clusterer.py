@@ -0,0 +1,164 @@
+"""文件聚类 - 按文件名模式和元数据签名分组，只把每组的代表文件交给AI，再将决定推广到同组文件"""
+
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..models import FileInfo, OperationType
+
+
+# 文件名中的数字串统一替换，使 IMG_0001 与 IMG_0412 属于同一模式
+DIGIT_RUN_PATTERN = re.compile(r'\d+')
+
+# 文件名模式中需要包含的非数字字符（纯数字文件名如 1.pdf、2301.12345.pdf 不聚类）
+PATTERN_LITERAL = re.compile(r'[^\W\d_]')
+
+# 参与元数据签名的字段（来源相同的文件，如同一台相机、同一个生成工具）
+METADATA_SIGNATURE_KEYS = ('format', 'mode', 'author', 'creator', 'producer')
+
+
+class FileClusterer:
+    """
+    文件聚类器
+
+    同一目录下、文件名去掉数字后相同、扩展名和元数据签名相同的文件归为一组。
+    只有移动操作可以推广到同组文件（目标文件夹按相对于所在目录的位置换算）；
+    代表文件得到其他操作（如重命名）时，同组文件需要单独分类。
+    """
+
+    def __init__(
+        self,
+        min_cluster_size: int = 3,
+        metadata_keys: Tuple[str, ...] = METADATA_SIGNATURE_KEYS
+    ):
+        """
+        初始化文件聚类器
+
+        Args:
+            min_cluster_size: 参与聚类的最少文件数（更小的组逐个交给AI）
+            metadata_keys: 参与元数据签名的字段
+        """
+        self.min_cluster_size = max(2, min_cluster_size)
+        self.metadata_keys = tuple(metadata_keys)
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> Optional['FileClusterer']:
+        """
+        从配置字典创建
+
+        Returns:
+            文件聚类器，未启用时返回None
+        """
+        if not config or not config.get('enabled', True):
+            return None
+        settings = {}
+        if config.get('min_cluster_size') is not None:
+            settings['min_cluster_size'] = config['min_cluster_size']
+        if config.get('metadata_keys') is not None:
+            settings['metadata_keys'] = tuple(config['metadata_keys'])
+        return cls(**settings)
+
+    def cluster_key(self, file: FileInfo) -> Optional[tuple]:
+        """
+        文件的聚类键（所在目录、文件名模式、扩展名、元数据签名）
+
+        Returns:
+            聚类键，文件名去掉数字后没有字母或汉字时返回None（不参与聚类）
+        """
+        path = Path(file.path)
+        pattern = DIGIT_RUN_PATTERN.sub('#', path.stem.lower())
+        if not PATTERN_LITERAL.search(pattern):
+            return None
+        metadata = file.metadata or {}
+        signature = tuple(str(metadata.get(key, '')) for key in self.metadata_keys)
+        return (str(path.parent), pattern, file.extension.lower(), signature)
+
+    def cluster(self, files: List[FileInfo]) -> Tuple[List[FileInfo], Dict[str, List[FileInfo]]]:
+        """
+        聚类文件
+
+        Args:
+            files: 文件列表
+
+        Returns:
+            (需要AI分类的文件（每组的代表和未成组的文件，保持原顺序）, 代表文件路径 -> 同组的其余文件)
+        """
+        clusters: Dict[tuple, List[FileInfo]] = {}
+        for file in files:
+            key = self.cluster_key(file)
+            if key is not None:
+                clusters.setdefault(key, []).append(file)
+
+        groups: Dict[str, List[FileInfo]] = {}
+        members = set()
+        for group in clusters.values():
+            if len(group) >= self.min_cluster_size:
+                groups[group[0].path] = group[1:]
+                members.update(f.path for f in group[1:])
+
+        representatives = [f for f in files if f.path not in members]
+        return representatives, groups
+
+    @staticmethod
+    def _fan_out_target(representative: str, target: str, member: FileInfo) -> str:
+        """将代表文件的移动目标换算为同组文件的目标"""
+        source_dir = Path(representative).parent
+        target_dir = Path(target).parent
+        member_path = Path(member.path)
+        try:
+            folder = member_path.parent / target_dir.relative_to(source_dir)
+        except ValueError:
+            folder = target_dir
+        return str(folder / member_path.name)
+
+    def expand(
+        self,
+        operations: List[Dict[str, Any]],
+        groups: Dict[str, List[FileInfo]]
+    ) -> Tuple[List[Dict[str, Any]], List[FileInfo], List[str]]:
+        """
+        将代表文件的分类结果推广到同组文件
+
+        Args:
+            operations: AI返回的操作字典列表
+            groups: cluster() 返回的分组
+
+        Returns:
+            (推广后的操作字典列表, 需要单独分类的同组文件, AI响应中遗漏的代表文件路径)
+        """
+        if not groups:
+            return operations, [], []
+
+        expanded = []
+        retry: List[FileInfo] = []
+        covered = set()
+        for op in operations:
+            expanded.append(op)
+            representative = op.get('file', '')
+            covered.add(representative)
+            members = groups.get(representative)
+            if not members:
+                continue
+            if op.get('type') != OperationType.MOVE.value or not op.get('target'):
+                retry.extend(members)
+                continue
+            for member in members:
+                expanded.append({
+                    **op,
+                    'file': member.path,
+                    'target': self._fan_out_target(representative, op['target'], member),
+                    'reason': f"{op.get('reason', '')}（与 {Path(representative).name} 同组）",
+                })
+
+        # 代表文件被AI遗漏时无法推广，按分类失败处理（由调用方用 expand_files 连同组文件一起降级）
+        omitted = [representative for representative in groups if representative not in covered]
+        return expanded, retry, omitted
+
+    @staticmethod
+    def expand_files(files: List[FileInfo], groups: Dict[str, List[FileInfo]]) -> List[FileInfo]:
+        """将代表文件列表扩展为包含同组文件的列表（用于分类失败的文件）"""
+        expanded = []
+        for file in files:
+            expanded.append(file)
+            expanded.extend(groups.get(file.path, []))
+        return expanded
@@ -2,24 +2,49 @@
 
 import shutil
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set, Callable
 from datetime import datetime
 import time
 
-from ..models import Operation, OperationResult, OperationType
+from ..models import FileInfo, Operation, OperationResult, OperationType
+from .virtual_fs import VirtualFileSystem
 
 
 class FileOperator:
     """文件操作器 - 执行文件操作（移动、重命名等）"""
     
-    def __init__(self, dry_run: bool = False):
+    def __init__(self, dry_run: bool = False, file_index: Optional[List[FileInfo]] = None):
         """
         初始化文件操作器
         
         Args:
             dry_run: 仅模拟操作，不实际执行
+            file_index: 扫描索引，预演时用于构建虚拟文件系统（为空时按需查询磁盘）
         """
         self.dry_run = dry_run
+        self.file_index = file_index
+    
+    def simulate_operations(
+        self,
+        operations: List[Operation],
+        files: Optional[List[FileInfo]] = None
+    ) -> Dict:
+        """
+        在虚拟文件系统中模拟整个操作方案
+        
+        能够发现方案内部产生的冲突（如多个文件映射到同一目标），
+        提供扫描索引时完全不访问磁盘。
+        
+        Args:
+            operations: 操作列表
+            files: 扫描索引（默认使用 self.file_index）
+            
+        Returns:
+            模拟结果字典（见 VirtualFileSystem.simulate）
+        """
+        index = files if files is not None else self.file_index
+        vfs = VirtualFileSystem(index, probe_disk=index is None)
+        return vfs.simulate(operations)
     
     def preview_operations(self, operations: List[Operation]) -> Dict:
         """
@@ -65,7 +90,8 @@ class FileOperator:
     def execute_batch(
         self,
         operations: List[Operation],
-        batch_size: int = 50
+        batch_size: int = 50,
+        progress_callback: Optional[Callable[[int, int, Operation], None]] = None
     ) -> OperationResult:
         """
         分批执行文件操作
@@ -73,6 +99,7 @@ class FileOperator:
         Args:
             operations: 操作列表
             batch_size: 批次大小
+            progress_callback: 进度回调 (已完成数, 总数, 当前操作)，每个操作完成后调用
             
         Returns:
             操作结果
@@ -80,13 +107,20 @@ class FileOperator:
         start_time = time.time()
         result = OperationResult(total=len(operations))
         
+        if self.dry_run:
+            return self._simulate_batch(operations, result, start_time)
+        
+        # 已确认存在的目录：目标目录在第一个需要它的操作执行时创建，之后的操作不再重复mkdir；
+        # 失败的操作不会留下空目录
+        ensured_dirs: Set[str] = set()
+        
         # 分批处理
         for i in range(0, len(operations), batch_size):
             batch = operations[i:i + batch_size]
             
             for op in batch:
                 try:
-                    success = self._execute_single_operation(op)
+                    success = self._execute_single_operation(op, ensured_dirs)
                     if success:
                         result.success_count += 1
                         result.operations.append(op)
@@ -95,54 +129,134 @@ class FileOperator:
                 except Exception as e:
                     result.failed_count += 1
                     result.errors.append(f"{op.source}: {str(e)}")
+                
+                if progress_callback:
+                    done = result.success_count + result.failed_count + result.skipped_count
+                    progress_callback(done, result.total, op)
+        
+        result.duration = time.time() - start_time
+        return result
+    
+    def _simulate_batch(
+        self,
+        operations: List[Operation],
+        result: OperationResult,
+        start_time: float
+    ) -> OperationResult:
+        """预演模式下通过虚拟文件系统批量模拟"""
+        simulation = self.simulate_operations(operations)
+        failed_indexes = {e['index'] for e in simulation['errors']}
+        
+        for i, op in enumerate(operations):
+            if i not in failed_indexes:
+                result.success_count += 1
+                result.operations.append(op)
         
+        result.failed_count = len(simulation['errors'])
+        result.errors = [f"{e['source']}: {e['error']}" for e in simulation['errors']]
         result.duration = time.time() - start_time
         return result
     
-    def _execute_single_operation(self, operation: Operation) -> bool:
-        """执行单个操作"""
+    def _execute_single_operation(
+        self,
+        operation: Operation,
+        ensured_dirs: Optional[Set[str]] = None
+    ) -> bool:
+        """
+        执行单个操作
+        
+        Args:
+            operation: 操作
+            ensured_dirs: 已确认存在的目录（批量执行时共享，成功的操作会加入其目标目录）
+        """
         if self.dry_run:
             print(f"[DRY RUN] {operation.type.value}: {operation.source} -> {operation.target}")
             return True
         
+        ensured_dirs = ensured_dirs if ensured_dirs is not None else set()
+        
         if operation.type == OperationType.MOVE:
-            return self.move_file(operation.source, operation.target)
+            parent = str(Path(operation.target).parent)
+            success = self.move_file(operation.source, operation.target, ensure_parent=parent not in ensured_dirs)
+            if success:
+                ensured_dirs.add(parent)
+            return success
         elif operation.type == OperationType.RENAME:
             return self.rename_file(operation.source, operation.target)
         elif operation.type == OperationType.CREATE_FOLDER:
-            return self.create_folder(operation.target)
+            folder = str(Path(operation.target))
+            if folder in ensured_dirs:
+                return True
+            success = self.create_folder(operation.target)
+            if success:
+                ensured_dirs.add(folder)
+            return success
         else:
             raise ValueError(f"不支持的操作类型: {operation.type}")
     
-    def move_file(self, source: str, target: str) -> bool:
+    def move_file(self, source: str, target: str, ensure_parent: bool = True) -> bool:
         """
         安全移动文件
         
         Args:
             source: 源路径
             target: 目标路径
+            ensure_parent: 是否确保目标目录存在（已确认目录存在时可关闭）
             
         Returns:
             是否成功
         """
+        if self.dry_run:
+            return True
+        
         source_path = Path(source)
         target_path = Path(target)
         
         if not source_path.exists():
             raise FileNotFoundError(f"源文件不存在: {source}")
         
-        # 确保目标目录存在
-        target_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # 处理文件名冲突
-        if target_path.exists():
-            target_path = self._resolve_conflict(target_path)
+        # 确保目标目录存在（记录新建的目录，移动失败时删除，不留下空目录）
+        created = self._make_parents(target_path.parent) if ensure_parent else []
         
-        # 移动文件
-        shutil.move(str(source_path), str(target_path))
+        try:
+            # 处理文件名冲突
+            if target_path.exists():
+                target_path = self._resolve_conflict(target_path)
+            
+            # 移动文件
+            shutil.move(str(source_path), str(target_path))
+        except Exception:
+            self._remove_empty_dirs(created)
+            raise
         
         return True
     
+    @staticmethod
+    def _make_parents(directory: Path) -> List[Path]:
+        """
+        创建目录（包括缺少的上级目录）
+        
+        Returns:
+            新建的目录列表（上级目录在前）
+        """
+        missing = []
+        current = directory
+        while not current.exists() and current.parent != current:
+            missing.append(current)
+            current = current.parent
+        if missing:
+            directory.mkdir(parents=True, exist_ok=True)
+        return list(reversed(missing))
+    
+    @staticmethod
+    def _remove_empty_dirs(directories: List[Path]):
+        """从最深处开始删除空目录（遇到非空或无法删除的目录即停止）"""
+        for directory in reversed(directories):
+            try:
+                directory.rmdir()
+            except OSError:
+                break
+    
     def rename_file(self, source: str, new_name: str) -> bool:
         """
         安全重命名文件
@@ -154,6 +268,9 @@ class FileOperator:
         Returns:
             是否成功
         """
+        if self.dry_run:
+            return True
+        
         source_path = Path(source)
         
         if not source_path.exists():
@@ -182,6 +299,9 @@ class FileOperator:
         Returns:
             是否成功
         """
+        if self.dry_run:
+            return True
+        
         Path(folder_path).mkdir(parents=True, exist_ok=True)
         return True
     
@@ -2,7 +2,7 @@
 
 import os
 from pathlib import Path
-from typing import List, Dict, Optional, Set
+from typing import List, Dict, Optional, Set, Iterator, Callable
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 
@@ -46,12 +46,7 @@ class FileScanner:
         Returns:
             文件信息列表
         """
-        directory_path = Path(directory)
-        if not directory_path.exists():
-            raise FileNotFoundError(f"目录不存在: {directory}")
-        
-        if not directory_path.is_dir():
-            raise NotADirectoryError(f"不是目录: {directory}")
+        directory_path = self.check_directory(directory)
         
         # 收集所有文件路径
         file_paths = self._collect_file_paths(directory_path, recursive, extensions)
@@ -83,6 +78,96 @@ class FileScanner:
         
         return files_info
     
+    @staticmethod
+    def check_directory(directory: str) -> Path:
+        """
+        检查扫描目录是否有效
+        
+        Args:
+            directory: 目录路径
+            
+        Returns:
+            目录路径对象
+            
+        Raises:
+            FileNotFoundError: 目录不存在
+            NotADirectoryError: 路径不是目录
+        """
+        directory_path = Path(directory)
+        if not directory_path.exists():
+            raise FileNotFoundError(f"目录不存在: {directory}")
+        
+        if not directory_path.is_dir():
+            raise NotADirectoryError(f"不是目录: {directory}")
+        
+        return directory_path
+    
+    def iter_scan(
+        self,
+        directory: str,
+        recursive: bool = False,
+        extensions: Optional[Set[str]] = None,
+        include_metadata: bool = True,
+        include_content: bool = False,
+        chunk_size: int = 200,
+        progress_callback: Optional[Callable[[Dict], None]] = None
+    ) -> Iterator[List[FileInfo]]:
+        """
+        增量扫描目录，边遍历边按块返回文件信息
+        
+        与 scan_directory 不同，不必等待整个目录遍历完成，第一块结果在
+        遍历到 chunk_size 个文件后即可返回。
+        
+        Args:
+            directory: 目录路径
+            recursive: 是否递归扫描子目录
+            extensions: 文件扩展名过滤
+            include_metadata: 是否提取元数据
+            include_content: 是否提取内容样本
+            chunk_size: 每块的文件数
+            progress_callback: 进度回调，每处理完一块调用一次，参数包含
+                dirs_walked、files_found、files_done
+            
+        Yields:
+            文件信息块
+        """
+        directory_path = self.check_directory(directory)
+        counters = {'dirs_walked': 0, 'files_found': 0, 'files_done': 0}
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            batch: List[str] = []
+            for file_path in self._iter_file_paths(directory_path, recursive, extensions, counters):
+                batch.append(file_path)
+                if len(batch) >= chunk_size:
+                    yield self._process_chunk(executor, batch, include_metadata, include_content,
+                                              counters, progress_callback)
+                    batch = []
+            
+            if batch:
+                yield self._process_chunk(executor, batch, include_metadata, include_content,
+                                          counters, progress_callback)
+    
+    def _process_chunk(
+        self,
+        executor: ThreadPoolExecutor,
+        file_paths: List[str],
+        include_metadata: bool,
+        include_content: bool,
+        counters: Dict[str, int],
+        progress_callback: Optional[Callable[[Dict], None]]
+    ) -> List[FileInfo]:
+        """并行处理一块文件"""
+        results = executor.map(
+            lambda p: self._process_single_file(p, include_metadata, include_content),
+            file_paths
+        )
+        chunk = [file_info for file_info in results if file_info]
+        
+        counters['files_done'] += len(file_paths)
+        if progress_callback:
+            progress_callback(dict(counters))
+        return chunk
+    
     def _collect_file_paths(
         self,
         directory: Path,
@@ -90,25 +175,40 @@ class FileScanner:
         extensions: Optional[Set[str]]
     ) -> List[str]:
         """收集文件路径"""
-        file_paths = []
+        return list(self._iter_file_paths(directory, recursive, extensions))
+    
+    def _iter_file_paths(
+        self,
+        directory: Path,
+        recursive: bool,
+        extensions: Optional[Set[str]],
+        counters: Optional[Dict[str, int]] = None
+    ) -> Iterator[str]:
+        """逐个生成文件路径"""
+        if counters is None:
+            counters = {'dirs_walked': 0, 'files_found': 0}
         
         if recursive:
             for root, dirs, files in os.walk(directory):
-                # 检查深度
+                counters['dirs_walked'] += 1
+                # 检查深度，已到最大深度时不再进入子目录
                 depth = len(Path(root).relative_to(directory).parts)
+                if depth >= self.max_depth:
+                    dirs[:] = []
                 if depth > self.max_depth:
                     continue
                 
                 for file in files:
                     file_path = Path(root) / file
                     if self._should_include_file(file_path, extensions):
-                        file_paths.append(str(file_path))
+                        counters['files_found'] += 1
+                        yield str(file_path)
         else:
+            counters['dirs_walked'] += 1
             for item in directory.iterdir():
                 if item.is_file() and self._should_include_file(item, extensions):
-                    file_paths.append(str(item))
-        
-        return file_paths
+                    counters['files_found'] += 1
+                    yield str(item)
     
     def _should_include_file(self, file_path: Path, extensions: Optional[Set[str]]) -> bool:
         """判断是否应包含此文件"""
@@ -0,0 +1,334 @@
+"""本地预分类器 - 基于历史整理记录的TF-IDF向量，离线为相似文件给出分类，只有把握不足的文件交给AI"""
+
+import re
+from collections import Counter
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..models import FileInfo, Operation, OperationType
+from ..safety import OperationLogger
+from .classification_cache import ClassificationCache
+
+
+# 文件名字符 n-gram 的长度范围
+CHAR_NGRAM_RANGE = (2, 4)
+
+# 文件名中的词（字母、数字、汉字串）
+NAME_TOKEN_PATTERN = re.compile(r'[^\W_]+')
+
+# 数字统一替换，使 "2023发票" 与 "2024发票" 共享特征
+DIGIT_PATTERN = re.compile(r'\d')
+
+
+def extract_features(name: str) -> Counter:
+    """
+    提取文件的特征词频（文件名字符 n-gram、文件名词、扩展名）
+
+    训练样本来自操作日志，日志中只有文件路径，因此只使用文件名特征，预测时与训练保持一致。
+
+    Args:
+        name: 文件名
+
+    Returns:
+        特征 -> 出现次数
+    """
+    path = Path(name.lower())
+    stem = path.stem
+    features: Counter = Counter()
+
+    if path.suffix:
+        features[f"ext:{path.suffix}"] += 1
+
+    for token in NAME_TOKEN_PATTERN.findall(stem):
+        features[f"w:#{len(token)}" if token.isdigit() else f"w:{token}"] += 1
+
+    text = f" {DIGIT_PATTERN.sub('0', stem)} "
+    low, high = CHAR_NGRAM_RANGE
+    for n in range(low, high + 1):
+        for i in range(len(text) - n + 1):
+            features[f"c:{text[i:i + n]}"] += 1
+
+    return features
+
+
+class TfidfCentroidModel:
+    """
+    TF-IDF 最近质心分类器
+
+    文档向量为 (1 + log tf) * idf 并做 L2 归一化；每个类别的质心为其文档向量的均值（再归一化）。
+    预测时一批文档组成 CSR 形式的稀疏矩阵（indices / data / indptr），与质心矩阵相乘得到余弦相似度。
+    """
+
+    def __init__(self):
+        self.vocabulary: Dict[str, int] = {}
+        self.labels: List[str] = []
+        self.idf = np.zeros(0, dtype=np.float32)
+        self.centroids = np.zeros((0, 0), dtype=np.float32)
+
+    def fit(self, documents: List[Counter], labels: List[str]) -> 'TfidfCentroidModel':
+        """
+        训练模型
+
+        Args:
+            documents: 每个文档的特征词频
+            labels: 每个文档的类别
+
+        Returns:
+            模型本身
+        """
+        vocabulary: Dict[str, int] = {}
+        for doc in documents:
+            for feature in doc:
+                vocabulary.setdefault(feature, len(vocabulary))
+        self.vocabulary = vocabulary
+        self.labels = sorted(set(labels))
+        label_index = {label: i for i, label in enumerate(self.labels)}
+
+        indices, counts, indptr = self._to_csr(documents)
+        df = np.bincount(indices, minlength=len(vocabulary))
+        self.idf = (np.log((1 + len(documents)) / (1 + df)) + 1).astype(np.float32)
+        data = self._weights(indices, counts, indptr)
+
+        rows = np.repeat(np.arange(len(documents)), np.diff(indptr))
+        doc_labels = np.array([label_index[label] for label in labels], dtype=np.int64)
+        centroids = np.zeros((len(vocabulary), len(self.labels)), dtype=np.float32)
+        np.add.at(centroids, (indices, doc_labels[rows]), data)
+        norms = np.linalg.norm(centroids, axis=0)
+        self.centroids = centroids / np.where(norms > 0, norms, 1)
+        return self
+
+    def _to_csr(self, documents: List[Counter]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """将文档转换为 CSR 数组（词表外的特征忽略）"""
+        vocabulary = self.vocabulary
+        indices: List[int] = []
+        counts: List[int] = []
+        indptr = [0]
+        for doc in documents:
+            for feature, count in doc.items():
+                index = vocabulary.get(feature)
+                if index is not None:
+                    indices.append(index)
+                    counts.append(count)
+            indptr.append(len(indices))
+        return (
+            np.asarray(indices, dtype=np.int64),
+            np.asarray(counts, dtype=np.float32),
+            np.asarray(indptr, dtype=np.int64),
+        )
+
+    def _weights(self, indices: np.ndarray, counts: np.ndarray, indptr: np.ndarray) -> np.ndarray:
+        """计算 L2 归一化的 TF-IDF 权重"""
+        data = (1 + np.log(counts)) * self.idf[indices]
+        starts = indptr[:-1]
+        nonempty = np.diff(indptr) > 0
+        norms = np.zeros(len(starts), dtype=np.float32)
+        if data.size:
+            norms[nonempty] = np.sqrt(np.add.reduceat(data * data, starts[nonempty]))
+        row_norms = np.repeat(norms, np.diff(indptr))
+        return data / np.where(row_norms > 0, row_norms, 1)
+
+    def predict(self, documents: List[Counter]) -> Tuple[List[Optional[str]], np.ndarray, np.ndarray]:
+        """
+        预测类别
+
+        Args:
+            documents: 每个文档的特征词频
+
+        Returns:
+            (类别列表（没有已知特征时为None）, 最高相似度, 与第二名的相似度差)
+        """
+        count = len(documents)
+        best = np.zeros(count, dtype=np.float32)
+        margin = np.zeros(count, dtype=np.float32)
+        predicted: List[Optional[str]] = [None] * count
+        if not count or not self.labels:
+            return predicted, best, margin
+
+        indices, counts, indptr = self._to_csr(documents)
+        data = self._weights(indices, counts, indptr)
+        nonempty = np.flatnonzero(np.diff(indptr) > 0)
+        if not nonempty.size:
+            return predicted, best, margin
+
+        scores = np.add.reduceat(self.centroids[indices] * data[:, None], indptr[nonempty], axis=0)
+        if scores.shape[1] > 1:
+            top2 = np.partition(scores, -2, axis=1)[:, -2:]
+            best[nonempty] = top2[:, 1]
+            margin[nonempty] = top2[:, 1] - top2[:, 0]
+        else:
+            best[nonempty] = scores[:, 0]
+            margin[nonempty] = scores[:, 0]
+
+        for row, label_index in zip(nonempty, scores.argmax(axis=1)):
+            predicted[row] = self.labels[label_index]
+        return predicted, best, margin
+
+
+class LocalClassifier:
+    """
+    本地预分类器 - 从操作日志中已执行的移动操作学习"什么样的文件放到哪个文件夹"
+
+    - 训练样本：日志中状态为 success 且未被撤销的移动操作，类别为目标文件夹
+      （目标在源文件所在目录下时记为相对路径，否则记为绝对路径）
+    - 只使用与当前需求相同（规范化后）的历史记录，避免把其他整理需求的结果套用过来
+    - 相似度和与第二名的差距都达到阈值的文件直接生成操作，其余文件交给AI
+    - 模型按需求缓存，日志文件变化后重新训练
+    """
+
+    SETTING_KEYS = ('min_similarity', 'min_margin', 'min_samples', 'history_days')
+
+    def __init__(
+        self,
+        logger: Optional[OperationLogger] = None,
+        min_similarity: float = 0.6,
+        min_margin: float = 0.2,
+        min_samples: int = 2,
+        history_days: int = 30
+    ):
+        """
+        初始化本地预分类器
+
+        Args:
+            logger: 操作日志（训练数据来源）
+            min_similarity: 直接分类所需的最低余弦相似度
+            min_margin: 直接分类所需的与第二名的最小相似度差
+            min_samples: 每个目标文件夹至少需要的历史记录数
+            history_days: 读取的日志天数
+        """
+        self.logger = logger or OperationLogger()
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.min_samples = min_samples
+        self.history_days = history_days
+
+        self._lock = Lock()
+        self._log_signature: Optional[tuple] = None
+        self._samples: Dict[str, List[Tuple[str, str]]] = {}
+        self._models: Dict[str, Optional[TfidfCentroidModel]] = {}
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Optional[Dict[str, Any]],
+        logger: Optional[OperationLogger] = None
+    ) -> Optional['LocalClassifier']:
+        """
+        从配置字典创建（忽略未知字段）
+
+        Returns:
+            本地预分类器，未启用时返回None
+        """
+        if not config or not config.get('enabled', True):
+            return None
+        settings = {k: v for k, v in config.items() if k in cls.SETTING_KEYS and v is not None}
+        return cls(logger=logger, **settings)
+
+    @staticmethod
+    def label_for(source: str, target: str) -> Optional[str]:
+        """
+        由移动操作得到类别（目标文件夹）
+
+        Returns:
+            相对于源文件所在目录的文件夹，或目标文件夹的绝对路径；原地重命名时返回None
+        """
+        source_dir = Path(source).parent
+        target_dir = Path(target).parent
+        if target_dir == source_dir:
+            return None
+        try:
+            return target_dir.relative_to(source_dir).as_posix()
+        except ValueError:
+            return str(target_dir)
+
+    def _load_samples(self):
+        """日志变化时重新读取训练样本（调用方需持有锁）"""
+        signature = self.logger.log_signature(self.history_days)
+        if signature == self._log_signature:
+            return
+
+        entries = self.logger.get_operations_since(self.history_days)
+        reverted = {e.get('operation_id') for e in entries if e.get('status') == 'reverted'}
+        samples: Dict[str, List[Tuple[str, str]]] = {}
+        for entry in entries:
+            if (
+                entry.get('status') != 'success'
+                or entry.get('type') != OperationType.MOVE.value
+                or not entry.get('request')
+                or entry.get('operation_id') in reverted
+            ):
+                continue
+            label = self.label_for(entry.get('source', ''), entry.get('target', ''))
+            if label:
+                request = ClassificationCache.normalize_request(entry['request'])
+                samples.setdefault(request, []).append((Path(entry['source']).name, label))
+
+        self._samples = samples
+        self._models = {}
+        self._log_signature = signature
+
+    def model(self, user_request: str) -> Optional[TfidfCentroidModel]:
+        """
+        获取当前需求的模型（样本不足时返回None）
+
+        Args:
+            user_request: 用户需求
+
+        Returns:
+            训练好的模型
+        """
+        request = ClassificationCache.normalize_request(user_request)
+        with self._lock:
+            self._load_samples()
+            if request not in self._models:
+                samples = self._samples.get(request, [])
+                label_counts = Counter(label for _, label in samples)
+                samples = [(name, label) for name, label in samples if label_counts[label] >= self.min_samples]
+                self._models[request] = TfidfCentroidModel().fit(
+                    [extract_features(name) for name, _ in samples],
+                    [label for _, label in samples]
+                ) if samples else None
+            return self._models[request]
+
+    def classify(
+        self,
+        files: List[FileInfo],
+        user_request: str
+    ) -> Tuple[List[Operation], List[FileInfo]]:
+        """
+        用本地模型分类文件
+
+        Args:
+            files: 文件列表
+            user_request: 用户需求
+
+        Returns:
+            (本地生成的操作, 把握不足需要AI分类的文件)
+        """
+        model = self.model(user_request)
+        if model is None or not files:
+            return [], list(files)
+
+        labels, similarity, margin = model.predict(
+            [extract_features(f.name) for f in files]
+        )
+        confident = (similarity >= self.min_similarity) & (margin >= self.min_margin)
+
+        operations = []
+        uncertain = []
+        for i, file in enumerate(files):
+            label = labels[i]
+            if label is None or not confident[i]:
+                uncertain.append(file)
+                continue
+            folder = Path(label) if Path(label).is_absolute() else Path(file.path).parent / label
+            operations.append(Operation(
+                type=OperationType.MOVE,
+                source=file.path,
+                target=str(folder / file.name),
+                reason=f"本地分类器: 与历史整理记录相似（相似度{similarity[i]:.2f}）",
+                confidence=round(float(min(similarity[i], 1.0)), 2)
+            ))
+        return operations, uncertain
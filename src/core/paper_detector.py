@@ -0,0 +1,255 @@
+"""论文规则检测 - 基于关键词特征对PDF打分，在调用LLM之前完成大部分论文的判定"""
+
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+from ..utils.keyword_matcher import KeywordMatcher
+from ..utils.pdf_reader import PDFReader
+from .file_scanner import FileScanner
+
+
+# 学术论文特征及其关键词（不区分大小写）
+PAPER_INDICATORS = {
+    'abstract': ('abstract', '摘要'),
+    'introduction': ('introduction', '引言', '前言'),
+    'references': ('references', '参考文献'),
+    'conclusion': ('conclusion', '结论'),
+    'keywords': ('keywords', '关键词'),
+    'doi': ('doi:', 'doi.org'),
+    'arxiv': ('arxiv',),
+    'journal': ('journal', 'conference', 'proceedings', '期刊'),
+}
+
+# 所有特征关键词编译为一个匹配器，一次扫描文本得到全部命中的特征
+PAPER_INDICATOR_MATCHER = KeywordMatcher(PAPER_INDICATORS)
+
+# 命中指标数达到该值即认为可能是论文
+PAPER_INDICATOR_THRESHOLD = 3
+
+# 置信度按命中指标数归一化（命中5个即为1.0）
+CONFIDENCE_INDICATOR_COUNT = 5.0
+
+# 判定所需读取的文本长度
+SAMPLE_CHARS = 2000
+
+
+def score_paper_text(text: str) -> Dict[str, Any]:
+    """
+    按关键词特征给文本打分
+
+    Args:
+        text: PDF文本样本
+
+    Returns:
+        打分结果（indicators_found, indicator_count, confidence, likely_paper）
+    """
+    indicators = PAPER_INDICATOR_MATCHER.match(text)
+    indicator_count = sum(indicators.values())
+    return {
+        'likely_paper': indicator_count >= PAPER_INDICATOR_THRESHOLD,
+        'confidence': round(min(indicator_count / CONFIDENCE_INDICATOR_COUNT, 1.0), 2),
+        'indicator_count': indicator_count,
+        'indicators_found': indicators,
+    }
+
+
+def check_paper_indicators(file_path: str) -> dict:
+    """
+    检查PDF是否包含学术论文的特征（基于规则）
+
+    Args:
+        file_path: PDF文件路径
+
+    Returns:
+        检测结果字典（likely_paper, confidence, indicator_count 等）
+    """
+    try:
+        # 读取PDF内容
+        text_sample = PDFReader().extract_text_sample(file_path, max_chars=SAMPLE_CHARS)
+
+        if not text_sample or len(text_sample) < 100:
+            return {
+                'likely_paper': False,
+                'confidence': 0.0,
+                'reason': 'PDF内容为空或太短'
+            }
+
+        result = score_paper_text(text_sample)
+        result['recommendation'] = '建议移动到论文文件夹' if result['likely_paper'] else '可能不是学术论文'
+        return result
+
+    except Exception as e:
+        return {
+            'likely_paper': False,
+            'confidence': 0.0,
+            'error': f'论文检测失败: {str(e)}'
+        }
+
+
+class PaperPrePass:
+    """
+    论文规则预筛选 - 并行检测目录中的所有PDF并分为三档
+
+    - papers：命中指标数 ≥ paper_threshold，可直接移动
+    - uncertain：介于两个阈值之间，交给LLM/Agent确认
+    - non_papers：命中指标数 < uncertain_threshold，保持原位
+
+    默认使用线程池并行；执行器在首次检测时创建，同一实例的各次运行复用。
+    """
+
+    SETTING_KEYS = ('paper_threshold', 'uncertain_threshold', 'max_workers', 'use_processes', 'target_folder')
+
+    def __init__(
+        self,
+        paper_threshold: int = 4,
+        uncertain_threshold: int = 2,
+        max_workers: int = 0,
+        use_processes: bool = False,
+        target_folder: str = 'Papers'
+    ):
+        """
+        初始化预筛选
+
+        Args:
+            paper_threshold: 直接判定为论文所需的命中指标数
+            uncertain_threshold: 需要进一步确认的最低命中指标数
+            max_workers: 并行检测的进程/线程数（0表示CPU核数）
+            use_processes: 是否使用进程池（否则使用线程池；子进程以spawn方式启动）
+            target_folder: 论文文件夹（相对于目标目录）
+        """
+        self.paper_threshold = paper_threshold
+        self.uncertain_threshold = min(uncertain_threshold, paper_threshold)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.use_processes = use_processes
+        self.target_folder = target_folder
+
+        self._lock = Lock()
+        self._executor: Optional[Executor] = None
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> Optional['PaperPrePass']:
+        """
+        从配置字典创建（忽略未知字段）
+
+        Returns:
+            预筛选实例，未启用时返回None
+        """
+        if not config or not config.get('enabled', True):
+            return None
+        settings = {k: v for k, v in config.items() if k in cls.SETTING_KEYS and v is not None}
+        return cls(**settings)
+
+    def _get_executor(self) -> Executor:
+        """获取检测用的执行器（首次使用时创建）"""
+        with self._lock:
+            if self._executor is None:
+                if self.use_processes:
+                    # 不使用fork：API服务的进程中有多个线程，fork出的子进程可能因继承的锁而死锁
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix='paper-prepass'
+                    )
+            return self._executor
+
+    def score_files(self, file_paths: List[str]) -> List[Dict[str, Any]]:
+        """
+        并行检测多个PDF
+
+        Args:
+            file_paths: PDF文件路径列表
+
+        Returns:
+            与 file_paths 一一对应的检测结果
+        """
+        if min(self.max_workers, len(file_paths)) <= 1:
+            return [check_paper_indicators(path) for path in file_paths]
+
+        executor = self._get_executor()
+        try:
+            return list(executor.map(check_paper_indicators, file_paths))
+        except (OSError, RuntimeError):
+            if not isinstance(executor, ProcessPoolExecutor):
+                raise
+            # 受限环境中无法创建子进程（或进程池已损坏）时改用线程池
+            with self._lock:
+                self.use_processes = False
+                self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            return list(self._get_executor().map(check_paper_indicators, file_paths))
+
+    def run(self, directory: str, recursive: bool = False, target_folder: Optional[str] = None) -> Dict[str, Any]:
+        """
+        检测目录中的所有PDF并分档
+
+        Args:
+            directory: 目标目录
+            recursive: 是否递归扫描子目录
+            target_folder: 论文文件夹（相对于目标目录或绝对路径，为空时使用初始化时的设置）
+
+        Returns:
+            分档结果（papers, uncertain, non_papers, target_folder, suggested_operations）
+        """
+        target_dir = Path(directory) / (target_folder or self.target_folder)
+        files = FileScanner().scan_directory(
+            directory=directory,
+            recursive=recursive,
+            extensions={'.pdf'},
+            include_metadata=False,
+            include_content=False
+        )
+        # 已在论文文件夹中的文件不再处理
+        paths = [file.path for file in files if Path(file.path).parent != target_dir]
+
+        papers = []
+        uncertain = []
+        non_papers = []
+        for path, check in zip(paths, self.score_files(paths)):
+            count = check.get('indicator_count', 0)
+            entry = {
+                'file_path': path,
+                'confidence': check.get('confidence', 0.0),
+                'indicator_count': count,
+                'indicators': [name for name, found in (check.get('indicators_found') or {}).items() if found],
+            }
+            if count >= self.paper_threshold:
+                papers.append(entry)
+            elif count >= self.uncertain_threshold:
+                uncertain.append(entry)
+            else:
+                entry['reason'] = check.get('reason') or check.get('error') or check.get('recommendation')
+                non_papers.append(entry)
+
+        suggested_operations = []
+        if papers:
+            suggested_operations.append({
+                'operation_type': 'create_folder',
+                'source': '',
+                'target': str(target_dir),
+                'reason': '创建论文存储文件夹'
+            })
+            for paper in papers:
+                suggested_operations.append({
+                    'operation_type': 'move',
+                    'source': paper['file_path'],
+                    'target': str(target_dir / Path(paper['file_path']).name),
+                    'reason': f"学术论文（规则预筛选，命中{paper['indicator_count']}个特征）"
+                })
+
+        return {
+            'directory': directory,
+            'pdf_count': len(paths),
+            'papers': papers,
+            'uncertain': uncertain,
+            'non_papers': non_papers,
+            'target_folder': str(target_dir),
+            'suggested_operations': suggested_operations,
+        }
@@ -0,0 +1,423 @@
+"""本地规则引擎 - 将分类规则编译为按扩展名分派的匹配表，在调用AI之前解决大部分文件"""
+
+import operator
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..models import FileInfo, Operation, OperationType, ClassificationRule, RuleAction
+from ..utils.keyword_matcher import KeywordMatcher
+from .rule_store import RuleStore
+
+
+# 按扩展名归类（内置规则使用）
+EXTENSION_CATEGORIES = {
+    '文档': {'.pdf', '.doc', '.docx', '.txt', '.md', '.rtf', '.odt'},
+    '表格': {'.xls', '.xlsx', '.csv', '.ods'},
+    '演示文稿': {'.ppt', '.pptx', '.key', '.odp'},
+    '图片': {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.webp', '.heic'},
+    '音视频': {'.mp3', '.wav', '.flac', '.mp4', '.mov', '.avi', '.mkv'},
+    '压缩包': {'.zip', '.rar', '.7z', '.tar', '.gz'},
+    '代码': {'.py', '.js', '.ts', '.java', '.c', '.cpp', '.go', '.rs', '.json', '.yaml', '.yml'},
+}
+
+# 用户需求包含这些词时启用内置的按类型分类规则
+TYPE_REQUEST_KEYWORDS = ['类型', '格式', '扩展名', '后缀', 'type', 'format', 'extension']
+
+# {size_bucket} 占位符的分档（上限字节数, 名称）
+SIZE_BUCKETS = (
+    (1024 * 1024, '小文件'),
+    (100 * 1024 * 1024, '中等文件'),
+    (None, '大文件'),
+)
+
+# 元数据条件的运算符
+METADATA_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    'in': lambda actual, expected: actual in expected,
+    'contains': lambda actual, expected: str(expected).lower() in str(actual).lower(),
+}
+
+
+def builtin_rules() -> List[ClassificationRule]:
+    """内置规则：需求要求按类型整理时，按扩展名归入固定的类别文件夹"""
+    return [
+        ClassificationRule(
+            id=f"builtin-{category}",
+            description=f"按类型整理时，{'/'.join(sorted(extensions))} 文件归入「{category}」",
+            target=category,
+            extensions=sorted(extensions),
+            request_keywords=TYPE_REQUEST_KEYWORDS,
+            priority=-100,
+            confidence=0.95,
+            source='builtin',
+        )
+        for category, extensions in EXTENSION_CATEGORIES.items()
+    ]
+
+
+def request_mentions(user_request: str, keyword: str) -> bool:
+    """
+    用户需求是否提到关键词
+
+    英文关键词按整词匹配（允许复数 s），避免 "information" 命中 "format"；
+    中文等其他关键词按子串匹配。
+
+    Args:
+        user_request: 用户需求（已转为小写）
+        keyword: 关键词
+    """
+    keyword = keyword.lower()
+    if re.fullmatch(r'[a-z0-9]+', keyword):
+        return re.search(rf'(?<![a-z0-9]){re.escape(keyword)}s?(?![a-z0-9])', user_request) is not None
+    return keyword in user_request
+
+
+def size_bucket(size: int) -> str:
+    """文件大小分档"""
+    for limit, name in SIZE_BUCKETS:
+        if limit is None or size < limit:
+            return name
+    return SIZE_BUCKETS[-1][1]
+
+
+class _CompiledRule:
+    """编译后的规则：正则和谓词只构建一次"""
+
+    __slots__ = ('rule', 'index', 'pattern', 'has_keywords', 'metadata_checks')
+
+    def __init__(self, rule: ClassificationRule, index: int):
+        self.rule = rule
+        self.index = index
+        self.pattern = re.compile(rule.name_pattern, re.IGNORECASE) if rule.name_pattern else None
+        self.has_keywords = bool(rule.name_keywords)
+        self.metadata_checks = [self._compile_metadata(key, cond) for key, cond in rule.metadata.items()]
+
+    @staticmethod
+    def _compile_metadata(key: str, condition: Any) -> Callable[[Dict[str, Any]], bool]:
+        """编译单个元数据条件"""
+        if isinstance(condition, dict):
+            checks = []
+            for op_name, expected in condition.items():
+                if op_name == 'exists':
+                    checks.append(lambda meta, e=expected: (meta.get(key) is not None) == bool(e))
+                    continue
+                if op_name not in METADATA_OPERATORS:
+                    raise ValueError(f"不支持的元数据运算符: {op_name}")
+                func = METADATA_OPERATORS[op_name]
+
+                def check(meta, f=func, e=expected):
+                    actual = meta.get(key)
+                    if actual is None:
+                        return False
+                    try:
+                        return bool(f(actual, e))
+                    except TypeError:
+                        return False
+                checks.append(check)
+            return lambda meta: all(c(meta) for c in checks)
+        return lambda meta: meta.get(key) == condition
+
+    def matches(self, file: FileInfo, stem: str, keyword_hits: set) -> bool:
+        """检查文件是否满足规则的全部条件（扩展名已由分派表保证）"""
+        rule = self.rule
+        if rule.min_size is not None and file.size < rule.min_size:
+            return False
+        if rule.max_size is not None and file.size > rule.max_size:
+            return False
+        if rule.modified_after is not None and file.modified_time <= rule.modified_after:
+            return False
+        if rule.modified_before is not None and file.modified_time >= rule.modified_before:
+            return False
+        if self.has_keywords and self.index not in keyword_hits:
+            return False
+        if self.pattern is not None and not self.pattern.search(stem):
+            return False
+        if self.metadata_checks:
+            meta = file.metadata or {}
+            if not all(check(meta) for check in self.metadata_checks):
+                return False
+        return True
+
+
+class RuleDispatcher:
+    """
+    针对一个用户需求编译的分派表
+
+    扩展名 -> 按优先级排序的候选规则（含不限扩展名的规则），
+    文件名关键词条件合并为一个 KeywordMatcher，每个文件只扫描一次。
+    """
+
+    def __init__(self, rules: List[ClassificationRule]):
+        """
+        编译规则
+
+        Args:
+            rules: 当前需求下生效的规则（按优先级从高到低排列）
+        """
+        compiled = [_CompiledRule(rule, i) for i, rule in enumerate(rules)]
+        self.rule_count = len(compiled)
+
+        generic = [c for c in compiled if not c.rule.extensions]
+        by_ext: Dict[str, List[_CompiledRule]] = {}
+        for c in compiled:
+            for ext in c.rule.extensions:
+                by_ext.setdefault(ext, []).append(c)
+        # 每个扩展名的候选列表合并不限扩展名的规则，保持优先级顺序
+        self.by_ext: Dict[str, Tuple[_CompiledRule, ...]] = {
+            ext: tuple(sorted(specific + generic, key=lambda c: c.index))
+            for ext, specific in by_ext.items()
+        }
+        self.generic: Tuple[_CompiledRule, ...] = tuple(generic)
+
+        keyword_rules = {c.index: c.rule.name_keywords for c in compiled if c.has_keywords}
+        self.keyword_matcher = KeywordMatcher(keyword_rules) if keyword_rules else None
+
+    def match(self, file: FileInfo) -> Optional[ClassificationRule]:
+        """
+        查找文件命中的第一条规则
+
+        Args:
+            file: 文件信息
+
+        Returns:
+            命中的规则，没有命中时返回None
+        """
+        candidates = self.by_ext.get(file.extension.lower(), self.generic)
+        if not candidates:
+            return None
+
+        stem = Path(file.name).stem
+        keyword_hits = self.keyword_matcher.categories(stem) if self.keyword_matcher else set()
+        for compiled in candidates:
+            if compiled.matches(file, stem, keyword_hits):
+                return compiled.rule
+        return None
+
+
+class RuleEngine:
+    """
+    规则引擎 - 管理分类规则，并按用户需求缓存编译后的分派表
+
+    规则变化时版本号递增，已编译的分派表随之失效。
+    设置了规则存储时，从反馈中学习的规则保存到存储中；存储的版本变化
+    （包括其他控制器写入的规则）后，下次分类前重新加载。
+    """
+
+    # 缓存的分派表数量上限（按用户需求区分）
+    MAX_DISPATCHERS = 32
+
+    # 从反馈中学习的规则来源
+    LEARNED_SOURCE = 'feedback'
+
+    def __init__(self, rules: Iterable[ClassificationRule] = (), store: Optional[RuleStore] = None):
+        """
+        初始化规则引擎
+
+        Args:
+            rules: 初始规则
+            store: 学习规则的持久化存储（为空时学习的规则只保存在内存中）
+        """
+        self._rules: List[ClassificationRule] = []
+        self.version = 0
+        self._dispatchers: Dict[Tuple[int, Tuple[str, ...]], RuleDispatcher] = {}
+        self.store = store
+        self._store_version: Optional[int] = None
+        for rule in rules:
+            self.add(rule)
+        self._sync_store()
+
+    @classmethod
+    def from_config(
+        cls,
+        rules: Optional[List[Dict[str, Any]]] = None,
+        include_builtin: bool = True,
+        store: Optional[RuleStore] = None
+    ) -> 'RuleEngine':
+        """
+        从配置创建规则引擎
+
+        Args:
+            rules: 规则配置列表（ClassificationRule 的字段）
+            include_builtin: 是否加入内置的按类型分类规则
+            store: 学习规则的持久化存储
+
+        Returns:
+            规则引擎实例
+        """
+        all_rules = [ClassificationRule(**{'source': 'config', **rule}) for rule in rules or []]
+        if include_builtin:
+            all_rules.extend(builtin_rules())
+        return cls(all_rules, store=store)
+
+    @property
+    def rules(self) -> List[ClassificationRule]:
+        """全部规则（按优先级从高到低）"""
+        return list(self._rules)
+
+    def add(self, rule: ClassificationRule) -> bool:
+        """
+        添加规则（条件和动作相同的规则不重复添加）
+
+        Returns:
+            是否添加了新规则
+        """
+        signature = rule.signature()
+        if any(existing.signature() == signature for existing in self._rules):
+            return False
+        self._rules.append(rule)
+        # 稳定排序：同优先级的规则保持添加顺序
+        self._rules.sort(key=lambda r: -r.priority)
+        self._invalidate()
+        return True
+
+    def remove(self, predicate: Callable[[ClassificationRule], bool]) -> int:
+        """
+        删除满足条件的规则
+
+        Returns:
+            删除的规则数
+        """
+        before = len(self._rules)
+        self._rules = [rule for rule in self._rules if not predicate(rule)]
+        removed = before - len(self._rules)
+        if removed:
+            self._invalidate()
+        return removed
+
+    def _invalidate(self):
+        self.version += 1
+        self._dispatchers.clear()
+
+    def _sync_store(self, force: bool = False):
+        """存储的版本变化时，用存储中的规则替换内存中的学习规则"""
+        if self.store is None:
+            return
+        store_version = self.store.version
+        if not force and store_version == self._store_version:
+            return
+        stored = self.store.load_rules()
+        self._rules = [rule for rule in self._rules if rule.source != self.LEARNED_SOURCE]
+        self._rules.extend(stored)
+        self._rules.sort(key=lambda r: -r.priority)
+        self._store_version = store_version
+        self._invalidate()
+
+    def learn(self, rule: ClassificationRule) -> bool:
+        """
+        添加从反馈中学习的规则（设置了存储时同时持久化）
+
+        Returns:
+            是否添加了新规则
+        """
+        if self.store is None:
+            return self.add(rule)
+        added = self.store.save_rule(rule)
+        self._sync_store()
+        return added
+
+    def learned_rules(self) -> List[ClassificationRule]:
+        """从反馈中学习的规则（包括存储中其他会话学习的规则）"""
+        self._sync_store()
+        return [rule for rule in self._rules if rule.source == self.LEARNED_SOURCE]
+
+    def reset_learned(self):
+        """丢弃当前会话中未持久化的学习规则（存储中的规则重新加载）"""
+        if self.store is None:
+            self.remove(lambda rule: rule.source == self.LEARNED_SOURCE)
+        else:
+            self._sync_store(force=True)
+
+    def forget_learned(self) -> int:
+        """
+        删除所有学习规则（包括存储中的）
+
+        Returns:
+            删除的规则数
+        """
+        if self.store is not None:
+            self.store.clear_rules()
+            self._store_version = self.store.version
+        return self.remove(lambda rule: rule.source == self.LEARNED_SOURCE)
+
+    def dispatcher(self, user_request: str = "") -> RuleDispatcher:
+        """
+        获取当前需求下的分派表（按需求中命中的条件关键词缓存）
+
+        Args:
+            user_request: 用户需求
+
+        Returns:
+            编译后的分派表
+        """
+        self._sync_store()
+        request = (user_request or "").lower()
+        active = [
+            rule for rule in self._rules
+            if rule.action != RuleAction.HINT
+            and (not rule.request_keywords or any(request_mentions(request, k) for k in rule.request_keywords))
+        ]
+        key = (self.version, tuple(rule.id for rule in active))
+        dispatcher = self._dispatchers.get(key)
+        if dispatcher is None:
+            if len(self._dispatchers) >= self.MAX_DISPATCHERS:
+                self._dispatchers.clear()
+            dispatcher = self._dispatchers[key] = RuleDispatcher(active)
+        return dispatcher
+
+    def classify(
+        self,
+        files: List[FileInfo],
+        user_request: str = ""
+    ) -> Tuple[List[Operation], List[FileInfo], List[FileInfo]]:
+        """
+        用规则分类文件
+
+        Args:
+            files: 文件列表
+            user_request: 用户需求
+
+        Returns:
+            (规则生成的操作, 规则判定保持原位的文件, 未命中规则的文件)
+        """
+        dispatcher = self.dispatcher(user_request)
+        operations = []
+        kept = []
+        unmatched = []
+
+        if dispatcher.rule_count == 0:
+            return operations, kept, list(files)
+
+        for file in files:
+            rule = dispatcher.match(file)
+            if rule is None:
+                unmatched.append(file)
+            elif rule.action == RuleAction.KEEP:
+                kept.append(file)
+            else:
+                operations.append(self.build_operation(rule, file))
+
+        return operations, kept, unmatched
+
+    @staticmethod
+    def build_operation(rule: ClassificationRule, file: FileInfo) -> Operation:
+        """按规则生成移动操作（目标文件夹相对于文件所在目录）"""
+        folder = rule.target.format(
+            year=file.modified_time.strftime('%Y'),
+            month=file.modified_time.strftime('%m'),
+            ext=file.extension.lstrip('.').lower() or '无扩展名',
+            size_bucket=size_bucket(file.size),
+        )
+        target = Path(file.path).parent / folder / file.name
+        return Operation(
+            type=OperationType.MOVE,
+            source=file.path,
+            target=str(target),
+            reason=f"规则: {rule.description}",
+            confidence=rule.confidence
+        )
@@ -0,0 +1,244 @@
+"""规则存储 - 持久化从反馈中学习的分类规则和对话历史，跨会话共享"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from ..models import ClassificationRule
+from ..utils.config import resolve_data_path
+
+
+def _to_jsonable(value: Any) -> Any:
+    """将对话记录转换为可序列化的结构（pydantic模型转为字典）"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode='json')
+    if isinstance(value, dict):
+        return {key: _to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(item) for item in value]
+    return value
+
+
+class RuleStore:
+    """
+    规则存储 - SQLite持久化的带版本规则库
+
+    每次规则变化时版本号递增。读取的规则按版本缓存在内存中，
+    版本不变时不重复查询和解析；规则引擎据此判断是否需要重新编译分派表。
+    """
+
+    def __init__(self, db_path: str = "rules/rules.db", history_limit: int = 20):
+        """
+        初始化规则存储
+
+        Args:
+            db_path: SQLite数据库路径（相对路径位于用户数据目录下）
+            history_limit: 加载对话历史时读取的最近记录数
+        """
+        self.db_path = resolve_data_path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.history_limit = history_limit
+
+        self._lock = Lock()
+        self._cached_version: Optional[int] = None
+        self._cached_rules: List[ClassificationRule] = []
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS learned_rules (
+                id TEXT PRIMARY KEY,
+                signature TEXT NOT NULL UNIQUE,
+                rule TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS store_meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS conversation_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_input TEXT NOT NULL,
+                ai_response TEXT NOT NULL,
+                feedback TEXT,
+                created_at REAL NOT NULL
+            );
+            INSERT OR IGNORE INTO store_meta (key, value) VALUES ('version', 0);
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def signature_hash(rule: ClassificationRule) -> str:
+        """规则签名的哈希（条件和动作相同的规则只保存一条）"""
+        return hashlib.sha256(repr(rule.signature()).encode('utf-8')).hexdigest()[:32]
+
+    @property
+    def version(self) -> int:
+        """规则版本号（其他进程或控制器写入规则后同样会变化）"""
+        with self._lock:
+            return self._version_locked()
+
+    def _version_locked(self) -> int:
+        row = self._conn.execute("SELECT value FROM store_meta WHERE key = 'version'").fetchone()
+        return row[0] if row else 0
+
+    def _bump_version_locked(self):
+        self._conn.execute("UPDATE store_meta SET value = value + 1 WHERE key = 'version'")
+
+    def load_rules(self) -> List[ClassificationRule]:
+        """
+        读取全部规则（按版本缓存）
+
+        Returns:
+            规则列表（按保存顺序）
+        """
+        with self._lock:
+            version = self._version_locked()
+            if version != self._cached_version:
+                rows = self._conn.execute(
+                    "SELECT rule FROM learned_rules ORDER BY created_at, rowid"
+                ).fetchall()
+                self._cached_rules = [ClassificationRule.model_validate_json(row[0]) for row in rows]
+                self._cached_version = version
+            return list(self._cached_rules)
+
+    def save_rule(self, rule: ClassificationRule) -> bool:
+        """
+        保存规则（条件和动作相同的规则不重复保存）
+
+        Returns:
+            是否保存了新规则
+        """
+        with self._lock:
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO learned_rules (id, signature, rule, created_at) VALUES (?, ?, ?, ?)",
+                (rule.id, self.signature_hash(rule), rule.model_dump_json(), time.time())
+            ).rowcount
+            if inserted:
+                self._bump_version_locked()
+            self._conn.commit()
+        return bool(inserted)
+
+    def remove_rules(self, rule_ids: List[str]) -> int:
+        """
+        删除规则
+
+        Args:
+            rule_ids: 规则ID列表
+
+        Returns:
+            删除的规则数
+        """
+        if not rule_ids:
+            return 0
+        with self._lock:
+            placeholders = ",".join("?" * len(rule_ids))
+            removed = self._conn.execute(
+                f"DELETE FROM learned_rules WHERE id IN ({placeholders})", tuple(rule_ids)
+            ).rowcount
+            if removed:
+                self._bump_version_locked()
+            self._conn.commit()
+        return removed
+
+    def clear_rules(self):
+        """清空规则"""
+        with self._lock:
+            self._conn.execute("DELETE FROM learned_rules")
+            self._bump_version_locked()
+            self._conn.commit()
+
+    def add_history(self, entry: Dict[str, Any]) -> int:
+        """
+        保存一条对话记录（只保留最近的若干条）
+
+        Args:
+            entry: 对话记录（user_input, ai_response, feedback）
+
+        Returns:
+            记录ID
+        """
+        with self._lock:
+            entry_id = self._conn.execute(
+                "INSERT INTO conversation_history (user_input, ai_response, feedback, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    entry.get('user_input') or '',
+                    json.dumps(_to_jsonable(entry.get('ai_response') or {}), ensure_ascii=False, default=str),
+                    entry.get('feedback'),
+                    time.time(),
+                )
+            ).lastrowid
+            # 保留记录数为加载数量的10倍，避免数据库无限增长
+            self._conn.execute(
+                "DELETE FROM conversation_history WHERE id NOT IN ("
+                "SELECT id FROM conversation_history ORDER BY id DESC LIMIT ?)",
+                (self.history_limit * 10,)
+            )
+            self._conn.commit()
+        return entry_id
+
+    def set_feedback(self, entry_id: int, feedback: str):
+        """更新对话记录的用户反馈"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE conversation_history SET feedback = ? WHERE id = ?", (feedback, entry_id)
+            )
+            self._conn.commit()
+
+    def load_history(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        读取最近的对话记录
+
+        Args:
+            limit: 读取的记录数（为空时使用 history_limit）
+
+        Returns:
+            对话记录列表（按时间从早到晚）
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, user_input, ai_response, feedback, created_at FROM conversation_history "
+                "ORDER BY id DESC LIMIT ?",
+                (limit if limit is not None else self.history_limit,)
+            ).fetchall()
+        return [
+            {
+                'id': entry_id,
+                'user_input': user_input,
+                'ai_response': json.loads(ai_response),
+                'feedback': feedback,
+                'timestamp': datetime.fromtimestamp(created_at),
+            }
+            for entry_id, user_input, ai_response, feedback, created_at in reversed(rows)
+        ]
+
+    def clear_history(self):
+        """清空对话历史"""
+        with self._lock:
+            self._conn.execute("DELETE FROM conversation_history")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """获取规则存储状态"""
+        with self._lock:
+            rule_count = self._conn.execute("SELECT COUNT(*) FROM learned_rules").fetchone()[0]
+            history_count = self._conn.execute("SELECT COUNT(*) FROM conversation_history").fetchone()[0]
+            version = self._version_locked()
+        return {
+            'rules': rule_count,
+            'history': history_count,
+            'version': version,
+            'db_path': str(self.db_path),
+        }
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,302 @@
+"""虚拟文件系统 - 在内存中模拟整理方案"""
+
+import os
+from pathlib import Path
+from typing import List, Dict, Optional, Set, Iterable
+
+from ..models import FileInfo, Operation, OperationType
+
+
+class VirtualFileSystem:
+    """虚拟文件系统 - 基于扫描索引的内存覆盖层，用于精确的预演（dry run）"""
+
+    def __init__(
+        self,
+        files: Optional[Iterable[FileInfo]] = None,
+        probe_disk: bool = False,
+        mount_points: Optional[List[str]] = None
+    ):
+        """
+        初始化虚拟文件系统
+
+        Args:
+            files: 扫描得到的文件列表，用于构建初始索引
+            probe_disk: 索引中不存在的路径是否回退到磁盘查询（每个路径最多查询一次）
+            mount_points: 挂载点列表，用于按卷统计数据迁移量（默认按路径根划分）
+        """
+        self.probe_disk = probe_disk
+        self.mount_points = sorted(
+            (self._normalize(m) for m in (mount_points or [])),
+            key=len,
+            reverse=True
+        )
+
+        # 路径 -> 文件大小
+        self._files: Dict[str, int] = {}
+        self._dirs: Set[str] = set()
+        # 已确认在磁盘上不存在的路径（仅 probe_disk 模式使用）
+        self._missing: Set[str] = set()
+
+        for file in files or []:
+            self.add_file(file.path, file.size)
+
+    @staticmethod
+    def _normalize(path: str) -> str:
+        """规范化路径（不访问磁盘）"""
+        return os.path.normpath(path)
+
+    def add_file(self, path: str, size: int = 0):
+        """向索引中添加文件"""
+        key = self._normalize(path)
+        self._files[key] = size
+        self._add_parents(key)
+
+    def add_dir(self, path: str):
+        """向索引中添加目录"""
+        key = self._normalize(path)
+        self._dirs.add(key)
+        self._add_parents(key)
+
+    def _add_parents(self, key: str):
+        """登记所有父目录"""
+        parent = os.path.dirname(key)
+        while parent and parent not in self._dirs:
+            self._dirs.add(parent)
+            next_parent = os.path.dirname(parent)
+            if next_parent == parent:
+                break
+            parent = next_parent
+
+    def _probe(self, key: str):
+        """按需从磁盘加载单个路径的状态"""
+        if not self.probe_disk or key in self._missing:
+            return
+
+        path = Path(key)
+        try:
+            if path.is_file():
+                self.add_file(key, path.stat().st_size)
+            elif path.is_dir():
+                self.add_dir(key)
+            else:
+                self._missing.add(key)
+        except OSError:
+            self._missing.add(key)
+
+    def is_file(self, path: str) -> bool:
+        """路径是否为文件"""
+        key = self._normalize(path)
+        if key not in self._files and key not in self._dirs:
+            self._probe(key)
+        return key in self._files
+
+    def is_dir(self, path: str) -> bool:
+        """路径是否为目录"""
+        key = self._normalize(path)
+        if key not in self._files and key not in self._dirs:
+            self._probe(key)
+        return key in self._dirs
+
+    def exists(self, path: str) -> bool:
+        """路径是否存在"""
+        return self.is_file(path) or self.is_dir(path)
+
+    def get_size(self, path: str) -> int:
+        """获取文件（或目录下所有文件）的大小"""
+        key = self._normalize(path)
+        if key in self._files:
+            return self._files[key]
+        prefix = key.rstrip(os.sep) + os.sep
+        return sum(size for p, size in self._files.items() if p.startswith(prefix))
+
+    def volume_of(self, path: str) -> str:
+        """获取路径所在的卷"""
+        key = self._normalize(path)
+        for mount in self.mount_points:
+            if key == mount or key.startswith(mount.rstrip(os.sep) + os.sep):
+                return mount
+        return Path(key).anchor or os.sep
+
+    def _resolve_conflict(self, target: str) -> str:
+        """处理文件名冲突（与 FileOperator._resolve_conflict 的命名规则一致）"""
+        target_path = Path(target)
+        stem = target_path.stem
+        suffix = target_path.suffix
+        parent = target_path.parent
+
+        counter = 1
+        while True:
+            new_path = str(parent / f"{stem}_{counter}{suffix}")
+            if not self.exists(new_path):
+                return new_path
+            counter += 1
+
+    def _move_entry(self, source: str, target: str):
+        """在索引中移动文件或目录"""
+        if source in self._files:
+            self._files[target] = self._files.pop(source)
+            self._add_parents(target)
+            return
+
+        # 目录：整体迁移子树
+        prefix = source.rstrip(os.sep) + os.sep
+        moved_files = [p for p in self._files if p.startswith(prefix)]
+        for p in moved_files:
+            self._files[target + p[len(source):]] = self._files.pop(p)
+        moved_dirs = [d for d in self._dirs if d == source or d.startswith(prefix)]
+        for d in moved_dirs:
+            self._dirs.discard(d)
+            self._dirs.add(target + d[len(source):])
+        self._add_parents(target)
+
+    def _make_dirs(self, path: str, created: List[str], created_by: Dict[str, int], index: int):
+        """创建目录（含父目录），记录新建的目录"""
+        missing = []
+        current = path
+        while current and not self.is_dir(current):
+            missing.append(current)
+            parent = os.path.dirname(current)
+            if parent == current:
+                break
+            current = parent
+
+        for d in reversed(missing):
+            self._dirs.add(d)
+            created.append(d)
+            created_by[d] = index
+
+    def simulate(self, operations: List[Operation]) -> Dict:
+        """
+        在内存中模拟执行整个操作方案
+
+        模拟规则与 FileOperator 的实际执行保持一致：目标目录自动创建，
+        目标已存在时自动追加序号重命名。整个过程不修改磁盘。
+
+        Args:
+            operations: 操作列表
+
+        Returns:
+            模拟结果字典，包含最终路径、冲突、错误和按卷统计的数据迁移量
+        """
+        result = {
+            'total_operations': len(operations),
+            'success_count': 0,
+            'final_paths': {},
+            'conflicts': [],
+            'errors': [],
+            'warnings': [],
+            'created_dirs': [],
+            'bytes_by_volume': {},
+            'cross_volume_bytes': 0,
+        }
+        # 隐式创建的目录 -> 创建它的操作序号
+        implicit_dirs: Dict[str, int] = {}
+        # 已被移走的源路径 -> 移动它的操作序号
+        moved_away: Dict[str, int] = {}
+
+        for index, op in enumerate(operations):
+            try:
+                final_path = self._simulate_single(
+                    op, index, result, implicit_dirs, moved_away
+                )
+            except (FileNotFoundError, ValueError) as e:
+                result['errors'].append({
+                    'index': index,
+                    'operation_id': op.id,
+                    'source': op.source,
+                    'target': op.target,
+                    'error': str(e),
+                })
+                continue
+
+            result['success_count'] += 1
+            result['final_paths'][op.source or op.target] = final_path
+
+        result['failed_count'] = len(result['errors'])
+        result['has_errors'] = result['failed_count'] > 0
+        result['has_conflicts'] = len(result['conflicts']) > 0
+        return result
+
+    def _simulate_single(
+        self,
+        op: Operation,
+        index: int,
+        result: Dict,
+        implicit_dirs: Dict[str, int],
+        moved_away: Dict[str, int]
+    ) -> str:
+        """模拟单个操作，返回最终路径"""
+        if op.type == OperationType.CREATE_FOLDER:
+            target = self._normalize(op.target)
+            if self.is_file(target):
+                raise ValueError(f"目标路径已存在同名文件，无法创建文件夹: {op.target}")
+            if target in implicit_dirs:
+                result['warnings'].append(
+                    f"文件夹已由第 {implicit_dirs[target] + 1} 个操作隐式创建: {op.target}"
+                )
+            self._make_dirs(target, result['created_dirs'], {}, index)
+            return target
+
+        if op.type not in (OperationType.MOVE, OperationType.RENAME):
+            raise ValueError(f"不支持的操作类型: {op.type}")
+
+        source = self._normalize(op.source)
+        if not self.exists(source):
+            if source in moved_away:
+                raise FileNotFoundError(
+                    f"源文件已被第 {moved_away[source] + 1} 个操作移走: {op.source}"
+                )
+            raise FileNotFoundError(f"源文件不存在: {op.source}")
+
+        if op.type == OperationType.RENAME and not Path(op.target).is_absolute():
+            target = self._normalize(os.path.join(os.path.dirname(source), op.target))
+        else:
+            target = self._normalize(op.target)
+
+        if target == source:
+            return target
+
+        parent = os.path.dirname(target)
+        if self.is_file(parent):
+            raise ValueError(f"目标目录是一个已存在的文件: {parent}")
+
+        if op.type == OperationType.MOVE:
+            self._make_dirs(parent, result['created_dirs'], implicit_dirs, index)
+        elif not self.is_dir(parent):
+            raise FileNotFoundError(f"目标目录不存在: {parent}")
+
+        final_path = target
+        if self.exists(target):
+            final_path = self._resolve_conflict(target)
+            result['conflicts'].append({
+                'index': index,
+                'operation_id': op.id,
+                'source': op.source,
+                'target': op.target,
+                'resolved_target': final_path,
+            })
+
+        size = self.get_size(source)
+        self._move_entry(source, final_path)
+        moved_away[source] = index
+        moved_away.pop(final_path, None)
+        self._record_bytes(source, final_path, size, result)
+
+        return final_path
+
+    def _record_bytes(self, source: str, target: str, size: int, result: Dict):
+        """按卷统计数据迁移量"""
+        src_volume = self.volume_of(source)
+        dst_volume = self.volume_of(target)
+
+        stats = result['bytes_by_volume']
+        for volume in (src_volume, dst_volume):
+            stats.setdefault(volume, {'bytes_in': 0, 'bytes_out': 0, 'bytes_moved': 0})
+
+        if src_volume == dst_volume:
+            # 同卷内移动只是元数据更新，不产生数据复制
+            stats[src_volume]['bytes_moved'] += size
+        else:
+            stats[src_volume]['bytes_out'] += size
+            stats[dst_volume]['bytes_in'] += size
+            result['cross_volume_bytes'] += size
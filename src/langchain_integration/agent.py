@@ -1,23 +1,49 @@
 """文件整理Agent - 核心智能决策引擎"""
 
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import json
 import re
+from pathlib import Path
 
 from langchain_core.language_models.base import BaseLanguageModel
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from langchain_core.utils.function_calling import convert_to_openai_tool
 
 from .llm_factory import LLMFactory
-from .prompts import SYSTEM_PROMPT
+from .prompts import SYSTEM_PROMPT, TOOL_CALLING_SYSTEM_PROMPT
+from .observation import ObservationCompactor, AgentHistory, compact_json
+from ..ai.prompt_cache import with_cache_breakpoints, get_prompt_cache_stats
+from ..core.paper_detector import PaperPrePass
 from .tools import (
     FileScannerTool,
     FileAnalyzerTool,
     FileOperatorTool,
-    ValidationTool
+    ValidationTool,
+    BatchFileAnalyzerTool,
+    BatchFileOperatorTool,
+    ClassifyPapersTool
 )
 from .content_analyzer import ContentAnalyzer
 
 
+# 使用原生工具调用（function calling）的Agent类型
+TOOL_CALLING_AGENT_TYPES = ('openai-tools', 'tool-calling', 'tools')
+
+# 首次请求返回这些状态码时，认为模型或服务不支持工具调用
+TOOL_UNSUPPORTED_STATUS_CODES = {400, 404, 422, 501}
+
+
+# 只读工具：同一步骤中的多个调用可以并发执行（文件操作工具按顺序执行）
+CONCURRENT_SAFE_TOOLS = frozenset({
+    'file_scanner', 'file_analyzer', 'validation_tool', 'classify_papers', 'batch_file_analyzer'
+})
+
+
+class ToolCallingUnsupportedError(RuntimeError):
+    """模型或服务不支持原生工具调用"""
+
+
 class FileOrganizerAgent:
     """文件整理Agent - 使用LangChain工具执行文件整理任务"""
     
@@ -26,7 +52,11 @@ class FileOrganizerAgent:
         llm_provider: str,
         config: Dict[str, Any],
         dry_run: bool = False,
-        verbose: bool = True
+        verbose: bool = True,
+        context_config: Optional[Dict[str, Any]] = None,
+        agent_type: str = 'openai-tools',
+        max_parallel_tools: int = 4,
+        paper_prepass: Optional[Dict[str, Any]] = None
     ):
         """
         初始化文件整理Agent
@@ -36,6 +66,10 @@ class FileOrganizerAgent:
             config: LLM配置字典
             dry_run: 是否仅模拟操作
             verbose: 是否显示详细信息
+            context_config: 对话上下文压缩配置（见 ObservationCompactor）
+            agent_type: Agent类型，openai-tools 使用原生工具调用（模型不支持时回退到ReAct），react 使用文本格式
+            max_parallel_tools: 同一步骤中并发执行的只读工具调用数上限（1表示顺序执行）
+            paper_prepass: 论文规则预筛选配置（见 PaperPrePass，为空时不启用）
         """
         self.llm_provider = llm_provider
         self.config = config
@@ -45,6 +79,22 @@ class FileOrganizerAgent:
         # 创建LLM
         self.llm = LLMFactory.create_llm(llm_provider, config)
         
+        # Claude支持显式Prompt缓存：系统提示和逐轮增长的对话前缀可被后续迭代复用
+        self.prompt_cache = llm_provider == 'claude' and config.get('prompt_cache', True)
+        
+        # 原生工具调用：一轮可发出多个调用，不需要解析文本格式；不支持的模型回退到ReAct
+        self.agent_type = agent_type
+        self.tool_calling = agent_type in TOOL_CALLING_AGENT_TYPES and hasattr(self.llm, 'bind_tools')
+        
+        # 同一步骤中的多个只读工具调用并发执行
+        self.max_parallel_tools = max(1, max_parallel_tools)
+        
+        # 论文规则预筛选：特征明确的论文直接移动，只把不确定的文件交给LLM
+        self.paper_prepass = PaperPrePass.from_config(paper_prepass)
+        
+        # 观察结果压缩：控制多轮工具调用时上下文的增长
+        self.compactor = ObservationCompactor.from_config(context_config, model=config.get('model', ''))
+        
         # 创建内容分析器
         self.content_analyzer = ContentAnalyzer(self.llm)
         
@@ -64,9 +114,32 @@ class FileOrganizerAgent:
             FileScannerTool(),
             FileAnalyzerTool(),
             FileOperatorTool(dry_run=dry_run),
-            ValidationTool()
+            ValidationTool(),
+            ClassifyPapersTool(prepass=self.paper_prepass),
+            BatchFileAnalyzerTool(),
+            BatchFileOperatorTool(dry_run=dry_run)
         ]
     
+    def _invoke_llm(self, messages: List[Any], llm: Any = None) -> Any:
+        """
+        调用LLM并记录Prompt缓存命中情况
+        
+        Args:
+            messages: 消息列表
+            llm: 要调用的模型（默认 self.llm，原生工具调用时为绑定了工具的模型）
+            
+        Returns:
+            LLM响应
+        """
+        if self.prompt_cache:
+            messages = with_cache_breakpoints(messages)
+        
+        response = (llm or self.llm).invoke(messages)
+        get_prompt_cache_stats().record_usage_metadata(
+            getattr(response, 'usage_metadata', None), self.llm_provider
+        )
+        return response
+    
     def _is_paper_organization_task(self, user_request: str) -> bool:
         """
         判断是否为论文整理任务
@@ -133,11 +206,76 @@ class FileOrganizerAgent:
             # 检测是否为论文整理任务（默认行为）
             is_paper_task = self._is_paper_organization_task(user_request)
             
-            # 构建完整的提示
-            if is_paper_task:
-                full_prompt = f"""{SYSTEM_PROMPT}
-
-📚 任务类型：学术论文整理（默认模式）
+            # 论文任务先执行规则预筛选，特征明确的论文直接移动
+            prepass = self._run_paper_prepass(directory) if is_paper_task and self.paper_prepass else None
+            
+            # 构建完整的提示（ReAct 和原生工具调用的提示不同）
+            def build_prompt(react: bool) -> str:
+                if prepass:
+                    prompt = self._build_review_prompt(directory, user_request, prepass, react)
+                else:
+                    prompt = self._build_task_prompt(directory, user_request, is_paper_task, react)
+                if context:
+                    prompt += f"\n\n额外信息：{context}"
+                return prompt
+            
+            # 执行任务（预筛选后没有不确定的文件时不需要调用LLM）
+            if prepass and not prepass['uncertain']:
+                result = self._prepass_summary(prepass)
+            else:
+                result = self._run_agent(build_prompt)
+            
+            # 保存到历史
+            self.chat_history.append({
+                'input': user_request,
+                'output': result
+            })
+            
+            response = {
+                'success': True,
+                'output': result,
+                'directory': directory,
+                'dry_run': self.dry_run
+            }
+            if prepass:
+                response['prepass'] = {
+                    'pdf_count': prepass['pdf_count'],
+                    'paper_count': len(prepass['papers']),
+                    'uncertain_count': len(prepass['uncertain']),
+                    'non_paper_count': len(prepass['non_papers']),
+                }
+            return response
+            
+        except Exception as e:
+            if self.verbose:
+                print(f"[Agent] 错误: {e}")
+            return {
+                'success': False,
+                'error': str(e),
+                'directory': directory
+            }
+    
+    def _build_task_prompt(
+        self,
+        directory: str,
+        user_request: str,
+        is_paper_task: bool,
+        react: bool
+    ) -> str:
+        """
+        构建文件整理任务的提示
+        
+        Args:
+            directory: 目标目录
+            user_request: 用户需求描述
+            is_paper_task: 是否为论文整理任务
+            react: 是否使用 ReAct 文本格式（否则为原生工具调用）
+            
+        Returns:
+            任务提示
+        """
+        if is_paper_task:
+            task = f"""📚 任务类型：学术论文整理（默认模式）
 
 目标目录：{directory}
 用户需求：{user_request}
@@ -146,37 +284,39 @@ class FileOrganizerAgent:
 
 请按照以下步骤执行：
 
-1️⃣ 扫描文件
-   使用 file_scanner 工具扫描目录：{directory}
+1️⃣ 识别论文
+   使用 classify_papers 工具一次识别目录中的所有论文：{directory}
+   （返回 papers、uncertain、non_papers 和 suggested_operations）
 
-2️⃣ 识别论文
-   对每个 PDF 文件使用 file_analyzer 工具分析，参数 check_if_paper=True
-   识别哪些是学术论文（查看 paper_check.likely_paper 字段）
+2️⃣ 确认不确定的文件（可选）
+   如果 uncertain 不为空，使用 batch_file_analyzer 工具一次性分析这些文件，
+   参数 file_paths 为文件路径列表，查看每个文件的 likely_paper 字段
 
-3️⃣ 创建论文文件夹
-   使用 file_operator 工具创建文件夹：
-   操作类型：create_folder
-   文件夹名：Papers 或 学术论文（根据文件内容语言选择）
-   路径：{directory}/Papers 或 {directory}/学术论文
+3️⃣ 创建论文文件夹并移动论文
+   使用 batch_file_operator 工具一次提交全部操作：
+   先 create_folder 创建 {directory}/Papers（或 学术论文），再逐个 move 论文
+   可以直接使用 classify_papers 返回的 suggested_operations
+   ⚠️ 不要逐个文件调用 file_analyzer 或 file_operator，每次工具调用都需要一轮对话
 
-4️⃣ 移动论文文件
-   对每个识别出的论文，使用 file_operator 工具移动：
-   操作类型：move
-   源路径：原文件完整路径
-   目标路径：论文文件夹路径
-
-5️⃣ 总结结果
+4️⃣ 总结结果
    报告：
-   - 扫描了多少文件
+   - 检查了多少PDF文件
    - 识别了多少论文
    - 成功移动了多少文件
    - 具体移动了哪些文件
+"""
+            if not react:
+                return task + """
+现在请开始执行，直接调用 classify_papers 工具。完成所有操作后，用文字总结结果。
+"""
+            return f"""{SYSTEM_PROMPT}
 
+{task}
 ⚠️ 你必须使用 ReAct 格式调用工具！
 
 第一步示例：
-Thought: 我需要先扫描目录了解有哪些文件
-Action: file_scanner
+Thought: 我需要先识别目录中的论文
+Action: classify_papers
 Action Input: {{"directory": "{directory}"}}
 
 记住：
@@ -187,8 +327,19 @@ Action Input: {{"directory": "{directory}"}}
 
 现在请开始执行，从第一个 Thought 开始。
 """
-            else:
-                full_prompt = f"""你是一个专业的文件整理助手Agent，擅长根据用户需求智能整理文件。
+        
+        if react:
+            rules = """1. 你必须使用 ReAct 格式（Thought -> Action -> Action Input）
+2. 必须真正执行操作，不要只给建议
+3. 根据用户需求决定需要哪些步骤
+4. 每次收到 Observation 后，继续下一个 Thought + Action + Action Input"""
+        else:
+            rules = """1. 直接调用工具执行操作，不要只给建议
+2. 根据用户需求决定需要哪些步骤
+3. 互不依赖的工具调用可以在同一轮中同时发出
+4. 完成所有操作后，不再调用工具，直接用文字总结执行结果"""
+        
+        task = f"""你是一个专业的文件整理助手Agent，擅长根据用户需求智能整理文件。
 
 📁 任务信息：
 目标目录：{directory}
@@ -199,20 +350,24 @@ Action Input: {{"directory": "{directory}"}}
 2. file_analyzer - 分析文件内容和元数据
 3. file_operator - 执行文件操作（创建文件夹、移动文件等）
 4. validation_tool - 验证操作的安全性
+5. batch_file_analyzer - 一次分析多个文件
+6. batch_file_operator - 一次执行多个文件操作（创建文件夹、移动文件等）
 
 ⚠️ 重要规则：
-1. 你必须使用 ReAct 格式（Thought -> Action -> Action Input）
-2. 必须真正执行操作，不要只给建议
-3. 根据用户需求决定需要哪些步骤
-4. 每次收到 Observation 后，继续下一个 Thought + Action + Action Input
+{rules}
 
 💡 建议流程：
 1. 先用 file_scanner 扫描目录了解文件情况
 2. 根据用户需求分析文件（可能需要 file_analyzer）
-3. 创建必要的文件夹（file_operator, operation_type="create_folder"）
-4. 移动或重命名文件（file_operator, operation_type="move"）
-5. 总结执行结果
-
+3. 创建必要的文件夹并移动或重命名文件：文件较多时使用 batch_file_operator 一次提交所有操作，
+   单个操作可使用 file_operator（operation_type="create_folder" / "move" / "rename"）
+4. 总结执行结果
+"""
+        if not react:
+            return task + """
+现在请开始执行，直接调用工具。
+"""
+        return task + f"""
 ReAct 格式示例：
 Thought: 我需要先扫描目录了解有哪些文件
 Action: file_scanner
@@ -220,34 +375,135 @@ Action Input: {{"directory": "{directory}"}}
 
 现在请开始执行，严格使用 ReAct 格式，从第一个 Thought 开始。
 """
+    
+    def _run_paper_prepass(self, directory: str) -> Dict[str, Any]:
+        """
+        执行论文规则预筛选，并直接移动特征明确的论文
+        
+        Args:
+            directory: 目标目录
             
-            if context:
-                full_prompt += f"\n\n额外信息：{context}"
-            
-            # 执行任务
-            result = self._execute_with_tools(full_prompt)
-            
-            # 保存到历史
-            self.chat_history.append({
-                'input': user_request,
-                'output': result
-            })
+        Returns:
+            预筛选结果（见 PaperPrePass.run），附带 move_result
+        """
+        prepass = self.paper_prepass.run(directory)
+        
+        if prepass['suggested_operations']:
+            operator = self._find_tool('batch_file_operator')
+            prepass['move_result'] = json.loads(operator._run(operations=prepass['suggested_operations']))
+        
+        if self.verbose:
+            print(f"[Agent] 规则预筛选: {prepass['pdf_count']} 个PDF，论文 {len(prepass['papers'])}，"
+                  f"待确认 {len(prepass['uncertain'])}，非论文 {len(prepass['non_papers'])}")
+        
+        return prepass
+    
+    def _prepass_summary(self, prepass: Dict[str, Any]) -> str:
+        """生成规则预筛选的结果报告（没有需要LLM确认的文件时使用）"""
+        move_result = prepass.get('move_result') or {}
+        lines = [
+            "规则预筛选完成，未调用LLM：",
+            f"- 检查了 {prepass['pdf_count']} 个PDF文件",
+            f"- 识别论文 {len(prepass['papers'])} 篇，移动到 {prepass['target_folder']}",
+            f"- 其余 {len(prepass['non_papers'])} 个文件不是论文，保持原位",
+        ]
+        if move_result:
+            lines.append(f"- {'模拟' if self.dry_run else ''}执行操作 {move_result.get('success_count', 0)} 个，"
+                         f"失败 {move_result.get('failed_count', 0)} 个")
+        failures = move_result.get('rejected', []) + move_result.get('errors', [])
+        if failures:
+            lines.append(f"- 失败详情：{compact_json(failures)}")
+        if prepass['papers']:
+            lines.append("")
+            lines.append("移动的论文：")
+            lines.extend(f"- {Path(paper['file_path']).name}" for paper in prepass['papers'])
+        return "\n".join(lines)
+    
+    def _build_review_prompt(
+        self,
+        directory: str,
+        user_request: str,
+        prepass: Dict[str, Any],
+        react: bool
+    ) -> str:
+        """
+        构建规则预筛选之后的任务提示：只需确认特征不足的文件
+        
+        Args:
+            directory: 目标目录
+            user_request: 用户需求描述
+            prepass: 预筛选结果
+            react: 是否使用 ReAct 文本格式（否则为原生工具调用）
             
-            return {
-                'success': True,
-                'output': result,
-                'directory': directory,
-                'dry_run': self.dry_run
-            }
+        Returns:
+            任务提示
+        """
+        target = prepass['target_folder']
+        uncertain_paths = [entry['file_path'] for entry in prepass['uncertain']]
+        uncertain_list = "\n".join(
+            f"- {entry['file_path']}（命中特征: {', '.join(entry['indicators'])}）"
+            for entry in prepass['uncertain']
+        )
+        task = f"""📚 任务类型：学术论文整理（规则预筛选之后）
+
+目标目录：{directory}
+用户需求：{user_request}
+
+规则预筛选已检查 {prepass['pdf_count']} 个PDF文件：
+- {len(prepass['papers'])} 篇论文特征明确，已移动到 {target}
+- {len(prepass['non_papers'])} 个文件不是论文，保持原位
+- 以下 {len(prepass['uncertain'])} 个文件的论文特征不足，需要你确认：
+{uncertain_list}
+
+请按照以下步骤执行：
+
+1️⃣ 使用 batch_file_analyzer 一次分析上述文件（analyze_content=true），
+   根据标题、作者和内容样本判断每个文件是否为学术论文
+
+2️⃣ 使用 batch_file_operator 一次将确认的论文移动到 {target}
+   （文件夹不存在时先 create_folder）
+
+3️⃣ 总结结果，包括预筛选已移动的论文
+"""
+        if not react:
+            return task + """
+现在请开始执行，直接调用 batch_file_analyzer 工具。完成所有操作后，用文字总结结果。
+"""
+        action_input = compact_json({'file_paths': uncertain_paths, 'analyze_content': True})
+        return f"""{SYSTEM_PROMPT}
+
+{task}
+⚠️ 你必须使用 ReAct 格式调用工具！
+
+第一步示例：
+Thought: 我需要分析这些特征不足的文件
+Action: batch_file_analyzer
+Action Input: {action_input}
+
+现在请开始执行，从第一个 Thought 开始。
+"""
+    
+    def _run_agent(self, build_prompt: Callable[[bool], str]) -> str:
+        """
+        选择执行引擎并运行任务
+        
+        支持原生工具调用时优先使用，模型或服务不支持时回退到 ReAct 并记住该结果。
+        
+        Args:
+            build_prompt: 根据是否为 ReAct 模式构建任务提示的函数
             
-        except Exception as e:
-            if self.verbose:
-                print(f"[Agent] 错误: {e}")
-            return {
-                'success': False,
-                'error': str(e),
-                'directory': directory
-            }
+        Returns:
+            最终回复
+        """
+        if self.tool_calling:
+            try:
+                return self._execute_with_tool_calling(build_prompt(False))
+            except ToolCallingUnsupportedError as e:
+                self.tool_calling = False
+                if self.verbose:
+                    print(f"[Agent] ⚠️  模型不支持原生工具调用，回退到 ReAct 模式: {e}")
+        
+        return self._execute_with_tools(build_prompt(True))
     
     def _find_tool(self, tool_name: str):
         """
@@ -275,11 +531,28 @@ Action Input: {{"directory": "{directory}"}}
             text: LLM 的输出文本
             
         Returns:
-            (action_name, action_input, thought) 元组
+            (action_name, action_input, thought) 元组（有多个工具调用时返回第一个）
             如果没有找到工具调用，action_name 为 None
         """
+        actions, thought = self._parse_react_actions(text)
+        if not actions:
+            return None, None, thought
+        action_name, action_input = actions[0]
+        return action_name, action_input, thought
+    
+    def _parse_react_actions(self, text: str) -> Tuple[List[Tuple[str, Dict[str, Any]]], Optional[str]]:
+        """
+        解析 ReAct 输出中的全部工具调用（一次输出可包含多组 Action + Action Input）
+        
+        Args:
+            text: LLM 的输出文本
+            
+        Returns:
+            (actions, thought) 元组，actions 为 (工具名称, 参数) 列表；
+            最终答案返回 [("Final Answer", {})]，参数无法解析的调用会被忽略
+        """
         if not text:
-            return None, None, None
+            return [], None
         
         # 提取 Thought
         thought = None
@@ -289,46 +562,66 @@ Action Input: {{"directory": "{directory}"}}
         
         # 检查是否是最终答案
         if 'Final Answer:' in text or 'Final Answer：' in text:
-            return "Final Answer", {}, thought
+            return [("Final Answer", {})], thought
         
-        # 提取 Action
-        action_match = re.search(r'Action:\s*(\w+)', text, re.IGNORECASE)
-        if not action_match:
-            return None, None, thought
+        # 提取 Action，每个 Action 的参数在它和下一个 Action 之间查找
+        action_matches = list(re.finditer(r'Action:\s*(\w+)', text, re.IGNORECASE))
+        actions = []
+        for i, action_match in enumerate(action_matches):
+            end = action_matches[i + 1].start() if i + 1 < len(action_matches) else len(text)
+            action_input = self._parse_action_input(text[action_match.end():end])
+            if action_input is not None:
+                actions.append((action_match.group(1).strip(), action_input))
         
-        action_name = action_match.group(1).strip()
+        return actions, thought
+    
+    def _parse_action_input(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        解析 Action Input 的JSON参数
         
-        # 提取 Action Input (JSON格式)
-        action_input = {}
+        Args:
+            text: Action 之后的文本
+            
+        Returns:
+            参数字典；没有参数时为空字典，无法解析时为 None
+        """
+        # 批量工具的参数包含嵌套的对象列表，按JSON语法解码到匹配的右括号为止
         input_match = re.search(r'Action Input:\s*(\{.+?\})', text, re.DOTALL | re.IGNORECASE)
+        if not input_match:
+            return {}
         
-        if input_match:
-            try:
-                json_str = input_match.group(1).strip()
-                action_input = json.loads(json_str)
-            except json.JSONDecodeError as e:
-                if self.verbose:
-                    print(f"[Agent] JSON解析失败: {e}")
-                    print(f"[Agent] JSON字符串: {json_str}")
-                # 尝试修复常见的JSON错误
-                try:
-                    # 替换单引号为双引号
-                    json_str_fixed = json_str.replace("'", '"')
-                    action_input = json.loads(json_str_fixed)
-                except:
-                    return None, None, thought
+        try:
+            action_input, _ = json.JSONDecoder().raw_decode(text, input_match.start(1))
+            return action_input
+        except json.JSONDecodeError:
+            pass
         
-        return action_name, action_input, thought
+        json_str = input_match.group(1).strip()
+        try:
+            return json.loads(json_str)
+        except json.JSONDecodeError as e:
+            if self.verbose:
+                print(f"[Agent] JSON解析失败: {e}")
+                print(f"[Agent] JSON字符串: {json_str}")
+            # 尝试修复常见的JSON错误
+            try:
+                # 替换单引号为双引号
+                return json.loads(json_str.replace("'", '"'))
+            except json.JSONDecodeError:
+                return None
     
     def _execute_with_tools(self, prompt: str, max_iterations: int = 15) -> str:
         """
         使用工具执行任务（ReAct 模式）
         
-        不依赖 function calling，使用 ReAct 格式解析工具调用
+        不依赖 function calling，使用 ReAct 格式解析工具调用，一次输出可包含多个调用。
+        工具结果经 ObservationCompactor 压缩后加入历史，较早的步骤只保留摘要。
         """
         # 初始化消息历史
-        messages = [SystemMessage(content=SYSTEM_PROMPT)]
-        messages.append(HumanMessage(content=prompt))
+        history = AgentHistory(
+            [SystemMessage(content=SYSTEM_PROMPT), HumanMessage(content=prompt)],
+            self.compactor
+        )
         
         iterations = 0
         final_response = ""
@@ -341,9 +634,15 @@ Action Input: {{"directory": "{directory}"}}
                 print(f"[Agent] 迭代 {iterations}/{max_iterations}")
                 print(f"{'='*60}")
             
+            if not history.reserve():
+                final_response = f"已达到本次运行的token预算（{self.compactor.run_token_budget}），任务可能未完全完成"
+                if self.verbose:
+                    print(f"\n[Agent] ⚠️  {final_response}")
+                break
+            
             try:
                 # 调用 LLM（不使用 bind_tools）
-                response = self.llm.invoke(messages)
+                response = self._invoke_llm(history.messages())
                 
                 # 提取响应内容
                 if hasattr(response, 'content'):
@@ -354,48 +653,47 @@ Action Input: {{"directory": "{directory}"}}
                 if self.verbose:
                     print(f"\n[Agent] LLM响应:\n{content[:500]}...")
                 
-                # 解析 ReAct 输出
-                action_name, action_input, thought = self._parse_react_output(content)
+                # 解析 ReAct 输出（一次输出可包含多个工具调用）
+                actions, thought = self._parse_react_actions(content)
                 
                 if self.verbose and thought:
                     print(f"\n[Agent] 💭 Thought: {thought[:200]}")
                 
                 # 检查是否是最终答案
-                if action_name == "Final Answer":
+                if actions and actions[0][0] == "Final Answer":
                     final_response = content
                     if self.verbose:
                         print(f"\n[Agent] ✅ 任务完成")
                     break
                 
                 # 如果没有工具调用，可能是 LLM 直接给出了答案
-                if not action_name or not action_input:
+                actions = [(name, action_input) for name, action_input in actions if action_input]
+                if not actions:
                     if self.verbose:
                         print(f"\n[Agent] ⚠️  未检测到工具调用，可能任务已完成")
                     final_response = content
                     break
                 
-                # 执行工具调用
-                if self.verbose:
-                    print(f"\n[Agent] 🔧 Action: {action_name}")
-                    print(f"[Agent] 📝 Action Input: {json.dumps(action_input, ensure_ascii=False, indent=2)}")
+                # 执行工具调用（互不依赖的只读工具并发执行）
+                results = self._execute_actions(actions, validate_args=False)
+                observations = [observation for observation, _ in results]
+                statuses = {status for _, status in results}
                 
-                try:
-                    # 查找并执行工具
-                    tool = self._find_tool(action_name)
-                    tool_result = tool._run(**action_input)
-                    
-                    if self.verbose:
-                        # 显示工具结果的摘要
-                        result_preview = str(tool_result)[:300]
-                        print(f"\n[Agent] 📊 Observation: {result_preview}...")
-                    
-                    # 将工具结果添加到消息历史
-                    messages.append(AIMessage(content=content))
-                    
-                    # 添加 Observation 并提醒继续使用 ReAct 格式
-                    observation_message = f"""Observation: {tool_result}
-
-现在，请继续思考下一步操作，必须使用 ReAct 格式：
+                if 'unknown_tool' in statuses:
+                    # 工具不存在
+                    followup = """请使用正确的工具名称重试，必须使用 ReAct 格式：
+Thought: [你的思考]
+Action: [正确的工具名称]
+Action Input: [JSON参数]"""
+                elif 'failed' in statuses:
+                    # 工具执行失败
+                    followup = """请分析错误原因并继续，必须使用 ReAct 格式：
+Thought: [你的思考]
+Action: [工具名称]
+Action Input: [JSON参数]"""
+                else:
+                    # 压缩后的工具结果加入历史，并提醒继续使用 ReAct 格式
+                    followup = """现在，请继续思考下一步操作，必须使用 ReAct 格式：
 Thought: [你的思考]
 Action: [工具名称]
 Action Input: [JSON参数]
@@ -403,34 +701,12 @@ Action Input: [JSON参数]
 如果所有任务都已完成，请输出：
 Thought: 所有操作已完成
 Final Answer: [总结结果]"""
-                    
-                    messages.append(HumanMessage(content=observation_message))
-                    
-                except ValueError as e:
-                    # 工具不存在
-                    error_msg = f"错误: {str(e)}"
-                    if self.verbose:
-                        print(f"\n[Agent] ❌ {error_msg}")
-                    messages.append(AIMessage(content=content))
-                    messages.append(HumanMessage(content=f"""Observation: {error_msg}
-
-请使用正确的工具名称重试，必须使用 ReAct 格式：
-Thought: [你的思考]
-Action: [正确的工具名称]
-Action Input: [JSON参数]"""))
-                    
-                except Exception as e:
-                    # 工具执行失败
-                    error_msg = f"工具执行失败: {str(e)}"
-                    if self.verbose:
-                        print(f"\n[Agent] ❌ {error_msg}")
-                    messages.append(AIMessage(content=content))
-                    messages.append(HumanMessage(content=f"""Observation: {error_msg}
-
-请分析错误原因并继续，必须使用 ReAct 格式：
-Thought: [你的思考]
-Action: [工具名称]
-Action Input: [JSON参数]"""))
+                
+                history.add_actions(content, thought, actions, observations, followup)
+                
+                if self.verbose:
+                    print(f"[Agent] 上下文: {history.context_tokens()} tokens（已压缩 {history.compacted} 步），"
+                          f"累计发送 {history.tokens_sent} tokens")
                 
                 # 继续下一轮迭代
                 continue
@@ -452,6 +728,177 @@ Action Input: [JSON参数]"""))
         
         return final_response or "任务执行完成"
     
+    def _execute_with_tool_calling(self, prompt: str, max_iterations: int = 15) -> str:
+        """
+        使用原生工具调用执行任务
+        
+        模型通过结构化的 tool_calls 调用工具，一轮可以发出多个调用，
+        不存在 ReAct 文本格式解析失败的情况。
+        
+        Raises:
+            ToolCallingUnsupportedError: 模型或服务不支持工具调用（仅在首次请求时判断）
+        """
+        try:
+            llm = self.llm.bind_tools(self.tools)
+        except NotImplementedError as e:
+            raise ToolCallingUnsupportedError(str(e) or type(self.llm).__name__) from e
+        
+        # 工具定义随每次请求发送，计入上下文
+        tool_schemas = compact_json([convert_to_openai_tool(tool) for tool in self.tools])
+        history = AgentHistory(
+            [SystemMessage(content=TOOL_CALLING_SYSTEM_PROMPT), HumanMessage(content=prompt)],
+            self.compactor,
+            overhead_tokens=self.compactor.count(tool_schemas)
+        )
+        
+        iterations = 0
+        final_response = ""
+        
+        while iterations < max_iterations:
+            iterations += 1
+            
+            if self.verbose:
+                print(f"\n{'='*60}")
+                print(f"[Agent] 迭代 {iterations}/{max_iterations}（工具调用模式）")
+                print(f"{'='*60}")
+            
+            if not history.reserve():
+                final_response = f"已达到本次运行的token预算（{self.compactor.run_token_budget}），任务可能未完全完成"
+                if self.verbose:
+                    print(f"\n[Agent] ⚠️  {final_response}")
+                break
+            
+            try:
+                response = self._invoke_llm(history.messages(), llm=llm)
+            except Exception as e:
+                if iterations == 1 and self._tool_calling_unsupported(e):
+                    raise ToolCallingUnsupportedError(str(e)) from e
+                if self.verbose:
+                    print(f"\n[Agent] ❌ 迭代错误: {e}")
+                final_response = f"执行过程中出现错误: {str(e)}"
+                break
+            
+            tool_calls = getattr(response, 'tool_calls', None) or []
+            
+            # 没有工具调用即为最终回复
+            if not tool_calls:
+                final_response = self._response_text(response)
+                if self.verbose:
+                    print(f"\n[Agent] ✅ 任务完成")
+                break
+            
+            results = self._execute_actions(
+                [(call['name'], call.get('args') or {}) for call in tool_calls],
+                validate_args=True
+            )
+            history.add_tool_calls(response, [observation for observation, _ in results])
+            
+            if self.verbose:
+                print(f"[Agent] 上下文: {history.context_tokens()} tokens（已压缩 {history.compacted} 步），"
+                      f"累计发送 {history.tokens_sent} tokens")
+        
+        if iterations >= max_iterations and not final_response:
+            final_response = "已达到最大迭代次数，任务可能未完全完成"
+            if self.verbose:
+                print(f"\n[Agent] ⚠️  {final_response}")
+        
+        return final_response or "任务执行完成"
+    
+    def _execute_actions(
+        self,
+        actions: List[Tuple[str, Dict[str, Any]]],
+        validate_args: bool
+    ) -> List[Tuple[str, str]]:
+        """
+        执行一个步骤中的全部工具调用
+        
+        连续的只读工具调用在线程池中并发执行；文件操作工具会修改文件系统，
+        按顺序单独执行，并等待之前的调用全部完成。
+        
+        Args:
+            actions: (工具名称, 参数) 列表
+            validate_args: 是否按工具的参数定义校验参数（原生工具调用时使用）
+            
+        Returns:
+            与 actions 一一对应的 (观察结果, 状态) 列表，状态为 ok / unknown_tool / failed
+        """
+        if self.verbose:
+            for name, args in actions:
+                print(f"\n[Agent] 🔧 Action: {name}")
+                print(f"[Agent] 📝 Action Input: {json.dumps(args, ensure_ascii=False, indent=2)}")
+        
+        def run(action: Tuple[str, Dict[str, Any]]) -> Tuple[str, str]:
+            return self._run_tool(action[0], action[1], validate_args)
+        
+        # 按文件操作工具切分为若干组，组内的只读调用可以并发
+        groups: List[List[Tuple[str, Dict[str, Any]]]] = []
+        for action in actions:
+            if groups and action[0] in CONCURRENT_SAFE_TOOLS and groups[-1][-1][0] in CONCURRENT_SAFE_TOOLS:
+                groups[-1].append(action)
+            else:
+                groups.append([action])
+        
+        results = []
+        for group in groups:
+            workers = min(self.max_parallel_tools, len(group))
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='agent-tool') as executor:
+                    results.extend(executor.map(run, group))
+            else:
+                results.extend(run(action) for action in group)
+        
+        if self.verbose:
+            if len(actions) > 1:
+                print(f"\n[Agent] ⚡ 本轮执行了 {len(actions)} 个工具调用")
+            for observation, status in results:
+                marker = '📊 Observation' if status == 'ok' else '❌'
+                print(f"\n[Agent] {marker}: {observation[:300]}...")
+        
+        return results
+    
+    def _run_tool(self, name: str, args: Dict[str, Any], validate_args: bool) -> Tuple[str, str]:
+        """
+        执行一个工具调用
+        
+        Args:
+            name: 工具名称
+            args: 工具参数
+            validate_args: 是否通过 invoke 按工具的参数定义校验参数
+            
+        Returns:
+            (压缩后的观察结果或错误说明, 状态)
+        """
+        try:
+            tool = self._find_tool(name)
+        except ValueError as e:
+            return f"错误: {str(e)}", 'unknown_tool'
+        
+        try:
+            result = tool.invoke(args) if validate_args else tool._run(**args)
+        except Exception as e:
+            return f"工具执行失败: {str(e)}", 'failed'
+        
+        return self.compactor.compact(name, str(result)), 'ok'
+    
+    @staticmethod
+    def _tool_calling_unsupported(error: Exception) -> bool:
+        """判断首次请求的错误是否表示不支持工具调用"""
+        status = getattr(error, 'status_code', None)
+        if status is None:
+            status = getattr(getattr(error, 'response', None), 'status_code', None)
+        return status in TOOL_UNSUPPORTED_STATUS_CODES
+    
+    @staticmethod
+    def _response_text(response: Any) -> str:
+        """提取LLM响应中的文本（兼容内容块列表）"""
+        content = getattr(response, 'content', response)
+        if isinstance(content, list):
+            return "\n".join(
+                block.get('text', '') if isinstance(block, dict) else str(block)
+                for block in content
+            ).strip()
+        return str(content)
+    
     def analyze_file(self, file_path: str) -> Dict[str, Any]:
         """
         分析单个文件
@@ -495,7 +942,7 @@ Action Input: [JSON参数]"""))
 请开始执行。
 """
             
-            result = self._execute_with_tools(prompt)
+            result = self._run_agent(lambda react: prompt)
             
             return {
                 'success': True,
@@ -533,7 +980,7 @@ Action Input: [JSON参数]"""))
 注意：只分析和建议，不要实际执行操作。
 """
             
-            result = self._execute_with_tools(prompt)
+            result = self._run_agent(lambda react: prompt)
             
             return {
                 'success': True,
@@ -570,7 +1017,7 @@ Action Input: [JSON参数]"""))
             messages.append(HumanMessage(content=message))
             
             # 调用LLM
-            response = self.llm.invoke(messages)
+            response = self._invoke_llm(messages)
             
             # 提取响应
             if hasattr(response, 'content'):
@@ -593,6 +1040,13 @@ Action Input: [JSON参数]"""))
         """清除会话记忆"""
         self.chat_history.clear()
     
+    def set_dry_run(self, dry_run: bool):
+        """切换模拟执行模式（同时更新文件操作工具）"""
+        self.dry_run = dry_run
+        for tool in self.tools:
+            if hasattr(tool, 'dry_run_mode'):
+                object.__setattr__(tool, 'dry_run_mode', dry_run)
+    
     def get_chat_history(self) -> List[Dict[str, str]]:
         """获取对话历史"""
         return self.chat_history.copy()
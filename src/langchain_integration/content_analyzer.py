@@ -8,6 +8,7 @@ from langchain_core.language_models.base import BaseLanguageModel
 
 from ..utils.pdf_reader import PDFReader
 from ..utils.file_metadata import FileMetadataExtractor
+from ..core.paper_detector import score_paper_text
 from .prompts import CONTENT_ANALYSIS_PROMPT, PAPER_IDENTIFICATION_PROMPT
 
 
@@ -270,15 +271,8 @@ class ContentAnalyzer:
                     'confidence': 0.0
                 }
             
-            # 简单规则检测（快速预判）
-            paper_indicators = [
-                'abstract', 'introduction', 'references', 'conclusion',
-                '摘要', '引言', '参考文献', '结论',
-                'doi:', 'arxiv:', 'published', 'journal', 'conference'
-            ]
-            
-            content_lower = content.lower()
-            indicator_count = sum(1 for ind in paper_indicators if ind in content_lower)
+            # 简单规则检测（快速预判，与 FileAnalyzerTool 使用相同的特征）
+            indicator_count = score_paper_text(content)['indicator_count']
             
             # 如果明显不是论文，直接返回
             if indicator_count < 2:
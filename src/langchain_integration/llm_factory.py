@@ -1,10 +1,72 @@
 """LLM工厂 - 创建不同提供商的LLM实例"""
 
+import asyncio
+import time
 from typing import Dict, Any, Optional
 from langchain_anthropic import ChatAnthropic
 from langchain_openai import ChatOpenAI
 from langchain_community.llms import Ollama
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.language_models.base import BaseLanguageModel
+from langchain_core.rate_limiters import BaseRateLimiter
+
+from ..ai.rate_limiter import ProviderGuard, get_provider_guard, is_retryable
+
+
+class GuardRateLimiter(BaseRateLimiter):
+    """将提供商保护层的令牌桶接入LangChain模型（按请求数限流）"""
+    
+    def __init__(self, guard: ProviderGuard):
+        """初始化限流器"""
+        self.guard = guard
+    
+    def acquire(self, *, blocking: bool = True) -> bool:
+        """获取一次请求的额度"""
+        wait = self.guard.limiter.reserve(blocking=blocking)
+        if wait is None:
+            return False
+        if wait:
+            time.sleep(wait)
+        return True
+    
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        """异步获取一次请求的额度"""
+        wait = self.guard.limiter.reserve(blocking=blocking)
+        if wait is None:
+            return False
+        if wait:
+            await asyncio.sleep(wait)
+        return True
+
+
+class GuardCallbackHandler(BaseCallbackHandler):
+    """将LangChain模型的调用结果计入提供商保护层的熔断器"""
+    
+    # 熔断时需要中断调用，回调中的异常必须向外抛出
+    raise_error = True
+    
+    def __init__(self, guard: ProviderGuard):
+        """初始化回调处理器"""
+        self.guard = guard
+    
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        """请求前检查熔断状态"""
+        self.guard.breaker.before_call()
+    
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        """请求前检查熔断状态"""
+        self.guard.breaker.before_call()
+    
+    def on_llm_end(self, response, **kwargs):
+        """记录成功"""
+        self.guard.breaker.record_success()
+    
+    def on_llm_error(self, error, **kwargs):
+        """记录失败（只有临时性错误计入熔断）"""
+        if is_retryable(error):
+            self.guard.breaker.record_failure()
+        else:
+            self.guard.breaker.release()
 
 
 class LLMFactory:
@@ -33,6 +95,20 @@ class LLMFactory:
         else:
             raise ValueError(f"不支持的LLM提供商: {provider}")
     
+    @staticmethod
+    def _guard_kwargs(provider: str, config: Dict[str, Any], chat_model: bool = True) -> Dict[str, Any]:
+        """
+        限流、重试和熔断参数（与同一提供商的AI适配器共享保护层）
+        
+        重试交给SDK处理（会遵循Retry-After），令牌桶和熔断器与适配器共用。
+        """
+        guard = get_provider_guard(provider, config.get('rate_limit'))
+        kwargs: Dict[str, Any] = {'callbacks': [GuardCallbackHandler(guard)]}
+        if chat_model:
+            kwargs['rate_limiter'] = GuardRateLimiter(guard)
+            kwargs['max_retries'] = guard.max_retries
+        return kwargs
+    
     @staticmethod
     def _create_claude_llm(config: Dict[str, Any]) -> ChatAnthropic:
         """创建Claude LLM"""
@@ -45,6 +121,7 @@ class LLMFactory:
             model=config.get('model', 'claude-3-5-sonnet-20241022'),
             max_tokens=config.get('max_tokens', 4096),
             temperature=config.get('temperature', 0.7),
+            **LLMFactory._guard_kwargs('claude', config),
         )
     
     @staticmethod
@@ -59,6 +136,7 @@ class LLMFactory:
             model=config.get('model', 'gpt-4-turbo-preview'),
             max_tokens=config.get('max_tokens', 4096),
             temperature=config.get('temperature', 0.7),
+            **LLMFactory._guard_kwargs('openai', config),
         )
     
     @staticmethod
@@ -81,6 +159,7 @@ class LLMFactory:
             model=model,
             max_tokens=config.get('max_tokens', 4096),
             temperature=config.get('temperature', 0.7),
+            **LLMFactory._guard_kwargs('custom', config),
         )
     
     @staticmethod
@@ -93,6 +172,7 @@ class LLMFactory:
             base_url=base_url,
             model=model,
             temperature=config.get('temperature', 0.7),
+            **LLMFactory._guard_kwargs('local', config, chat_model=False),
         )
     
     @staticmethod
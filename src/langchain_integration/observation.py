@@ -0,0 +1,428 @@
+"""工具观察结果压缩 - 控制Agent对话历史的token增长"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from ..ai.token_budget import TokenCounter
+
+
+# 观察结果中字符串字段的最大长度
+MAX_STRING_CHARS = 300
+
+# 超出观察结果预算时依次尝试的列表长度上限
+LIST_LIMITS = (None, 50, 20, 10, 5, 2)
+
+# 内容样本保留的字符数
+SAMPLE_CHARS = 100
+
+# 旧步骤的 Thought 保留的字符数
+BRIEF_THOUGHT_CHARS = 200
+
+# 旧步骤的摘要中保留的字段
+BRIEF_KEYS = ('directory', 'file_path', 'target_folder', 'operation')
+
+# 压缩后的旧步骤前缀
+COMPACTED_PREFIX = "Observation（已压缩）: "
+
+
+def compact_json(data: Any) -> str:
+    """无缩进、无多余空白的JSON"""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+def truncate_value(value: Any, max_items: Optional[int] = None, max_chars: int = MAX_STRING_CHARS) -> Any:
+    """
+    递归截断列表和字符串
+
+    Args:
+        value: 任意JSON值
+        max_items: 列表保留的最大项数（None表示不限制）
+        max_chars: 字符串保留的最大长度
+
+    Returns:
+        截断后的值，被省略的列表项以一条说明代替
+    """
+    if isinstance(value, dict):
+        return {k: truncate_value(v, max_items, max_chars) for k, v in value.items()}
+    if isinstance(value, list):
+        items = [truncate_value(v, max_items, max_chars) for v in value[:max_items]]
+        if max_items is not None and len(value) > max_items:
+            items.append(f"…(省略{len(value) - max_items}项)")
+        return items
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[:max_chars] + "…"
+    return value
+
+
+def _pick_metadata(metadata: Any) -> Dict[str, Any]:
+    """只保留对分类有用的元数据字段"""
+    if not isinstance(metadata, dict):
+        return {}
+    return {k: metadata[k] for k in ('title', 'author', 'page_count') if metadata.get(k)}
+
+
+def _summarize_file_scanner(data: Dict[str, Any]) -> Dict[str, Any]:
+    """扫描结果：每个文件只保留路径、大小、关键元数据和简短内容样本"""
+    files = []
+    for item in data.get('files', []):
+        entry = {'path': item.get('path'), 'size': item.get('size')}
+        entry.update(_pick_metadata(item.get('metadata')))
+        if item.get('content_sample'):
+            entry['sample'] = item['content_sample'][:SAMPLE_CHARS]
+        files.append(entry)
+    return {**data, 'files': files}
+
+
+def _summarize_file_analyzer(data: Dict[str, Any]) -> Dict[str, Any]:
+    """分析结果：精简元数据，论文指标只列出命中项"""
+    result = {k: v for k, v in data.items() if k not in ('metadata', 'paper_check', 'file_type_analysis')}
+    result['category'] = (data.get('file_type_analysis') or {}).get('category')
+    result.update(_pick_metadata(data.get('metadata')))
+
+    paper_check = data.get('paper_check')
+    if isinstance(paper_check, dict):
+        indicators = paper_check.get('indicators_found') or {}
+        result['paper_check'] = {
+            'likely_paper': paper_check.get('likely_paper', False),
+            'confidence': paper_check.get('confidence', 0.0),
+            'indicators': [k for k, v in indicators.items() if v],
+        }
+    return result
+
+
+def _summarize_classify_papers(data: Dict[str, Any]) -> Dict[str, Any]:
+    """论文识别结果：非论文只保留路径"""
+    result = dict(data)
+    if 'non_papers' in data:
+        result['non_papers'] = [p.get('file_path') for p in data['non_papers']]
+    return result
+
+
+def _summarize_operator(data: Dict[str, Any]) -> Dict[str, Any]:
+    """操作结果：去掉空的警告和错误列表"""
+    return {k: v for k, v in data.items() if v not in ([], None)}
+
+
+# 按工具名称注册的观察结果摘要函数
+OBSERVATION_SUMMARIZERS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    'file_scanner': _summarize_file_scanner,
+    'file_analyzer': _summarize_file_analyzer,
+    'classify_papers': _summarize_classify_papers,
+    'file_operator': _summarize_operator,
+    'batch_file_operator': _summarize_operator,
+}
+
+
+def format_observations(names: List[Optional[str]], observations: List[str], prefix: str = "Observation: ") -> str:
+    """
+    将一个步骤中各工具的观察结果合并为一条消息
+
+    Args:
+        names: 工具名称列表
+        observations: 与 names 一一对应的观察结果
+        prefix: 单个观察结果的前缀
+
+    Returns:
+        合并后的文本（只有一个结果时与单工具步骤格式相同）
+    """
+    if len(observations) == 1:
+        return prefix + observations[0]
+    label = prefix.rstrip().rstrip(':：')
+    return "\n".join(
+        f"{label} {i}（{name}）: {obs}"
+        for i, (name, obs) in enumerate(zip(names, observations), 1)
+    )
+
+
+class ObservationCompactor:
+    """
+    观察结果压缩器
+
+    - 当前步骤的观察结果：按工具摘要后输出紧凑JSON，并限制在 max_observation_tokens 以内
+    - 较早的步骤：替换为一行摘要（保留最近 history_window 步的完整结果）
+    - 每次请求的上下文超过 context_token_budget 时继续压缩更早的步骤
+    - 整次运行累计发送的输入token超过 run_token_budget 时停止（0表示不限制）
+    """
+
+    SETTING_KEYS = ('history_window', 'max_observation_tokens', 'context_token_budget', 'run_token_budget')
+
+    def __init__(
+        self,
+        history_window: int = 3,
+        max_observation_tokens: int = 2000,
+        context_token_budget: int = 12000,
+        run_token_budget: int = 0,
+        model: str = ''
+    ):
+        """
+        初始化压缩器
+
+        Args:
+            history_window: 保留完整观察结果的最近步数
+            max_observation_tokens: 单条观察结果的token上限
+            context_token_budget: 单次请求的上下文token预算（0表示不限制）
+            run_token_budget: 单次运行累计输入token上限（0表示不限制）
+            model: 模型名称（用于token计数）
+        """
+        self.history_window = max(1, history_window)
+        self.max_observation_tokens = max_observation_tokens
+        self.context_token_budget = context_token_budget
+        self.run_token_budget = run_token_budget
+        self.counter = TokenCounter(model)
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]], model: str = '') -> 'ObservationCompactor':
+        """从配置字典创建（忽略未知字段）"""
+        settings = {k: v for k, v in (config or {}).items() if k in cls.SETTING_KEYS and v is not None}
+        return cls(model=model, **settings)
+
+    def count(self, text: str) -> int:
+        """计算文本token数"""
+        return self.counter.count(text)
+
+    def compact(self, tool_name: str, observation: str) -> str:
+        """
+        压缩当前步骤的观察结果
+
+        Args:
+            tool_name: 工具名称
+            observation: 工具返回的原始文本（通常为JSON）
+
+        Returns:
+            压缩后的文本
+        """
+        try:
+            data = json.loads(observation)
+        except (TypeError, ValueError):
+            return self._fit_text(str(observation))
+
+        summarizer = OBSERVATION_SUMMARIZERS.get(tool_name)
+        if summarizer and isinstance(data, dict):
+            data = summarizer(data)
+
+        for max_items in LIST_LIMITS:
+            text = compact_json(truncate_value(data, max_items))
+            if not self.max_observation_tokens or self.count(text) <= self.max_observation_tokens:
+                return text
+        return self._fit_text(text)
+
+    def _fit_text(self, text: str) -> str:
+        """按token上限截断纯文本"""
+        if not self.max_observation_tokens or self.count(text) <= self.max_observation_tokens:
+            return text
+        # 按比例估算保留长度，再逐步收缩
+        keep = len(text) * self.max_observation_tokens // max(self.count(text), 1)
+        while keep > 0 and self.count(text[:keep]) > self.max_observation_tokens:
+            keep = keep * 9 // 10
+        return text[:keep] + "…(已截断)"
+
+    @staticmethod
+    def brief(observation: str) -> str:
+        """
+        生成旧步骤观察结果的一行摘要
+
+        Args:
+            observation: 观察结果（压缩后或原始文本）
+
+        Returns:
+            摘要文本
+        """
+        try:
+            data = json.loads(observation)
+        except (TypeError, ValueError):
+            text = str(observation)
+            return text[:MAX_STRING_CHARS] + ("…" if len(text) > MAX_STRING_CHARS else "")
+
+        if not isinstance(data, dict):
+            return compact_json(truncate_value(data, 3, 100))
+
+        parts = []
+        if 'success' in data:
+            parts.append('成功' if data['success'] else '失败')
+        for key in BRIEF_KEYS:
+            if data.get(key):
+                parts.append(f"{key}={compact_json(truncate_value(data[key], 3, 100))}")
+        for key, value in data.items():
+            if key.endswith('_count') or key == 'total':
+                parts.append(f"{key}={value}")
+        if isinstance(data.get('paper_check'), dict):
+            parts.append(f"likely_paper={data['paper_check'].get('likely_paper')}")
+        if data.get('error'):
+            parts.append(f"error={str(data['error'])[:100]}")
+        return "，".join(parts) or compact_json(truncate_value(data, 3, 100))
+
+    @staticmethod
+    def brief_action(step: Dict[str, Any]) -> str:
+        """生成旧步骤LLM输出的精简版本（截断过长的 Thought 和 Action Input）"""
+        lines = [f"Thought: {(step.get('thought') or '')[:BRIEF_THOUGHT_CHARS]}"]
+        for action, action_input in step.get('actions') or []:
+            lines.append(f"Action: {action}")
+            lines.append(f"Action Input: {compact_json(truncate_value(action_input or {}, 3, 100))}")
+        return "\n".join(lines)
+
+
+class AgentHistory:
+    """
+    Agent对话历史 - 按步骤保存工具调用，构建发送给LLM的消息
+
+    较早的步骤按块压缩：完整步骤超过 2 × history_window 时，
+    一次性将除最近 history_window 步以外的步骤替换为摘要。
+    这样消息前缀在多轮迭代之间保持不变，Prompt缓存可以持续命中。
+    """
+
+    def __init__(self, base_messages: List[Any], compactor: ObservationCompactor, overhead_tokens: int = 0):
+        """
+        初始化对话历史
+
+        Args:
+            base_messages: 固定的开头消息（系统提示和任务描述）
+            compactor: 观察结果压缩器
+            overhead_tokens: 每次请求附带的其它内容的token数（如工具定义）
+        """
+        self.base_messages = base_messages
+        self.compactor = compactor
+        self.steps: List[Dict[str, Any]] = []
+        self.compacted = 0  # 已压缩的步骤数
+        self.tokens_sent = 0  # 本次运行累计发送的输入token
+        self._base_tokens = overhead_tokens + sum(self._message_tokens(m) for m in base_messages)
+
+    def add_step(
+        self,
+        content: str,
+        action: Optional[str],
+        action_input: Optional[Dict[str, Any]],
+        thought: Optional[str],
+        observation: str,
+        followup: str
+    ):
+        """
+        记录一个步骤
+
+        Args:
+            content: LLM的原始输出
+            action: 工具名称
+            action_input: 工具参数
+            thought: 思考内容
+            observation: 观察结果（已压缩）
+            followup: 观察结果后附加的格式提醒
+        """
+        self.add_actions(content, thought, [(action, action_input)], [observation], followup)
+
+    def add_actions(
+        self,
+        content: str,
+        thought: Optional[str],
+        actions: List[Tuple[Optional[str], Optional[Dict[str, Any]]]],
+        observations: List[str],
+        followup: str
+    ):
+        """
+        记录一个ReAct步骤（一次输出可包含多个工具调用）
+
+        Args:
+            content: LLM的原始输出
+            thought: 思考内容
+            actions: (工具名称, 工具参数) 列表
+            observations: 与 actions 一一对应的观察结果（已压缩）
+            followup: 观察结果后附加的格式提醒
+        """
+        step = {
+            'content': content,
+            'thought': thought,
+            'actions': actions,
+            'observations': observations,
+            'followup': followup,
+        }
+        names = [name for name, _ in actions]
+        briefs = [ObservationCompactor.brief(obs) for obs in observations]
+        self._append(
+            step,
+            full=[
+                AIMessage(content=content),
+                HumanMessage(content=f"{format_observations(names, observations)}\n\n{followup}"),
+            ],
+            brief=[
+                AIMessage(content=ObservationCompactor.brief_action(step)),
+                HumanMessage(content=format_observations(names, briefs, COMPACTED_PREFIX)),
+            ]
+        )
+
+    def add_tool_calls(self, response: AIMessage, observations: List[str]):
+        """
+        记录一个原生工具调用步骤（一条AI消息可包含多个工具调用）
+
+        Args:
+            response: 包含 tool_calls 的AI消息
+            observations: 与 tool_calls 一一对应的观察结果（已压缩）
+        """
+        calls = response.tool_calls
+        brief_calls = [
+            {**call, 'args': truncate_value(call.get('args') or {}, 3, 100)}
+            for call in calls
+        ]
+        self._append(
+            {'tool_calls': calls, 'observations': observations},
+            full=[response] + [
+                ToolMessage(content=obs, tool_call_id=call['id'])
+                for call, obs in zip(calls, observations)
+            ],
+            brief=[AIMessage(content=response.content, tool_calls=brief_calls)] + [
+                ToolMessage(content=COMPACTED_PREFIX + ObservationCompactor.brief(obs), tool_call_id=call['id'])
+                for call, obs in zip(calls, observations)
+            ]
+        )
+
+    def _append(self, step: Dict[str, Any], full: List[Any], brief: List[Any]):
+        """加入一个步骤，并按窗口和上下文预算压缩较早的步骤"""
+        step['full'] = full
+        step['brief'] = brief
+        step['full_tokens'] = sum(self._message_tokens(m) for m in full)
+        step['brief_tokens'] = sum(self._message_tokens(m) for m in brief)
+        self.steps.append(step)
+
+        window = self.compactor.history_window
+        if len(self.steps) - self.compacted > 2 * window:
+            self.compacted = len(self.steps) - window
+
+        # 超出单次请求预算时继续压缩，至少保留最近一步的完整结果
+        budget = self.compactor.context_token_budget
+        while budget and self.context_tokens() > budget and self.compacted < len(self.steps) - 1:
+            self.compacted += 1
+
+    def context_tokens(self) -> int:
+        """当前消息的token数"""
+        return self._base_tokens + sum(
+            step['brief_tokens'] if i < self.compacted else step['full_tokens']
+            for i, step in enumerate(self.steps)
+        )
+
+    def messages(self) -> List[Any]:
+        """构建发送给LLM的消息列表"""
+        messages = list(self.base_messages)
+        for i, step in enumerate(self.steps):
+            messages.extend(step['brief'] if i < self.compacted else step['full'])
+        return messages
+
+    def reserve(self) -> bool:
+        """
+        记录一次请求的输入token，并检查运行预算
+
+        Returns:
+            未超出运行预算时返回True
+        """
+        tokens = self.context_tokens()
+        budget = self.compactor.run_token_budget
+        if budget and self.tokens_sent + tokens > budget:
+            return False
+        self.tokens_sent += tokens
+        return True
+
+    def _message_tokens(self, message: Any) -> int:
+        """单条消息的token数（包括工具调用参数）"""
+        content = message.content if isinstance(message.content, str) else compact_json(message.content)
+        tool_calls = getattr(message, 'tool_calls', None)
+        if tool_calls:
+            content += compact_json([{'name': c.get('name'), 'args': c.get('args')} for c in tool_calls])
+        return self.compactor.count(content)
@@ -4,10 +4,16 @@ from .file_scanner_tool import FileScannerTool
 from .file_analyzer_tool import FileAnalyzerTool
 from .file_operator_tool import FileOperatorTool
 from .validation_tool import ValidationTool
+from .batch_file_analyzer_tool import BatchFileAnalyzerTool
+from .batch_file_operator_tool import BatchFileOperatorTool
+from .classify_papers_tool import ClassifyPapersTool
 
 __all__ = [
     'FileScannerTool',
     'FileAnalyzerTool',
     'FileOperatorTool',
     'ValidationTool',
+    'BatchFileAnalyzerTool',
+    'BatchFileOperatorTool',
+    'ClassifyPapersTool',
 ]
@@ -0,0 +1,122 @@
+"""批量文件分析工具"""
+
+import asyncio
+import json
+from typing import Type, List
+from pydantic import BaseModel, Field
+
+# 尝试从不同位置导入 BaseTool
+try:
+    from langchain_core.tools import BaseTool
+except ImportError:
+    from langchain.tools import BaseTool
+
+from .file_analyzer_tool import FileAnalyzerTool
+
+
+# 单次调用最多分析的文件数
+MAX_BATCH_FILES = 500
+
+# 批量结果中每个文件保留的内容样本长度
+BATCH_SAMPLE_CHARS = 200
+
+
+class BatchFileAnalyzerInput(BaseModel):
+    """批量文件分析工具的输入参数"""
+    file_paths: List[str] = Field(..., description="要分析的文件路径列表")
+    analyze_content: bool = Field(
+        default=False,
+        description="是否附带内容样本（文件较多时建议关闭）"
+    )
+    check_if_paper: bool = Field(
+        default=True,
+        description="对于PDF文件，是否检查是否为学术论文"
+    )
+
+
+class BatchFileAnalyzerTool(BaseTool):
+    """批量文件分析工具 - 一次调用分析多个文件"""
+
+    name: str = "batch_file_analyzer"
+    description: str = """一次分析多个文件，返回每个文件的精简分析结果。
+    与 file_analyzer 相同的分析逻辑，但接受文件路径列表：
+    - 识别文件类型和分类
+    - 提取文件元数据
+    - 对PDF文件检测是否为学术论文
+
+    使用场景：
+    - 需要分析多个文件时，使用此工具代替逐个调用 file_analyzer
+    """
+    args_schema: Type[BaseModel] = BatchFileAnalyzerInput
+
+    def _run(
+        self,
+        file_paths: List[str],
+        analyze_content: bool = False,
+        check_if_paper: bool = True
+    ) -> str:
+        """执行批量文件分析"""
+        try:
+            analyzer = FileAnalyzerTool()
+            results = []
+            failed = []
+
+            for file_path in file_paths[:MAX_BATCH_FILES]:
+                analysis = analyzer.analyze(file_path, analyze_content, check_if_paper)
+                if analysis.get('success'):
+                    results.append(self._summarize(analysis))
+                else:
+                    failed.append({'file_path': file_path, 'error': analysis.get('error')})
+
+            result = {
+                'success': True,
+                'analyzed_count': len(results),
+                'failed_count': len(failed),
+                'files': results,
+            }
+
+            if failed:
+                result['failed'] = failed
+
+            if check_if_paper:
+                result['paper_count'] = sum(1 for r in results if r.get('likely_paper'))
+
+            if len(file_paths) > MAX_BATCH_FILES:
+                result['note'] = f"共 {len(file_paths)} 个文件，仅分析了前{MAX_BATCH_FILES}个，请分批调用。"
+
+            return json.dumps(result, ensure_ascii=False)
+
+        except Exception as e:
+            return json.dumps({
+                'success': False,
+                'error': str(e)
+            }, ensure_ascii=False)
+
+    @staticmethod
+    def _summarize(analysis: dict) -> dict:
+        """将单个文件的完整分析结果压缩为批量结果条目"""
+        summary = {
+            'file_path': analysis['file_path'],
+            'category': analysis.get('file_type_analysis', {}).get('category'),
+            'size_mb': analysis.get('size_mb'),
+        }
+
+        metadata = analysis.get('metadata') or {}
+        for key in ('title', 'author', 'page_count'):
+            if metadata.get(key):
+                summary[key] = metadata[key]
+
+        paper_check = analysis.get('paper_check')
+        if paper_check:
+            summary['likely_paper'] = paper_check.get('likely_paper', False)
+            summary['paper_confidence'] = paper_check.get('confidence', 0.0)
+
+        sample = (analysis.get('content_analysis') or {}).get('text_sample')
+        if sample:
+            summary['text_sample'] = sample[:BATCH_SAMPLE_CHARS]
+
+        return summary
+
+    async def _arun(self, *args, **kwargs) -> str:
+        """异步运行（在线程中执行同步实现，不阻塞事件循环）"""
+        return await asyncio.to_thread(self._run, *args, **kwargs)
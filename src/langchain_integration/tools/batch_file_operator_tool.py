@@ -0,0 +1,123 @@
+"""批量文件操作工具"""
+
+import asyncio
+import json
+from typing import Type, List, Dict, Any
+from pydantic import BaseModel, Field
+
+# 尝试从不同位置导入 BaseTool
+try:
+    from langchain_core.tools import BaseTool
+except ImportError:
+    from langchain.tools import BaseTool
+
+from ...core.file_operator import FileOperator
+from ...models.operation import Operation, OperationType
+from .file_operator_tool import FileOperatorInput
+
+
+OPERATION_TYPES = {
+    'move': OperationType.MOVE,
+    'rename': OperationType.RENAME,
+    'create_folder': OperationType.CREATE_FOLDER,
+}
+
+
+class BatchFileOperatorInput(BaseModel):
+    """批量文件操作工具的输入参数"""
+    operations: List[FileOperatorInput] = Field(
+        ...,
+        description="操作列表，每项包含 operation_type、source、target、reason（同 file_operator 的参数）"
+    )
+
+
+class BatchFileOperatorTool(BaseTool):
+    """批量文件操作工具 - 一次调用执行多个文件操作"""
+
+    name: str = "batch_file_operator"
+    description: str = """一次执行多个文件系统操作（move / rename / create_folder）。
+    每个操作的参数与 file_operator 相同，按列表顺序执行：
+    - 先验证每个操作，验证失败的操作会被跳过并在结果中列出
+    - 目标文件夹会在执行前统一创建
+
+    使用场景：
+    - 需要创建文件夹并移动多个文件时，一次提交全部操作，代替逐个调用 file_operator
+    """
+    args_schema: Type[BaseModel] = BatchFileOperatorInput
+    dry_run_mode: bool = False  # 声明为类字段
+
+    def __init__(self, dry_run: bool = False):
+        super().__init__()
+        # 使用 object.__setattr__ 绕过 Pydantic 验证
+        object.__setattr__(self, 'dry_run_mode', dry_run)
+
+    def _run(self, operations: List[Dict[str, Any]]) -> str:
+        """执行批量文件操作"""
+        try:
+            operator = FileOperator(dry_run=self.dry_run_mode)
+
+            valid_operations = []
+            rejected = []
+            warnings = []
+
+            for item in operations:
+                if isinstance(item, BaseModel):
+                    item = item.model_dump()
+                operation_type = item.get('operation_type', '')
+
+                if operation_type not in OPERATION_TYPES:
+                    rejected.append({
+                        'source': item.get('source', ''),
+                        'target': item.get('target', ''),
+                        'error': f"不支持的操作类型: {operation_type}"
+                    })
+                    continue
+
+                operation = Operation(
+                    type=OPERATION_TYPES[operation_type],
+                    source=item.get('source', ''),
+                    target=item.get('target', ''),
+                    reason=item.get('reason', '')
+                )
+
+                validation = operator.validate_operations([operation])
+                warnings.extend(validation['warnings'])
+                if not validation['valid']:
+                    rejected.append({
+                        'source': operation.source,
+                        'target': operation.target,
+                        'error': '; '.join(validation['issues'])
+                    })
+                    continue
+
+                valid_operations.append(operation)
+
+            result_obj = operator.execute_batch(valid_operations)
+
+            result = {
+                'success': result_obj.success_count > 0 or not operations,
+                'dry_run': self.dry_run_mode,
+                'total': len(operations),
+                'success_count': result_obj.success_count,
+                'failed_count': result_obj.failed_count + len(rejected),
+                'skipped_count': result_obj.skipped_count,
+            }
+
+            if rejected:
+                result['rejected'] = rejected
+            if result_obj.errors:
+                result['errors'] = result_obj.errors
+            if warnings:
+                result['warnings'] = warnings
+
+            return json.dumps(result, ensure_ascii=False)
+
+        except Exception as e:
+            return json.dumps({
+                'success': False,
+                'error': str(e)
+            }, ensure_ascii=False)
+
+    async def _arun(self, *args, **kwargs) -> str:
+        """异步运行（在线程中执行同步实现，不阻塞事件循环）"""
+        return await asyncio.to_thread(self._run, *args, **kwargs)
@@ -0,0 +1,71 @@
+"""论文批量识别工具"""
+
+import asyncio
+import json
+from typing import Any, Optional, Type
+from pydantic import BaseModel, Field
+
+# 尝试从不同位置导入 BaseTool
+try:
+    from langchain_core.tools import BaseTool
+except ImportError:
+    from langchain.tools import BaseTool
+
+from ...core.paper_detector import PaperPrePass
+
+
+class ClassifyPapersInput(BaseModel):
+    """论文批量识别工具的输入参数"""
+    directory: str = Field(..., description="要识别论文的目录路径")
+    recursive: bool = Field(default=False, description="是否递归扫描子目录")
+    target_folder: str = Field(
+        default="",
+        description="论文文件夹路径（为空时使用 目录/Papers）"
+    )
+
+
+class ClassifyPapersTool(BaseTool):
+    """论文批量识别工具 - 对整个目录的PDF执行规则预筛选"""
+
+    name: str = "classify_papers"
+    description: str = """对目录中的所有PDF文件执行学术论文规则检测（摘要、参考文献、DOI等特征）。
+    一次调用即可返回：
+    - papers: 识别为论文的文件
+    - uncertain: 特征不足、建议用 batch_file_analyzer 进一步确认的文件
+    - non_papers: 不是论文的文件
+    - suggested_operations: 创建论文文件夹并移动论文的操作列表，可直接传给 batch_file_operator
+
+    使用场景：
+    - 论文整理任务中，代替逐个调用 file_analyzer 识别论文
+    """
+    args_schema: Type[BaseModel] = ClassifyPapersInput
+
+    # 规则预筛选（阈值与Agent的论文预筛选配置一致，为空时使用默认设置）
+    prepass: Optional[Any] = None
+
+    def _run(
+        self,
+        directory: str,
+        recursive: bool = False,
+        target_folder: str = ""
+    ) -> str:
+        """执行论文批量识别（委托给 PaperPrePass）"""
+        try:
+            prepass = self.prepass or PaperPrePass()
+            result = prepass.run(directory, recursive=recursive, target_folder=target_folder or None)
+            return json.dumps({
+                'success': True,
+                **result,
+                'paper_count': len(result['papers']),
+            }, ensure_ascii=False)
+
+        except Exception as e:
+            return json.dumps({
+                'success': False,
+                'error': str(e),
+                'directory': directory
+            }, ensure_ascii=False)
+
+    async def _arun(self, *args, **kwargs) -> str:
+        """异步运行（在线程中执行同步实现，不阻塞事件循环）"""
+        return await asyncio.to_thread(self._run, *args, **kwargs)
@@ -1,5 +1,6 @@
 """文件分析工具"""
 
+import asyncio
 import json
 from typing import Type
 from pathlib import Path
@@ -13,6 +14,7 @@ except ImportError:
 
 from ...utils.pdf_reader import PDFReader
 from ...utils.file_metadata import FileMetadataExtractor
+from ...core.paper_detector import check_paper_indicators
 
 
 class FileAnalyzerInput(BaseModel):
@@ -53,15 +55,37 @@ class FileAnalyzerTool(BaseTool):
         check_if_paper: bool = True
     ) -> str:
         """执行文件分析"""
+        result = self.analyze(file_path, analyze_content, check_if_paper)
+        if not result.get('success'):
+            return json.dumps(result, ensure_ascii=False)
+        return json.dumps(result, ensure_ascii=False, indent=2)
+    
+    def analyze(
+        self,
+        file_path: str,
+        analyze_content: bool = True,
+        check_if_paper: bool = True
+    ) -> dict:
+        """
+        分析单个文件
+        
+        Args:
+            file_path: 文件路径
+            analyze_content: 是否分析文件内容
+            check_if_paper: 对于PDF文件，是否检查是否为学术论文
+            
+        Returns:
+            分析结果字典
+        """
         try:
             path = Path(file_path)
             
             if not path.exists():
-                return json.dumps({
+                return {
                     'success': False,
                     'error': '文件不存在',
                     'file_path': file_path
-                }, ensure_ascii=False)
+                }
             
             # 基本信息
             result = {
@@ -90,14 +114,14 @@ class FileAnalyzerTool(BaseTool):
             if check_if_paper and path.suffix.lower() == '.pdf':
                 result['paper_check'] = self._check_paper_indicators(file_path)
             
-            return json.dumps(result, ensure_ascii=False, indent=2)
+            return result
             
         except Exception as e:
-            return json.dumps({
+            return {
                 'success': False,
                 'error': str(e),
                 'file_path': file_path
-            }, ensure_ascii=False)
+            }
     
     def _analyze_file_type(self, path: Path) -> dict:
         """分析文件类型"""
@@ -169,52 +193,8 @@ class FileAnalyzerTool(BaseTool):
     
     def _check_paper_indicators(self, file_path: str) -> dict:
         """检查PDF是否包含学术论文的特征（基于规则）"""
-        try:
-            # 读取PDF内容
-            pdf_reader = PDFReader()
-            text_sample = pdf_reader.extract_text_sample(file_path, max_chars=2000)
-            
-            if not text_sample or len(text_sample) < 100:
-                return {
-                    'likely_paper': False,
-                    'confidence': 0.0,
-                    'reason': 'PDF内容为空或太短'
-                }
-            
-            # 检查学术论文特征
-            indicators = {
-                'abstract': any(keyword in text_sample.lower() for keyword in ['abstract', '摘要']),
-                'introduction': any(keyword in text_sample.lower() for keyword in ['introduction', '引言', '前言']),
-                'references': any(keyword in text_sample.lower() for keyword in ['references', '参考文献']),
-                'conclusion': any(keyword in text_sample.lower() for keyword in ['conclusion', '结论']),
-                'keywords': any(keyword in text_sample.lower() for keyword in ['keywords', '关键词']),
-                'doi': 'doi:' in text_sample.lower() or 'doi.org' in text_sample.lower(),
-                'arxiv': 'arxiv' in text_sample.lower(),
-                'journal': any(keyword in text_sample.lower() for keyword in ['journal', 'conference', 'proceedings', '期刊']),
-            }
-            
-            # 计算得分
-            indicator_count = sum(indicators.values())
-            confidence = min(indicator_count / 5.0, 1.0)  # 最多5个指标，归一化到0-1
-            
-            # 判断是否为论文
-            likely_paper = indicator_count >= 3  # 至少3个指标
-            
-            return {
-                'likely_paper': likely_paper,
-                'confidence': round(confidence, 2),
-                'indicator_count': indicator_count,
-                'indicators_found': indicators,
-                'recommendation': '建议移动到论文文件夹' if likely_paper else '可能不是学术论文'
-            }
-            
-        except Exception as e:
-            return {
-                'likely_paper': False,
-                'confidence': 0.0,
-                'error': f'论文检测失败: {str(e)}'
-            }
+        return check_paper_indicators(file_path)
     
     async def _arun(self, *args, **kwargs) -> str:
-        """异步运行（暂不支持）"""
-        raise NotImplementedError("异步分析暂不支持")
+        """异步运行（在线程中执行同步实现，不阻塞事件循环）"""
+        return await asyncio.to_thread(self._run, *args, **kwargs)
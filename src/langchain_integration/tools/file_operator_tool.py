@@ -1,5 +1,6 @@
 """文件操作工具"""
 
+import asyncio
 import json
 from typing import Type
 from pathlib import Path
@@ -143,5 +144,5 @@ class FileOperatorTool(BaseTool):
             }, ensure_ascii=False)
     
     async def _arun(self, *args, **kwargs) -> str:
-        """异步运行（暂不支持）"""
-        raise NotImplementedError("异步操作暂不支持")
+        """异步运行（在线程中执行同步实现，不阻塞事件循环）"""
+        return await asyncio.to_thread(self._run, *args, **kwargs)
@@ -1,5 +1,6 @@
 """验证工具"""
 
+import asyncio
 import json
 from typing import Type, List
 from pathlib import Path
@@ -166,5 +167,5 @@ class ValidationTool(BaseTool):
         }, ensure_ascii=False, indent=2)
     
     async def _arun(self, *args, **kwargs) -> str:
-        """异步运行（暂不支持）"""
-        raise NotImplementedError("异步验证暂不支持")
+        """异步运行（在线程中执行同步实现，不阻塞事件循环）"""
+        return await asyncio.to_thread(self._run, *args, **kwargs)
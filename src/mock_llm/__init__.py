@@ -0,0 +1,13 @@
+"""模拟LLM服务 - 用于离线压测和可复现的基准测试"""
+
+from .responder import MockLLMSettings, MockResponder, load_react_script
+from .server import create_mock_app, MockLLMServer, run_mock_server
+
+__all__ = [
+    "MockLLMSettings",
+    "MockResponder",
+    "load_react_script",
+    "create_mock_app",
+    "MockLLMServer",
+    "run_mock_server",
+]
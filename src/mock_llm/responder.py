@@ -0,0 +1,225 @@
+"""模拟LLM响应生成 - 按请求内容返回确定性的分类结果、ReAct脚本步骤或对话回复"""
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import yaml
+from pydantic import BaseModel, Field
+
+from ..ai.prompt_builder import PromptBuilder
+from ..core.rule_engine import EXTENSION_CATEGORIES
+
+
+# 未提供脚本时的默认ReAct流程：扫描目录后结束
+DEFAULT_REACT_SCRIPT = [
+    {
+        'thought': '我需要先扫描目录了解有哪些文件',
+        'action': 'file_scanner',
+        'action_input': {'directory': '{directory}'},
+    },
+    {
+        'thought': '所有操作已完成',
+        'final_answer': '已扫描目录 {directory}（模拟LLM）',
+    },
+]
+
+
+class MockLLMSettings(BaseModel):
+    """模拟LLM服务配置"""
+
+    model: str = Field(default="mock-llm", description="返回的模型名称")
+    latency_ms: float = Field(default=0, ge=0, description="每次请求的固定延迟（毫秒）")
+    latency_jitter_ms: float = Field(default=0, ge=0, description="随机附加延迟上限（毫秒）")
+    tokens_per_second: float = Field(default=0, ge=0, description="输出速度（token/秒），0表示不模拟生成耗时")
+    error_rate: float = Field(default=0, ge=0, le=1, description="请求失败的概率")
+    error_status_codes: List[int] = Field(default_factory=lambda: [429, 500, 503], description="注入错误时随机选用的状态码")
+    retry_after_seconds: float = Field(default=1, ge=0, description="429响应的Retry-After")
+    seed: int = Field(default=0, description="随机数种子（延迟抖动和错误注入可复现）")
+    react_script: List[Dict[str, Any]] = Field(default_factory=list, description="ReAct脚本步骤（为空时使用默认脚本）")
+    tool_calling: bool = Field(default=True, description="是否支持原生工具调用（关闭时带tools的请求返回400）")
+
+
+def load_react_script(path: str) -> List[Dict[str, Any]]:
+    """
+    加载ReAct脚本（JSON或YAML）
+
+    每个步骤是一个字典：
+    - {"thought", "action", "action_input"}：调用工具
+    - {"thought", "actions": [{"action", "action_input"}, ...]}：同一轮调用多个工具
+    - {"thought", "final_answer"}：结束任务
+    - {"text"}：原样返回的文本（用于模拟格式错误等情况）
+
+    字符串中的 {directory} 会替换为任务的目标目录。
+
+    Args:
+        path: 脚本文件路径
+
+    Returns:
+        步骤列表
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if Path(path).suffix.lower() == '.json':
+            script = json.load(f)
+        else:
+            script = yaml.safe_load(f)
+
+    if isinstance(script, dict):
+        script = script.get('steps', [])
+    if not isinstance(script, list):
+        raise ValueError(f"ReAct脚本格式不正确: {path}")
+    return script
+
+
+def message_text(content: Any) -> str:
+    """提取消息内容中的文本（兼容字符串和内容块列表）"""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "\n".join(
+            block.get('text', '') if isinstance(block, dict) else str(block)
+            for block in content
+        )
+    return str(content or '')
+
+
+class MockResponder:
+    """模拟响应生成器 - 识别请求类型并返回确定性的内容"""
+
+    def __init__(self, settings: MockLLMSettings):
+        """
+        初始化响应生成器
+
+        Args:
+            settings: 模拟服务配置
+        """
+        self.settings = settings
+        self.script = settings.react_script or DEFAULT_REACT_SCRIPT
+
+    def respond(self, messages: List[Dict[str, Any]]) -> Tuple[str, str]:
+        """
+        生成响应
+
+        Args:
+            messages: 对话消息（role/content）
+
+        Returns:
+            (场景名称, 响应文本)
+        """
+        prompt = "\n".join(message_text(m.get('content')) for m in messages)
+
+        if PromptBuilder.FILE_TABLE_HEADER in prompt:
+            return 'classification', self._classification(prompt)
+
+        if 'Action Input' in prompt:
+            return 'react', self._react_step(messages, prompt)
+
+        return 'chat', f"这是模拟LLM的回复（共收到 {len(messages)} 条消息）。"
+
+    def respond_tools(self, messages: List[Dict[str, Any]]) -> Tuple[str, str, List[Dict[str, Any]]]:
+        """
+        生成原生工具调用格式的响应（请求中带有 tools 时使用）
+
+        脚本步骤中的 action/action_input 转换为一个工具调用，
+        actions（列表）转换为同一轮中的多个工具调用，final_answer 和 text 作为文本回复。
+
+        Args:
+            messages: 对话消息（role/content/tool_calls）
+
+        Returns:
+            (场景名称, 文本内容, 工具调用列表)
+        """
+        prompt = "\n".join(message_text(m.get('content')) for m in messages)
+        entry = self._script_entry(messages, prompt)
+
+        if 'text' in entry:
+            return 'tools', str(entry['text']), []
+        if 'final_answer' in entry:
+            return 'tools', str(entry['final_answer']), []
+
+        actions = entry.get('actions') or [entry]
+        tool_calls = [
+            {
+                'name': action.get('action', ''),
+                'arguments': json.dumps(action.get('action_input', {}), ensure_ascii=False),
+            }
+            for action in actions
+        ]
+        return 'tools', entry.get('thought', ''), tool_calls
+
+    def _classification(self, prompt: str) -> str:
+        """根据紧凑文件表按扩展名生成分类方案"""
+        operations = []
+        lines = prompt.splitlines()
+        try:
+            start = lines.index(PromptBuilder.FILE_TABLE_HEADER) + 1
+        except ValueError:
+            start = len(lines)
+
+        for line in lines[start:]:
+            fields = line.split('\t')
+            if len(fields) < 3 or not PromptBuilder.FILE_ID_PATTERN.fullmatch(fields[0]):
+                break
+            file_id, name = fields[0], fields[2]
+            category = self._category(name)
+            operations.append({
+                'type': 'move',
+                'file': file_id,
+                'target': f"{category}/{name}",
+                'reason': f"按扩展名归入{category}（模拟）",
+                'confidence': 0.9,
+            })
+
+        return json.dumps(
+            {'operations': operations, 'summary': f"模拟分类 {len(operations)} 个文件"},
+            ensure_ascii=False
+        )
+
+    @staticmethod
+    def _category(name: str) -> str:
+        """按扩展名确定分类"""
+        suffix = Path(name).suffix.lower()
+        for category, extensions in EXTENSION_CATEGORIES.items():
+            if suffix in extensions:
+                return category
+        return '其他'
+
+    def _script_entry(self, messages: List[Dict[str, Any]], prompt: str) -> Dict[str, Any]:
+        """按已完成的轮数取出脚本中的下一步，并替换目录占位符"""
+        step = sum(1 for m in messages if m.get('role') == 'assistant')
+        if step == 0 and len(messages) == 1:
+            # Ollama的generate接口收到的是拼接后的对话文本
+            step = len(re.findall(r'^AI: ', prompt, re.MULTILINE))
+
+        if step < len(self.script):
+            entry = self.script[step]
+        else:
+            entry = {'thought': '脚本已结束', 'final_answer': '任务完成（模拟LLM脚本已结束）'}
+
+        match = re.search(r'目标目录[:：]\s*(\S[^\n]*)', prompt)
+        return self._render(entry, match.group(1).strip() if match else '')
+
+    def _react_step(self, messages: List[Dict[str, Any]], prompt: str) -> str:
+        """按已完成的轮数返回脚本中的下一步（ReAct文本格式）"""
+        entry = self._script_entry(messages, prompt)
+
+        if 'text' in entry:
+            return str(entry['text'])
+
+        thought = entry.get('thought', '')
+        if 'final_answer' in entry:
+            return f"Thought: {thought}\nFinal Answer: {entry['final_answer']}"
+
+        lines = [f"Thought: {thought}"]
+        for action in entry.get('actions') or [entry]:
+            action_input = json.dumps(action.get('action_input', {}), ensure_ascii=False)
+            lines.append(f"Action: {action.get('action', '')}\nAction Input: {action_input}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _render(entry: Dict[str, Any], directory: str) -> Dict[str, Any]:
+        """替换步骤中的 {directory} 占位符"""
+        escaped = json.dumps(directory, ensure_ascii=False)[1:-1]
+        raw = json.dumps(entry, ensure_ascii=False).replace('{directory}', escaped)
+        return json.loads(raw)
@@ -0,0 +1,403 @@
+"""模拟LLM服务 - 兼容OpenAI和Ollama接口，用于离线压测和可复现的基准测试"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from ..ai.token_budget import TokenCounter
+from .responder import MockLLMSettings, MockResponder
+
+
+# 流式输出时每个数据块的字符数
+STREAM_CHUNK_CHARS = 16
+
+
+class MockLLMState:
+    """模拟服务状态 - 随机数、统计和延迟计算"""
+
+    def __init__(self, settings: MockLLMSettings):
+        """
+        初始化服务状态
+
+        Args:
+            settings: 模拟服务配置
+        """
+        self.settings = settings
+        self.responder = MockResponder(settings)
+        self.reset()
+
+    def reset(self):
+        """重置随机数和统计"""
+        self.random = random.Random(self.settings.seed)
+        self.stats: Dict[str, Any] = {
+            'requests': 0,
+            'errors': 0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+            'scenarios': {},
+            'status_codes': {},
+        }
+
+    def draw_error(self) -> Optional[int]:
+        """按错误率决定是否注入错误，返回状态码"""
+        settings = self.settings
+        if settings.error_rate and settings.error_status_codes:
+            if self.random.random() < settings.error_rate:
+                return self.random.choice(settings.error_status_codes)
+        return None
+
+    def base_delay(self) -> float:
+        """固定延迟加随机抖动（秒）"""
+        jitter = self.random.random() * self.settings.latency_jitter_ms
+        return (self.settings.latency_ms + jitter) / 1000
+
+    def generation_delay(self, tokens: int) -> float:
+        """生成指定数量token的耗时（秒）"""
+        if not self.settings.tokens_per_second:
+            return 0.0
+        return tokens / self.settings.tokens_per_second
+
+    def record(self, scenario: str, status: int, prompt_tokens: int = 0, completion_tokens: int = 0):
+        """记录一次请求"""
+        stats = self.stats
+        stats['requests'] += 1
+        if status >= 400:
+            stats['errors'] += 1
+        stats['prompt_tokens'] += prompt_tokens
+        stats['completion_tokens'] += completion_tokens
+        stats['scenarios'][scenario] = stats['scenarios'].get(scenario, 0) + 1
+        stats['status_codes'][str(status)] = stats['status_codes'].get(str(status), 0) + 1
+
+
+def _error_response(state: MockLLMState, status: int, ollama: bool = False) -> JSONResponse:
+    """构建注入的错误响应"""
+    message = f"模拟错误（HTTP {status}）"
+    headers = {}
+    if status == 429:
+        headers['retry-after'] = f"{state.settings.retry_after_seconds:g}"
+    content = {'error': message} if ollama else {
+        'error': {'message': message, 'type': 'mock_error', 'code': status}
+    }
+    return JSONResponse(content, status_code=status, headers=headers)
+
+
+def _text_chunks(text: str) -> List[str]:
+    """将文本切分为流式数据块"""
+    return [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)] or ['']
+
+
+async def _paced(state: MockLLMState, text: str) -> AsyncIterator[str]:
+    """按输出速度逐块产出文本"""
+    for chunk in _text_chunks(text):
+        delay = state.generation_delay(TokenCounter.estimate(chunk))
+        if delay:
+            await asyncio.sleep(delay)
+        yield chunk
+
+
+async def _prepare(state: MockLLMState, messages: List[Dict[str, Any]], tools: bool = False):
+    """
+    模拟请求处理的公共部分
+
+    Args:
+        state: 服务状态
+        messages: 对话消息
+        tools: 请求是否带有工具定义（原生工具调用）
+
+    Returns:
+        (错误状态码或None, 响应文本, 工具调用列表, 输入token数, 输出token数)
+    """
+    await asyncio.sleep(state.base_delay())
+
+    prompt_tokens = sum(
+        TokenCounter.estimate(json.dumps(m.get('content'), ensure_ascii=False, default=str))
+        for m in messages
+    )
+    status = state.draw_error()
+    if status is not None:
+        state.record('error', status, prompt_tokens)
+        return status, '', [], prompt_tokens, 0
+
+    if tools:
+        scenario, text, tool_calls = state.responder.respond_tools(messages)
+    else:
+        (scenario, text), tool_calls = state.responder.respond(messages), []
+    completion_tokens = TokenCounter.estimate(text + json.dumps(tool_calls, ensure_ascii=False))
+    state.record(scenario, 200, prompt_tokens, completion_tokens)
+    return None, text, tool_calls, prompt_tokens, completion_tokens
+
+
+def create_mock_app(settings: Optional[MockLLMSettings] = None) -> FastAPI:
+    """
+    创建模拟LLM服务应用
+
+    提供的接口：
+    - OpenAI兼容：GET /v1/models，POST /v1/chat/completions（支持stream和tools）
+    - Ollama：GET /api/tags，POST /api/generate，POST /api/chat（默认流式，与Ollama一致）
+    - 管理：GET /_mock/stats，POST /_mock/reset
+
+    Args:
+        settings: 模拟服务配置
+
+    Returns:
+        FastAPI应用
+    """
+    state = MockLLMState(settings or MockLLMSettings())
+    app = FastAPI(title="Mock LLM", description="用于离线压测的模拟LLM服务")
+    app.state.mock = state
+
+    @app.get("/v1/models")
+    async def list_models():
+        """模型列表（OpenAI格式）"""
+        return {"object": "list", "data": [{"id": state.settings.model, "object": "model"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        """对话补全（OpenAI格式）"""
+        body = await request.json()
+        if body.get('tools') and not state.settings.tool_calling:
+            state.record('error', 400)
+            return JSONResponse(
+                {'error': {'message': '该模型不支持工具调用', 'type': 'invalid_request_error', 'code': 400}},
+                status_code=400
+            )
+
+        status, text, tool_calls, prompt_tokens, completion_tokens = await _prepare(
+            state, body.get('messages', []), tools=bool(body.get('tools'))
+        )
+        if status is not None:
+            return _error_response(state, status)
+
+        completion_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        model = body.get('model') or state.settings.model
+        calls = [
+            {"id": f"call_{uuid.uuid4().hex[:12]}", "type": "function", "function": call}
+            for call in tool_calls
+        ]
+        finish_reason = "tool_calls" if calls else "stop"
+
+        if body.get('stream'):
+            async def events():
+                async for chunk in _paced(state, text):
+                    data = {
+                        "id": completion_id, "object": "chat.completion.chunk",
+                        "created": created, "model": model,
+                        "choices": [{"index": 0, "delta": {"content": chunk}, "finish_reason": None}],
+                    }
+                    yield f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+                if calls:
+                    delta = {"tool_calls": [{"index": i, **call} for i, call in enumerate(calls)]}
+                    data = {
+                        "id": completion_id, "object": "chat.completion.chunk",
+                        "created": created, "model": model,
+                        "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+                    }
+                    yield f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+                done = {
+                    "id": completion_id, "object": "chat.completion.chunk",
+                    "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}],
+                }
+                yield f"data: {json.dumps(done)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await asyncio.sleep(state.generation_delay(completion_tokens))
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text or None, **({"tool_calls": calls} if calls else {})},
+                "finish_reason": finish_reason,
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @app.get("/api/tags")
+    async def ollama_tags():
+        """模型列表（Ollama格式）"""
+        return {"models": [{"name": state.settings.model, "model": state.settings.model}]}
+
+    async def ollama_reply(body: Dict[str, Any], messages: List[Dict[str, Any]], chat: bool):
+        """Ollama generate/chat 的公共实现"""
+        started = time.perf_counter()
+        status, text, _, prompt_tokens, completion_tokens = await _prepare(state, messages)
+        if status is not None:
+            return _error_response(state, status, ollama=True)
+
+        model = body.get('model') or state.settings.model
+
+        def payload(content: str, done: bool) -> Dict[str, Any]:
+            data: Dict[str, Any] = {
+                "model": model,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "done": done,
+            }
+            if chat:
+                data["message"] = {"role": "assistant", "content": content}
+            else:
+                data["response"] = content
+            if done:
+                data.update({
+                    "done_reason": "stop",
+                    "prompt_eval_count": prompt_tokens,
+                    "eval_count": completion_tokens,
+                    "total_duration": int((time.perf_counter() - started) * 1e9),
+                })
+            return data
+
+        # Ollama在未指定stream时默认流式返回
+        if body.get('stream', True):
+            async def lines():
+                async for chunk in _paced(state, text):
+                    yield json.dumps(payload(chunk, False), ensure_ascii=False) + "\n"
+                yield json.dumps(payload('', True), ensure_ascii=False) + "\n"
+
+            return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+        await asyncio.sleep(state.generation_delay(completion_tokens))
+        return payload(text, True)
+
+    @app.post("/api/generate")
+    async def ollama_generate(request: Request):
+        """文本生成（Ollama格式）"""
+        body = await request.json()
+        messages = []
+        if body.get('system'):
+            messages.append({"role": "system", "content": body['system']})
+        messages.append({"role": "user", "content": body.get('prompt', '')})
+        return await ollama_reply(body, messages, chat=False)
+
+    @app.post("/api/chat")
+    async def ollama_chat(request: Request):
+        """对话（Ollama格式）"""
+        body = await request.json()
+        return await ollama_reply(body, body.get('messages', []), chat=True)
+
+    @app.get("/_mock/stats")
+    async def mock_stats():
+        """请求统计"""
+        return state.stats
+
+    @app.post("/_mock/reset")
+    async def mock_reset():
+        """重置统计和随机数种子"""
+        state.reset()
+        return {"success": True}
+
+    return app
+
+
+class MockLLMServer:
+    """在后台线程中运行模拟LLM服务（用于测试和压测脚本）"""
+
+    def __init__(
+        self,
+        settings: Optional[MockLLMSettings] = None,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        """
+        初始化模拟服务
+
+        Args:
+            settings: 模拟服务配置
+            host: 监听地址
+            port: 监听端口（0表示自动分配）
+        """
+        self.settings = settings or MockLLMSettings()
+        self.host = host
+        self.port = port
+        self.app = create_mock_app(self.settings)
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """服务地址（用于 local 提供商的 base_url）"""
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def openai_base_url(self) -> str:
+        """OpenAI兼容接口地址（用于 custom 提供商的 base_url）"""
+        return f"{self.base_url}/v1"
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """请求统计"""
+        return self.app.state.mock.stats
+
+    def start(self, timeout: float = 10.0) -> "MockLLMServer":
+        """
+        启动服务并等待就绪
+
+        Args:
+            timeout: 等待启动的最长时间（秒）
+
+        Returns:
+            自身
+        """
+        import uvicorn
+
+        config = uvicorn.Config(self.app, host=self.host, port=self.port, log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, name="mock-llm", daemon=True)
+        self._thread.start()
+
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("模拟LLM服务启动失败")
+            time.sleep(0.01)
+
+        # 端口为0时读取实际分配的端口
+        sockets = self._server.servers[0].sockets if self._server.servers else []
+        if sockets:
+            self.port = sockets[0].getsockname()[1]
+        return self
+
+    def stop(self):
+        """停止服务"""
+        if self._server is not None:
+            self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+        self._server = None
+        self._thread = None
+
+    def __enter__(self) -> "MockLLMServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def run_mock_server(settings: Optional[MockLLMSettings] = None, host: str = "127.0.0.1", port: int = 8900):
+    """
+    在前台运行模拟LLM服务（阻塞）
+
+    Args:
+        settings: 模拟服务配置
+        host: 监听地址
+        port: 监听端口
+    """
+    import uvicorn
+
+    uvicorn.run(create_mock_app(settings), host=host, port=port, log_level="info")
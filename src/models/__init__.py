@@ -2,5 +2,6 @@
 
 from .file_info import FileInfo
 from .operation import Operation, OperationResult, OperationType
+from .rule import ClassificationRule, RuleAction
 
-__all__ = ["FileInfo", "Operation", "OperationResult", "OperationType"]
+__all__ = ["FileInfo", "Operation", "OperationResult", "OperationType", "ClassificationRule", "RuleAction"]
@@ -0,0 +1,88 @@
+"""分类规则模型"""
+
+from enum import Enum
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field, field_validator
+import string
+import uuid
+
+
+# 目标文件夹中允许的占位符
+TARGET_PLACEHOLDERS = frozenset({'year', 'month', 'ext', 'size_bucket'})
+
+
+class RuleAction(str, Enum):
+    """规则动作枚举"""
+    MOVE = "move"  # 移动到目标文件夹
+    KEEP = "keep"  # 保持原位（无需AI判断）
+    HINT = "hint"  # 只作为已知规则提供给AI，不直接分类
+
+
+class ClassificationRule(BaseModel):
+    """
+    本地分类规则
+
+    所有条件同时满足时规则命中；未设置的条件不参与判断。
+    """
+
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex[:12], description="规则ID")
+    description: str = Field(description="规则说明（同时作为已知规则提供给AI）")
+    action: RuleAction = Field(default=RuleAction.MOVE, description="规则动作")
+    target: str = Field(
+        default="",
+        description="目标文件夹（相对于文件所在目录），支持 {year} {month} {ext} {size_bucket} 占位符"
+    )
+    extensions: List[str] = Field(default_factory=list, description="扩展名（如 .pdf）")
+    name_pattern: Optional[str] = Field(default=None, description="文件名（不含扩展名）需匹配的正则，不区分大小写")
+    name_keywords: List[str] = Field(default_factory=list, description="文件名包含其中任一关键词")
+    metadata: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="元数据条件：字段 -> 值，或 字段 -> {运算符: 值}（==, !=, >, >=, <, <=, in, contains, exists）"
+    )
+    min_size: Optional[int] = Field(default=None, ge=0, description="最小文件大小（字节）")
+    max_size: Optional[int] = Field(default=None, ge=0, description="最大文件大小（字节）")
+    modified_after: Optional[datetime] = Field(default=None, description="修改时间晚于")
+    modified_before: Optional[datetime] = Field(default=None, description="修改时间早于")
+    request_keywords: List[str] = Field(
+        default_factory=list,
+        description="用户需求包含其中任一关键词时规则才生效（为空表示总是生效）"
+    )
+    priority: int = Field(default=0, description="优先级（数值大的先匹配）")
+    confidence: float = Field(default=0.9, ge=0.0, le=1.0, description="生成操作的置信度")
+    source: str = Field(default="config", description="规则来源（builtin / config / feedback）")
+
+    @field_validator('extensions')
+    @classmethod
+    def normalize_extensions(cls, value: List[str]) -> List[str]:
+        """扩展名统一为小写并带点"""
+        return [ext.lower() if ext.startswith('.') else f".{ext.lower()}" for ext in value if ext]
+
+    @field_validator('target')
+    @classmethod
+    def validate_target(cls, value: str) -> str:
+        """目标文件夹只能使用支持的占位符（字面的花括号需写成 {{ }}）"""
+        try:
+            fields = [(name, spec, conv) for _, name, spec, conv in string.Formatter().parse(value)
+                      if name is not None]
+        except ValueError as e:
+            raise ValueError(f"目标文件夹格式错误: {value}（{e}）")
+        for name, spec, conv in fields:
+            if name not in TARGET_PLACEHOLDERS or spec or conv:
+                raise ValueError(
+                    f"目标文件夹中不支持的占位符 {{{name}}}，"
+                    f"只支持 {', '.join('{%s}' % p for p in sorted(TARGET_PLACEHOLDERS))}"
+                )
+        return value
+
+    def signature(self) -> tuple:
+        """规则条件和动作的签名（用于去重，不含ID和说明）"""
+        return (
+            self.action.value, self.target, tuple(self.extensions), self.name_pattern,
+            tuple(self.name_keywords), repr(sorted(self.metadata.items(), key=lambda kv: kv[0])),
+            self.min_size, self.max_size, self.modified_after, self.modified_before,
+            tuple(self.request_keywords),
+        )
+
+    def __str__(self) -> str:
+        return self.description
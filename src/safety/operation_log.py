@@ -35,21 +35,48 @@ class OperationLogger:
             status: 状态（pending/success/failed/reverted）
             error: 错误信息（如果有）
         """
-        log_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'operation_id': operation.id,
-            'type': operation.type.value if hasattr(operation.type, 'value') else str(operation.type),
-            'source': operation.source,
-            'target': operation.target,
-            'reason': operation.reason,
-            'status': status,
-            'error': error
-        }
+        self.log_operations([operation], status, error)
+    
+    def log_operations(
+        self,
+        operations: List[Operation],
+        status: str,
+        error: Optional[str] = None,
+        request: Optional[str] = None
+    ):
+        """
+        批量记录操作（一次写入日志文件）
+        
+        Args:
+            operations: 操作列表
+            status: 状态（pending/success/failed/reverted）
+            error: 错误信息（如果有）
+            request: 生成这些操作的用户需求（如果已知，供本地预分类器按需求学习）
+        """
+        if not operations:
+            return
+        
+        timestamp = datetime.now().isoformat()
+        lines = []
+        for operation in operations:
+            log_entry = {
+                'timestamp': timestamp,
+                'operation_id': operation.id,
+                'type': operation.type.value if hasattr(operation.type, 'value') else str(operation.type),
+                'source': operation.source,
+                'target': operation.target,
+                'reason': operation.reason,
+                'status': status,
+                'error': error
+            }
+            if request:
+                log_entry['request'] = request
+            lines.append(json.dumps(log_entry, ensure_ascii=False) + '\n')
         
         # 写入日志文件（JSONL格式，每行一个JSON对象）
         log_file = self.log_dir / f"{date.today()}.jsonl"
         with open(log_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(log_entry, ensure_ascii=False) + '\n')
+            f.writelines(lines)
     
     def get_recent_operations(self, limit: int = 10) -> List[Dict]:
         """
@@ -82,6 +109,39 @@ class OperationLogger:
         
         return operations[:limit]
     
+    def _recent_log_files(self, days: int) -> List[Path]:
+        """最近若干天的日志文件（按日期从早到晚）"""
+        from datetime import timedelta
+        
+        cutoff = (date.today() - timedelta(days=days)).isoformat()
+        return sorted(f for f in self.log_dir.glob('*.jsonl') if f.stem >= cutoff)
+    
+    def log_signature(self, days: int = 30) -> tuple:
+        """最近若干天日志文件的签名（文件名、大小、修改时间），用于判断日志是否变化"""
+        signature = []
+        for log_file in self._recent_log_files(days):
+            try:
+                stat = log_file.stat()
+            except OSError:
+                continue
+            signature.append((log_file.name, stat.st_size, stat.st_mtime_ns))
+        return tuple(signature)
+    
+    def get_operations_since(self, days: int = 30) -> List[Dict]:
+        """
+        获取最近若干天的全部操作记录
+        
+        Args:
+            days: 天数
+            
+        Returns:
+            操作记录列表（按时间从早到晚）
+        """
+        operations = []
+        for log_file in self._recent_log_files(days):
+            operations.extend(self.get_operations_by_date(date.fromisoformat(log_file.stem)))
+        return operations
+    
     def get_operations_by_date(self, target_date: date) -> List[Dict]:
         """
         获取指定日期的操作记录
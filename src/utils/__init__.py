@@ -1,7 +1,8 @@
 """工具函数模块"""
 
-from .config import ConfigManager
+from .config import ConfigManager, get_data_dir, resolve_data_path
 from .file_metadata import FileMetadataExtractor
 from .pdf_reader import PDFReader
+from .keyword_matcher import KeywordMatcher
 
-__all__ = ["ConfigManager", "FileMetadataExtractor", "PDFReader"]
+__all__ = ["ConfigManager", "get_data_dir", "resolve_data_path", "FileMetadataExtractor", "PDFReader", "KeywordMatcher"]
@@ -1,12 +1,42 @@
 """配置管理器"""
 
 import os
+import sys
 import yaml
 from pathlib import Path
 from typing import Any, Dict, Optional
 from dotenv import load_dotenv
 
 
+# 数据目录的环境变量（学习的规则、分类缓存等持久化数据存放在该目录下）
+DATA_DIR_ENV = 'SMART_TIDY_DATA_DIR'
+
+
+def get_data_dir() -> Path:
+    """
+    获取用户数据目录
+
+    优先使用环境变量 SMART_TIDY_DATA_DIR，否则使用系统的用户数据目录：
+    Windows 为 %LOCALAPPDATA%，macOS 为 ~/Library/Application Support，其他系统为 $XDG_DATA_HOME 或 ~/.local/share。
+    """
+    override = os.getenv(DATA_DIR_ENV)
+    if override:
+        return Path(override).expanduser()
+    if sys.platform == 'win32':
+        base = Path(os.getenv('LOCALAPPDATA') or Path.home() / 'AppData' / 'Local')
+    elif sys.platform == 'darwin':
+        base = Path.home() / 'Library' / 'Application Support'
+    else:
+        base = Path(os.getenv('XDG_DATA_HOME') or Path.home() / '.local' / 'share')
+    return base / 'smart_file_tidy'
+
+
+def resolve_data_path(path: str) -> Path:
+    """将相对路径解析到用户数据目录下（绝对路径保持不变）"""
+    resolved = Path(path).expanduser()
+    return resolved if resolved.is_absolute() else get_data_dir() / resolved
+
+
 class ConfigManager:
     """配置管理器"""
     
@@ -14,6 +44,8 @@ class ConfigManager:
         """初始化配置管理器"""
         self.config_path = config_path or self._get_default_config_path()
         self.config: Dict[str, Any] = {}
+        # 配置版本号，每次加载或修改后递增，用于判断缓存的组件是否过期
+        self.version = 0
         self.load_config()
         load_dotenv()  # 加载.env文件
     
@@ -39,6 +71,7 @@ class ConfigManager:
                 self.config = yaml.safe_load(f)
         except Exception as e:
             raise RuntimeError(f"加载配置文件失败: {e}")
+        self.version += 1
     
     def get(self, key: str, default: Any = None) -> Any:
         """获取配置项（支持点号分隔的多级键）"""
@@ -55,6 +88,10 @@ class ConfigManager:
         
         return value
     
+    def get_data_path(self, key: str, default: str) -> str:
+        """获取数据文件路径配置（相对路径位于用户数据目录下）"""
+        return str(resolve_data_path(self.get(key, default)))
+    
     def set(self, key: str, value: Any) -> None:
         """设置配置项"""
         keys = key.split('.')
@@ -66,6 +103,7 @@ class ConfigManager:
             config = config[k]
         
         config[keys[-1]] = value
+        self.version += 1
     
     def save_config(self, path: Optional[str] = None) -> None:
         """保存配置文件"""
@@ -78,7 +116,17 @@ class ConfigManager:
         if provider is None:
             provider = self.get('ai.default_provider', 'claude')
         
-        config = self.get(f'ai.providers.{provider}', {})
+        # 复制一份，避免环境变量中的密钥写回配置文件
+        config = dict(self.get(f'ai.providers.{provider}', {}))
+        
+        # 连接池大小（提供商配置优先）
+        for key, value in (self.get('ai.http_pool', {}) or {}).items():
+            config.setdefault(key, value)
+        
+        # 限流与重试（提供商配置中的同名项覆盖全局默认值）
+        rate_limit = dict(self.get('ai.rate_limit', {}) or {})
+        rate_limit.update(config.get('rate_limit') or {})
+        config['rate_limit'] = rate_limit
         
         # 从环境变量获取API Key和配置
         if provider == 'claude':
@@ -0,0 +1,108 @@
+"""多关键词匹配器 - 每组关键词只构建一次，一次调用得到文本命中的所有类别"""
+
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+# 关键词达到该数量时才使用自动机（关键词较少时逐个查找子串更快）
+AUTOMATON_MIN_KEYWORDS = 32
+
+
+class KeywordMatcher:
+    """
+    多关键词匹配器
+
+    - 文本只转换一次小写，再按类别逐个查找子串，一个类别命中后不再查找它的其余关键词。
+      CPython 的子串查找比正则分支（alternation）快得多，关键词不多时这是最快的实现
+    - 关键词较多（≥ AUTOMATON_MIN_KEYWORDS）且安装了 pyahocorasick 时，构建 Aho-Corasick 自动机
+      单次扫描文本，耗时与关键词数量基本无关
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]], case_sensitive: bool = False):
+        """
+        构建匹配器
+
+        Args:
+            categories: 类别 -> 关键词列表
+            case_sensitive: 是否区分大小写（默认不区分，文本和关键词统一转为小写）
+        """
+        self.case_sensitive = case_sensitive
+        self.category_names: List[str] = list(categories)
+
+        keyword_categories: Dict[str, Set[str]] = {}
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                if keyword:
+                    keyword_categories.setdefault(self._normalize(keyword), set()).add(category)
+
+        self._category_keywords: List[Tuple[str, Tuple[str, ...]]] = [
+            (category, tuple(k for k, cats in keyword_categories.items() if category in cats))
+            for category in self.category_names
+        ]
+
+        self._automaton = None
+        if AHOCORASICK_AVAILABLE and len(keyword_categories) >= AUTOMATON_MIN_KEYWORDS:
+            self._automaton = ahocorasick.Automaton()
+            for keyword, cats in keyword_categories.items():
+                self._automaton.add_word(keyword, frozenset(cats))
+            self._automaton.make_automaton()
+
+    def _normalize(self, text: str) -> str:
+        return text if self.case_sensitive else text.lower()
+
+    def categories(self, text: str) -> Set[str]:
+        """
+        查找文本中命中的所有类别
+
+        Args:
+            text: 要检查的文本
+
+        Returns:
+            命中的类别集合
+        """
+        found: Set[str] = set()
+        if not text:
+            return found
+
+        text = self._normalize(text)
+        total = len(self.category_names)
+
+        if self._automaton is not None:
+            hits: FrozenSet[str]
+            for _, hits in self._automaton.iter(text):
+                found |= hits
+                if len(found) == total:
+                    break
+            return found
+
+        for category, keywords in self._category_keywords:
+            if any(keyword in text for keyword in keywords):
+                found.add(category)
+        return found
+
+    def match(self, text: str) -> Dict[str, bool]:
+        """
+        检查每个类别是否命中
+
+        Args:
+            text: 要检查的文本
+
+        Returns:
+            类别 -> 是否命中（保持构建时的类别顺序）
+        """
+        found = self.categories(text)
+        return {category: category in found for category in self.category_names}
+
+    def any(self, text: str) -> bool:
+        """文本中是否包含任一关键词"""
+        if not text:
+            return False
+        text = self._normalize(text)
+        if self._automaton is not None:
+            return next(self._automaton.iter(text), None) is not None
+        return any(keyword in text for _, keywords in self._category_keywords for keyword in keywords)
@@ -6,6 +6,21 @@ from typing import Optional
 import PyPDF2
 import pdfplumber
 
+from .keyword_matcher import KeywordMatcher
+
+
+# 文件名中的文档类别关键词
+DOCUMENT_KEYWORD_CATEGORIES = {
+    'paper': ['paper', 'article', 'journal', 'conference', '论文', '期刊'],
+    'resume': ['resume', 'cv', '简历', '履历'],
+    'invoice': ['invoice', 'receipt', '发票', '收据', '报销'],
+    'manual': ['manual', 'guide', 'handbook', '手册', '指南'],
+    'report': ['report', 'summary', '报告', '总结'],
+    'certificate': ['certificate', 'diploma', '证书', '文凭'],
+}
+
+DOCUMENT_KEYWORD_MATCHER = KeywordMatcher(DOCUMENT_KEYWORD_CATEGORIES)
+
 
 class PDFReader:
     """PDF内容读取器"""
@@ -94,19 +109,4 @@ class PDFReader:
     @staticmethod
     def _check_document_keywords(filename: str) -> dict:
         """检查文件名中的关键词"""
-        filename_lower = filename.lower()
-        
-        keyword_categories = {
-            'paper': ['paper', 'article', 'journal', 'conference', '论文', '期刊'],
-            'resume': ['resume', 'cv', '简历', '履历'],
-            'invoice': ['invoice', 'receipt', '发票', '收据', '报销'],
-            'manual': ['manual', 'guide', 'handbook', '手册', '指南'],
-            'report': ['report', 'summary', '报告', '总结'],
-            'certificate': ['certificate', 'diploma', '证书', '文凭'],
-        }
-        
-        found = {}
-        for category, keywords in keyword_categories.items():
-            found[category] = any(kw in filename_lower for kw in keywords)
-        
-        return found
+        return DOCUMENT_KEYWORD_MATCHER.match(filename)
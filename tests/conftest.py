@@ -3,9 +3,18 @@
 import pytest
 import tempfile
 import shutil
+from datetime import datetime
 from pathlib import Path
 
 
+@pytest.fixture(autouse=True)
+def isolated_data_dir(tmp_path, monkeypatch):
+    """将用户数据目录（学习的规则、分类缓存等）指向临时目录，避免测试之间互相影响"""
+    data_dir = tmp_path / 'smart_tidy_data'
+    monkeypatch.setenv('SMART_TIDY_DATA_DIR', str(data_dir))
+    return data_dir
+
+
 @pytest.fixture
 def temp_dir():
     """创建临时测试目录"""
@@ -34,6 +43,21 @@ def sample_files(temp_dir):
     return created_files
 
 
+@pytest.fixture
+def make_file():
+    """构造不依赖磁盘的文件信息的工厂函数"""
+    from src.models import FileInfo
+    
+    def factory(path: str, size: int = 100, metadata=None, modified: datetime = datetime(2024, 3, 5)) -> FileInfo:
+        p = Path(path)
+        return FileInfo(
+            path=path, name=p.name, extension=p.suffix.lower(), size=size,
+            created_time=modified, modified_time=modified, metadata=metadata
+        )
+    
+    return factory
+
+
 @pytest.fixture
 def mock_ai_adapter():
     """模拟AI适配器"""
@@ -0,0 +1,268 @@
+"""测试Agent批量工具"""
+
+import json
+from pathlib import Path
+from src.langchain_integration.tools import BatchFileOperatorTool, ClassifyPapersTool
+from src.core import paper_detector
+from src.core.paper_detector import PaperPrePass
+
+
+def test_batch_file_operator_executes_all(temp_dir, sample_files):
+    """测试批量操作一次执行多个操作，无效操作被跳过"""
+    papers = temp_dir / 'Papers'
+    operations = [
+        {'operation_type': 'create_folder', 'source': '', 'target': str(papers)},
+        {'operation_type': 'move', 'source': str(temp_dir / 'test.pdf'), 'target': str(papers / 'test.pdf')},
+        {'operation_type': 'move', 'source': str(temp_dir / 'report.pdf'), 'target': str(papers / 'report.pdf')},
+        {'operation_type': 'move', 'source': str(temp_dir / 'missing.pdf'), 'target': str(papers / 'missing.pdf')},
+        {'operation_type': 'delete', 'source': str(temp_dir / 'data.txt'), 'target': ''},
+    ]
+
+    result = json.loads(BatchFileOperatorTool()._run(operations=operations))
+
+    assert result['success_count'] == 3
+    assert len(result['rejected']) == 2
+    assert (papers / 'test.pdf').exists() and (papers / 'report.pdf').exists()
+    assert not (temp_dir / 'test.pdf').exists()
+
+
+def test_batch_file_operator_dry_run(temp_dir, sample_files):
+    """测试批量操作预演不修改文件"""
+    operations = [
+        {'operation_type': 'create_folder', 'source': '', 'target': str(temp_dir / 'Papers')},
+        {'operation_type': 'move', 'source': str(temp_dir / 'test.pdf'), 'target': str(temp_dir / 'Papers' / 'test.pdf')},
+    ]
+
+    result = json.loads(BatchFileOperatorTool(dry_run=True)._run(operations=operations))
+
+    assert result['dry_run'] and result['success_count'] == 2
+    assert (temp_dir / 'test.pdf').exists()
+    assert not (temp_dir / 'Papers').exists()
+
+
+def test_classify_papers_suggests_operations(temp_dir, sample_files, monkeypatch):
+    """测试论文批量识别委托给规则预筛选，按预筛选的阈值分档并返回可直接执行的操作列表"""
+    counts = {'test.pdf': 4, 'report.pdf': 3}
+
+    def fake_check(file_path):
+        return {'indicator_count': counts[Path(file_path).name], 'recommendation': '可能不是学术论文'}
+
+    monkeypatch.setattr(paper_detector, 'check_paper_indicators', fake_check)
+    tool = ClassifyPapersTool(prepass=PaperPrePass(paper_threshold=4, uncertain_threshold=2, max_workers=1))
+
+    result = json.loads(tool._run(directory=str(temp_dir)))
+
+    assert result['success'] and result['pdf_count'] == 2 and result['paper_count'] == 1
+    assert [p['file_path'] for p in result['papers']] == [str(temp_dir / 'test.pdf')]
+    assert [p['file_path'] for p in result['uncertain']] == [str(temp_dir / 'report.pdf')]
+    ops = result['suggested_operations']
+    assert ops[0]['operation_type'] == 'create_folder'
+    assert ops[1]['operation_type'] == 'move'
+    assert ops[1]['source'] == str(temp_dir / 'test.pdf')
+    assert ops[1]['target'] == str(temp_dir / 'Papers' / 'test.pdf')
+
+
+def test_parse_react_output_nested_json():
+    """测试批量工具的嵌套JSON参数能被完整解析"""
+    from src.langchain_integration.agent import FileOrganizerAgent
+
+    agent = FileOrganizerAgent(
+        'custom',
+        {'base_url': 'http://127.0.0.1:9/v1', 'api_key': 'test', 'model': 'test'},
+        verbose=False
+    )
+    text = """Thought: 一次移动所有论文
+Action: batch_file_operator
+Action Input: {"operations": [
+  {"operation_type": "create_folder", "source": "", "target": "/d/Papers"},
+  {"operation_type": "move", "source": "/d/a.pdf", "target": "/d/Papers/a.pdf"}
+]}"""
+
+    action, action_input, _ = agent._parse_react_output(text)
+
+    assert action == 'batch_file_operator'
+    assert len(action_input['operations']) == 2
+    assert action_input['operations'][1]['target'] == '/d/Papers/a.pdf'
+
+
+def test_observation_compaction_within_budget():
+    """测试工具结果按工具摘要并限制在token上限以内"""
+    from src.langchain_integration.observation import ObservationCompactor
+
+    files = [
+        {'path': f'/d/file_{i}.pdf', 'name': f'file_{i}.pdf', 'extension': '.pdf', 'size': 1024,
+         'metadata': {'mime_type': 'application/pdf', 'title': f'Paper {i}'}, 'content_sample': 'x' * 500}
+        for i in range(100)
+    ]
+    raw = json.dumps({'success': True, 'file_count': 100, 'files': files}, ensure_ascii=False, indent=2)
+    compactor = ObservationCompactor(max_observation_tokens=800)
+
+    compacted = compactor.compact('file_scanner', raw)
+
+    assert compactor.count(compacted) <= 800
+    assert '省略' in compacted and 'mime_type' not in compacted
+    assert json.loads(compacted)['file_count'] == 100
+
+
+def test_agent_history_compacts_old_steps():
+    """测试旧步骤按块压缩为摘要，消息前缀在压缩之间保持不变"""
+    from langchain_core.messages import SystemMessage, HumanMessage
+    from src.langchain_integration.observation import ObservationCompactor, AgentHistory
+
+    history = AgentHistory(
+        [SystemMessage(content='system'), HumanMessage(content='task')],
+        ObservationCompactor(history_window=2, context_token_budget=0)
+    )
+    observation = json.dumps({'success': True, 'file_path': '/d/a.pdf', 'text': 'y' * 1000})
+
+    snapshots = []
+    for i in range(5):
+        history.add_step(f'Thought: {i}\nAction: file_analyzer', 'file_analyzer',
+                         {'file_path': '/d/a.pdf'}, str(i), observation, '继续')
+        snapshots.append([m.content for m in history.messages()])
+
+    # 第5步时完整步骤超过 2×窗口，前3步被压缩为摘要
+    assert history.compacted == 3
+    assert snapshots[3][:8] == snapshots[2][:8]
+    assert '已压缩' in snapshots[4][3] and 'y' * 100 not in snapshots[4][3]
+    assert snapshots[4][-1].startswith('Observation: ')
+
+
+def test_agent_stops_at_run_token_budget(temp_dir, sample_files):
+    """测试累计输入token超过运行预算时停止迭代"""
+    from src.langchain_integration.agent import FileOrganizerAgent
+    from src.mock_llm import MockLLMServer, MockLLMSettings
+
+    script = [{'thought': '扫描', 'action': 'file_scanner', 'action_input': {'directory': '{directory}'}}] * 5
+    with MockLLMServer(MockLLMSettings(react_script=script)) as server:
+        agent = FileOrganizerAgent(
+            'custom',
+            {'base_url': server.openai_base_url, 'api_key': 'mock', 'model': 'mock-llm'},
+            verbose=False,
+            context_config={'run_token_budget': 10000},
+            agent_type='react'
+        )
+        result = agent.organize_files(str(temp_dir), "整理文件")
+
+    assert 'token预算' in result['output']
+    assert 1 <= server.stats['requests'] < 5
+
+
+def test_agent_native_tool_calling(temp_dir, sample_files):
+    """测试原生工具调用：同一轮的多个工具调用全部执行"""
+    from src.langchain_integration.agent import FileOrganizerAgent
+    from src.mock_llm import MockLLMServer, MockLLMSettings
+
+    script = [
+        {'thought': '分析两个PDF', 'actions': [
+            {'action': 'file_analyzer', 'action_input': {'file_path': str(temp_dir / 'test.pdf')}},
+            {'action': 'file_analyzer', 'action_input': {'file_path': str(temp_dir / 'report.pdf')}},
+        ]},
+        {'final_answer': '已分析 {directory}'},
+    ]
+    with MockLLMServer(MockLLMSettings(react_script=script)) as server:
+        agent = FileOrganizerAgent(
+            'custom',
+            {'base_url': server.openai_base_url, 'api_key': 'mock', 'model': 'mock-llm'},
+            verbose=False
+        )
+        result = agent.organize_files(str(temp_dir), "整理文件")
+
+    assert result['output'] == f"已分析 {temp_dir}"
+    assert server.stats['scenarios'] == {'tools': 2}
+
+
+def test_agent_falls_back_to_react(temp_dir, sample_files):
+    """测试模型不支持工具调用时回退到ReAct"""
+    from src.langchain_integration.agent import FileOrganizerAgent
+    from src.mock_llm import MockLLMServer, MockLLMSettings
+
+    with MockLLMServer(MockLLMSettings(tool_calling=False)) as server:
+        agent = FileOrganizerAgent(
+            'custom',
+            {'base_url': server.openai_base_url, 'api_key': 'mock', 'model': 'mock-llm',
+             'rate_limit': {'max_retries': 0}},
+            verbose=False
+        )
+        result = agent.organize_files(str(temp_dir), "整理文件")
+
+    assert not agent.tool_calling
+    assert 'Final Answer' in result['output']
+    assert server.stats['status_codes']['400'] == 1
+    assert server.stats['scenarios']['react'] == 2
+
+
+def test_execute_actions_runs_read_only_tools_concurrently(monkeypatch):
+    """测试同一步骤的只读工具并发执行，文件操作按顺序单独执行，结果保持调用顺序"""
+    import threading
+    from src.langchain_integration.agent import FileOrganizerAgent
+
+    agent = FileOrganizerAgent(
+        'custom',
+        {'base_url': 'http://127.0.0.1:9/v1', 'api_key': 'test', 'model': 'test'},
+        verbose=False
+    )
+    threads = {}
+
+    def fake_run_tool(name, args, validate_args):
+        threads[args['id']] = threading.current_thread().name
+        return f"{name}:{args['id']}", 'ok'
+
+    monkeypatch.setattr(agent, '_run_tool', fake_run_tool)
+    actions = [
+        ('file_analyzer', {'id': 1}),
+        ('file_analyzer', {'id': 2}),
+        ('file_operator', {'id': 3}),
+        ('validation_tool', {'id': 4}),
+    ]
+
+    results = agent._execute_actions(actions, validate_args=False)
+
+    assert [obs for obs, _ in results] == ['file_analyzer:1', 'file_analyzer:2', 'file_operator:3', 'validation_tool:4']
+    assert threads[1].startswith('agent-tool') and threads[2].startswith('agent-tool')
+    assert threads[3] == threads[4] == threading.current_thread().name
+
+
+def test_agent_react_multiple_actions(temp_dir, sample_files):
+    """测试ReAct模式下一次输出多个Action时全部执行"""
+    from src.langchain_integration.agent import FileOrganizerAgent
+    from src.mock_llm import MockLLMServer, MockLLMSettings
+
+    script = [
+        {'thought': '分析两个PDF', 'actions': [
+            {'action': 'file_analyzer', 'action_input': {'file_path': str(temp_dir / 'test.pdf')}},
+            {'action': 'file_analyzer', 'action_input': {'file_path': str(temp_dir / 'report.pdf')}},
+        ]},
+        {'thought': '完成', 'final_answer': '已分析 {directory}'},
+    ]
+    with MockLLMServer(MockLLMSettings(react_script=script)) as server:
+        agent = FileOrganizerAgent(
+            'custom',
+            {'base_url': server.openai_base_url, 'api_key': 'mock', 'model': 'mock-llm'},
+            verbose=False,
+            agent_type='react'
+        )
+        execute_actions = agent._execute_actions
+        executed = []
+
+        def record(actions, validate_args):
+            results = execute_actions(actions, validate_args)
+            executed.append([(name, status) for (name, _), (_, status) in zip(actions, results)])
+            return results
+
+        agent._execute_actions = record
+        result = agent.organize_files(str(temp_dir), "整理文件")
+
+    assert executed == [[('file_analyzer', 'ok'), ('file_analyzer', 'ok')]]
+    assert f"已分析 {temp_dir}" in result['output']
+    assert server.stats['scenarios']['react'] == 2
+
+
+def test_tool_ainvoke(temp_dir, sample_files):
+    """测试工具支持异步调用"""
+    import asyncio
+    from src.langchain_integration.tools import FileScannerTool
+
+    result = json.loads(asyncio.run(FileScannerTool().ainvoke({'directory': str(temp_dir)})))
+
+    assert result['success']
@@ -1,7 +1,10 @@
 """测试智能分类器"""
 
 import pytest
+from pathlib import Path
 from src.core.classifier import SmartClassifier, ConversationManager
+from src.core.classification_scheduler import ClassificationScheduler
+from src.ai.prompt_builder import PromptBuilder
 from src.models import FileInfo
 
 
@@ -55,3 +58,160 @@ def test_conversation_manager():
     context = manager.get_context()
     assert 'history' in context
     assert len(context['history']) == 1
+
+
+def test_classify_batch_beyond_prompt_cap(mock_ai_adapter, make_file):
+    """测试超过单个Prompt文件上限时分块分类全部文件"""
+    files = [make_file(f'/data/dir{i % 3}/file_{i}.txt') for i in range(250)]
+    chunk_sizes = []
+    original = mock_ai_adapter.generate_classification
+    
+    def counting_classification(chunk, user_request, context):
+        chunk_sizes.append(len(chunk))
+        return original(chunk, user_request, context)
+    
+    mock_ai_adapter.generate_classification = counting_classification
+    classifier = SmartClassifier(mock_ai_adapter, max_concurrency=3)
+    
+    operations = classifier.classify_batch(files, "整理所有文件", {})
+    
+    assert len(operations) == 250
+    assert len(chunk_sizes) >= 3
+    assert all(size <= 100 for size in chunk_sizes)
+
+
+def test_classify_batch_chunk_failure_fallback(mock_ai_adapter, make_file):
+    """测试某一块AI分类失败时只对该块降级处理"""
+    files = [make_file(f'/data/file_{i}.txt') for i in range(150)]
+    original = mock_ai_adapter.generate_classification
+    
+    def flaky_classification(chunk, user_request, context):
+        if any(f.name == 'file_0.txt' for f in chunk):
+            raise RuntimeError("rate limited")
+        return original(chunk, user_request, context)
+    
+    mock_ai_adapter.generate_classification = flaky_classification
+    classifier = SmartClassifier(mock_ai_adapter)
+    
+    operations = classifier.classify_batch(files, "整理所有文件", {})
+    
+    assert len(operations) == 150
+    assert any(op.reason == "简单分类（AI不可用）" for op in operations)
+    assert any(op.reason == "Test classification" for op in operations)
+
+
+def test_merge_operations_deduplicates():
+    """测试合并时去除重复操作"""
+    merged = ClassificationScheduler.merge_operations([
+        {'type': 'create_folder', 'file': '', 'target': '/data/docs'},
+        {'type': 'move', 'file': '/data/a.txt', 'target': '/data/x/a.txt', 'confidence': 0.4},
+        {'type': 'create_folder', 'file': '', 'target': '/data/docs'},
+        {'type': 'move', 'file': '/data/a.txt', 'target': '/data/docs/a.txt', 'confidence': 0.9},
+    ])
+    
+    assert len(merged) == 2
+    assert merged[1]['target'] == '/data/docs/a.txt'
+
+
+def test_classification_cache_skips_unchanged_files(mock_ai_adapter, temp_dir, make_file):
+    """测试分类缓存：未变更的文件不再调用AI，变更的文件重新分类"""
+    from src.core.classification_cache import ClassificationCache
+    
+    files = [make_file(f'/data/file_{i}.txt') for i in range(5)]
+    sent = []
+    original = mock_ai_adapter.generate_classification
+    
+    def counting_classification(chunk, user_request, context):
+        sent.extend(f.path for f in chunk)
+        return original(chunk, user_request, context)
+    
+    mock_ai_adapter.generate_classification = counting_classification
+    cache = ClassificationCache(db_path=str(temp_dir / 'cache.db'))
+    classifier = SmartClassifier(mock_ai_adapter, cache=cache)
+    
+    first = classifier.classify_batch(files, "整理所有文件", {})
+    assert len(sent) == 5
+    
+    # 需求仅大小写和空白不同，视为相同
+    files[0] = files[0].model_copy(update={'size': 999})
+    second = classifier.classify_batch(files, "  整理所有文件 ", {})
+    
+    assert len(sent) == 6
+    assert sent[-1] == '/data/file_0.txt'
+    assert sorted(op.target for op in second) == sorted(op.target for op in first)
+
+
+def test_classification_cache_skips_omitted_files(mock_ai_adapter, temp_dir, make_file):
+    """测试AI响应遗漏的文件不写入缓存，下次整理时重新分类"""
+    from src.core.classification_cache import ClassificationCache
+    
+    files = [make_file(f'/data/file_{i}.txt') for i in range(3)]
+    sent = []
+    original = mock_ai_adapter.generate_classification
+    
+    def omitting_classification(chunk, user_request, context):
+        sent.extend(f.path for f in chunk)
+        result = original(chunk, user_request, context)
+        result['operations'] = [op for op in result['operations'] if op['file'] != '/data/file_1.txt']
+        return result
+    
+    mock_ai_adapter.generate_classification = omitting_classification
+    classifier = SmartClassifier(mock_ai_adapter, cache=ClassificationCache(db_path=str(temp_dir / 'cache.db')))
+    
+    classifier.classify_batch(files, "整理所有文件", {})
+    classifier.classify_batch(files, "整理所有文件", {})
+    
+    assert sent.count('/data/file_1.txt') == 2
+    assert sent.count('/data/file_0.txt') == 1
+
+
+def test_classification_cache_eviction(temp_dir):
+    """测试分类缓存的数量上限和过期清理"""
+    from src.core.classification_cache import ClassificationCache
+    
+    cache = ClassificationCache(db_path=str(temp_dir / 'cache.db'), max_entries=3)
+    cache.put_many({f'key{i}': [] for i in range(5)})
+    assert cache.stats()['entries'] == 3
+    
+    cache.ttl_seconds = -1
+    assert cache.get_many(['key4']) == {}
+    cache.evict()
+    assert cache.stats()['entries'] == 0
+
+
+def test_compact_prompt_file_ids_resolved(mock_ai_adapter, make_file):
+    """测试紧凑Prompt中的短文件ID和相对目标路径被还原为完整路径"""
+    files = [make_file(f'/data/docs/report_{i}.txt') for i in range(3)]
+    prompt = PromptBuilder.build_classification_prompt(files, "整理文件", {})
+    assert f"根目录: {Path('/data/docs')}" in prompt
+    assert "f2\tD0\treport_1.txt" in prompt
+    assert str(Path('/data/docs/report_1.txt')) not in prompt
+    
+    def id_classification(chunk, user_request, context):
+        return {
+            'operations': [
+                {'type': 'move', 'file': f'f{i}', 'target': f'归档/{f.name}', 'confidence': 0.9}
+                for i, f in enumerate(chunk, 1)
+            ]
+        }
+    
+    mock_ai_adapter.generate_classification = id_classification
+    operations, failed = ClassificationScheduler(mock_ai_adapter).classify(files, "整理文件", {})
+    
+    assert not failed
+    assert sorted(op['file'] for op in operations) == sorted(f.path for f in files)
+    assert all(op['target'].startswith(str(Path('/data/docs/归档'))) for op in operations)
+
+
+def test_chunk_size_limited_by_output_tokens(mock_ai_adapter, make_file):
+    """测试每块文件数受模型输出上限约束"""
+    mock_ai_adapter.model = 'gpt-4o'
+    mock_ai_adapter.max_tokens = 1024
+    scheduler = ClassificationScheduler(mock_ai_adapter)
+    files = [make_file(f'/data/file_{i}.txt') for i in range(100)]
+    
+    chunks = scheduler.make_chunks(files)
+    
+    assert scheduler.max_files_per_chunk == scheduler.budgeter.max_files_by_output()
+    assert all(len(chunk) <= scheduler.max_files_per_chunk for chunk in chunks)
+    assert sum(len(chunk) for chunk in chunks) == 100
@@ -0,0 +1,96 @@
+"""测试控制器池"""
+
+import asyncio
+
+import pytest
+
+from src.api.services.controller_pool import ControllerPool
+from src.utils import ConfigManager
+
+
+@pytest.fixture
+def config(monkeypatch):
+    """默认配置（使用测试用的API密钥，不发出请求）"""
+    monkeypatch.setenv('ANTHROPIC_API_KEY', 'test-key')
+    return ConfigManager()
+
+
+def test_reuse_by_key(config):
+    """测试同一池键复用空闲控制器，不同模式使用不同的控制器"""
+    pool = ControllerPool()
+
+    with pool.acquire(config, 'claude', use_agent=False) as first:
+        pass
+    with pool.acquire(config, 'claude', use_agent=False) as second:
+        # 借出期间独占：同一池键再借出时创建新的控制器
+        with pool.acquire(config, 'claude', use_agent=False) as third:
+            assert third is not second
+    with pool.acquire(config, 'claude', use_agent=True) as other:
+        pass
+
+    assert second is first
+    assert other is not first
+    assert pool.stats() == {'idle': 3, 'keys': 2, 'created': 3, 'reused': 1}
+
+
+def test_config_change_invalidates_idle(config):
+    """测试配置版本变化后丢弃旧版本的空闲控制器"""
+    pool = ControllerPool()
+    with pool.acquire(config, 'claude', use_agent=False) as first:
+        pass
+
+    config.set('file_operations.batch_size', 10)
+    with pool.acquire(config, 'claude', use_agent=False) as second:
+        pass
+
+    assert second is not first
+    assert pool.stats()['keys'] == 1
+
+
+def test_release_resets_session(config, make_file):
+    """测试归还时清除会话状态，出错时不归还"""
+    pool = ControllerPool()
+    with pool.acquire(config, 'claude', use_agent=False) as controller:
+        controller.current_files = [make_file('/d/a.txt')]
+        controller.current_request = '整理文件'
+
+    with pool.acquire(config, 'claude', use_agent=False) as reused:
+        assert reused is controller
+        assert reused.current_files == [] and reused.current_request is None
+
+    with pytest.raises(RuntimeError):
+        with pool.acquire(config, 'claude', use_agent=False):
+            raise RuntimeError("broken")
+    assert pool.stats()['idle'] == 0
+
+
+def test_agent_dry_run_per_call(config, monkeypatch):
+    """测试Agent任务按次传入模拟执行，不修改共享配置，调用结束后恢复"""
+    from src.api.services.organize_service import OrganizeService
+    from src.api.services.task_manager import TaskStatus
+
+    service = OrganizeService()
+    service._config = config
+    service._controller_pool = ControllerPool()
+    version = config.version
+    seen = []
+
+    with service._controller_pool.acquire(config, 'claude', use_agent=True) as controller:
+        def fake_organize(directory, user_request, context=None):
+            seen.append((controller.agent.dry_run, controller.agent._find_tool('batch_file_operator').dry_run_mode))
+            return {'success': True}
+
+        monkeypatch.setattr(controller.agent, 'organize_files', fake_organize)
+
+    async def run_task():
+        task_id = service._task_manager.create_task()
+        await service._agent_task(task_id, '/d', '整理论文', 'claude', True, False)
+        return service._task_manager.get_task(task_id)
+
+    task = asyncio.run(run_task())
+
+    assert task.status == TaskStatus.COMPLETED
+    assert seen == [(True, True)]
+    assert config.version == version
+    assert controller.agent.dry_run is False
+    assert service._controller_pool.stats()['reused'] == 1
@@ -1,6 +1,7 @@
 """测试自定义API适配器"""
 
 import pytest
+from types import SimpleNamespace
 from src.ai.custom_adapter import CustomAPIAdapter
 from src.models import FileInfo
 
@@ -82,3 +83,80 @@ def test_json_parsing():
     mixed_text = 'Some text\n{"operations": [], "summary": "test"}\nMore text'
     result = adapter._parse_json_response(mixed_text)
     assert result["operations"] == []
+
+
+def test_prompt_cache_usage_recorded():
+    """测试记录提供商返回的Prompt缓存命中token数"""
+    from src.ai.prompt_cache import get_prompt_cache_stats
+    
+    adapter = CustomAPIAdapter(
+        base_url="https://api.example.com/v1",
+        api_key="test-key",
+        model="test-model"
+    )
+    stats = get_prompt_cache_stats()
+    stats.reset()
+    
+    def fake_create(**kwargs):
+        content = '{"operations": [{"type": "move", "file": "a.txt", "target": "docs/a.txt"}]}'
+        usage = SimpleNamespace(
+            prompt_tokens=2000,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=1536)
+        )
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=usage
+        )
+    
+    adapter.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=fake_create))
+    )
+    adapter.generate_classification([], "整理文件", {})
+    
+    custom = stats.snapshot()["custom"]
+    assert custom["requests"] == 1
+    assert custom["cache_read_tokens"] == 1536
+    assert custom["input_tokens"] == 464
+    assert custom["token_hit_rate"] == round(1536 / 2000, 4)
+
+
+def test_http_client_without_sdk_default_client():
+    """测试SDK没有 DefaultHttpxClient（较早版本）时直接创建带连接池限制的httpx客户端"""
+    import httpx
+    import openai
+    from src.ai.http_pool import build_http_client, build_limits
+    
+    limits = build_limits(max_connections=5)
+    old_sdk = SimpleNamespace()
+    
+    client = build_http_client(old_sdk, limits)
+    assert isinstance(client, httpx.Client)
+    assert client._transport._pool._max_connections == 5
+    client.close()
+    
+    adapter = CustomAPIAdapter(
+        base_url="https://api.example.com/v1",
+        api_key="test-key",
+        model="test-model",
+        max_connections=5
+    )
+    if hasattr(openai, 'DefaultHttpxClient'):
+        assert isinstance(adapter.client._client, openai.DefaultHttpxClient)
+    assert adapter.client._client._transport._pool._max_connections == 5
+
+
+def test_claude_cache_marker_only_on_long_prefix():
+    """测试分类前缀达到最小缓存长度时才设置缓存标记"""
+    from src.ai.claude_adapter import ClaudeAdapter
+    
+    adapter = ClaudeAdapter(api_key="test-key")
+    
+    short = adapter._classification_content([], "整理文件", {})
+    request = adapter._build_request(short)
+    assert isinstance(short, str)
+    assert isinstance(request["system"], str)
+    
+    rules = [f"rule_{i}: move invoices from vendor {i} into the finance folder" for i in range(300)]
+    long = adapter._classification_content([], "整理文件", {'learned_rules': rules})
+    assert "cache_control" in long[0]
+    assert "cache_control" not in long[1]
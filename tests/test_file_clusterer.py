@@ -0,0 +1,81 @@
+"""测试相似文件聚类"""
+
+from pathlib import Path
+
+from src.core.classifier import SmartClassifier
+from src.core.file_clusterer import FileClusterer
+
+
+def test_cluster_by_name_pattern_and_metadata(make_file):
+    """测试按目录、文件名模式和元数据签名分组"""
+    files = [make_file(f'/d/IMG_{i:04d}.jpg', metadata={'format': 'JPEG'}) for i in range(5)]
+    files += [
+        make_file('/d/IMG_9000.jpg', metadata={'format': 'PNG'}),
+        make_file('/other/IMG_0001.jpg', metadata={'format': 'JPEG'}),
+        make_file('/d/invoice_2024_03_01.pdf'),
+        make_file('/d/invoice_2024_03_02.pdf'),
+    ]
+
+    representatives, groups = FileClusterer(min_cluster_size=3).cluster(files)
+
+    assert [f.name for f in representatives] == [
+        'IMG_0000.jpg', 'IMG_9000.jpg', 'IMG_0001.jpg', 'invoice_2024_03_01.pdf', 'invoice_2024_03_02.pdf'
+    ]
+    assert [f.name for f in groups['/d/IMG_0000.jpg']] == ['IMG_0001.jpg', 'IMG_0002.jpg', 'IMG_0003.jpg', 'IMG_0004.jpg']
+
+
+def test_classify_batch_sends_representatives_only(mock_ai_adapter, make_file):
+    """测试只把代表文件发给AI，移动决定推广到同组文件，无法推广的操作单独分类"""
+    calls = []
+    original = mock_ai_adapter.generate_classification
+
+    def recording_classification(chunk, user_request, context):
+        calls.append([f.name for f in chunk])
+        result = original(chunk, user_request, context)
+        for op in result['operations']:
+            if 'scan' in op['file']:
+                op.update(type='rename', target='renamed.pdf')
+        return result
+
+    mock_ai_adapter.generate_classification = recording_classification
+    classifier = SmartClassifier(mock_ai_adapter, clusterer=FileClusterer())
+    files = [make_file(f'/d/photos/IMG_{i:04d}.jpg') for i in range(100)]
+    files += [make_file(f'/d/scan_{i}.pdf') for i in range(3)]
+
+    operations = classifier.classify_batch(files, "整理文件", {})
+
+    assert [sorted(names) for names in calls] == [['IMG_0000.jpg', 'scan_0.pdf'], ['scan_1.pdf', 'scan_2.pdf']]
+    targets = {op.source: op.target for op in operations}
+    assert len(targets) == 103
+    assert targets['/d/photos/IMG_0042.jpg'] == str(Path('/d/photos/organized/IMG_0042.jpg'))
+
+
+def test_digit_only_names_not_clustered(make_file):
+    """测试纯数字文件名（如 1.pdf、2301.12345.pdf）不聚成一组"""
+    files = [make_file(p) for p in ('/d/1.pdf', '/d/2.pdf', '/d/2301.12345.pdf', '/d/2024-03-05.pdf')]
+
+    representatives, groups = FileClusterer(min_cluster_size=2).cluster(files)
+
+    assert representatives == files
+    assert groups == {}
+
+
+def test_omitted_representative_falls_back_with_members(mock_ai_adapter, make_file):
+    """测试AI遗漏代表文件时，代表文件和同组文件一起按分类失败降级处理"""
+    original = mock_ai_adapter.generate_classification
+
+    def omitting_classification(chunk, user_request, context):
+        result = original(chunk, user_request, context)
+        result['operations'] = [op for op in result['operations'] if 'IMG' not in op['file']]
+        return result
+
+    mock_ai_adapter.generate_classification = omitting_classification
+    classifier = SmartClassifier(mock_ai_adapter, clusterer=FileClusterer())
+    files = [make_file(f'/d/IMG_{i:04d}.jpg') for i in range(5)] + [make_file('/d/report.pdf')]
+
+    operations = classifier.classify_batch(files, "整理文件", {})
+
+    reasons = {op.source: op.reason for op in operations}
+    assert len(reasons) == 6
+    assert all(reasons[f.path] == "简单分类（AI不可用）" for f in files[:5])
+    assert reasons['/d/report.pdf'] == 'Test classification'
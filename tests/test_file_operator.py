@@ -153,3 +153,88 @@ def test_validate_operations(temp_dir):
     
     assert validation['valid'] is False
     assert len(validation['issues']) > 0
+
+
+def test_execute_batch_failed_move_leaves_no_empty_dirs(temp_dir, monkeypatch):
+    """测试移动失败时不留下新建的空目录"""
+    (temp_dir / 'file.txt').write_text('content')
+    operations = [
+        Operation(
+            type=OperationType.MOVE,
+            source=str(temp_dir / 'missing.txt'),
+            target=str(temp_dir / 'a' / 'missing.txt')
+        ),
+        Operation(
+            type=OperationType.MOVE,
+            source=str(temp_dir / 'file.txt'),
+            target=str(temp_dir / 'b' / 'c' / 'file.txt')
+        ),
+    ]
+    
+    def failing_move(source, target):
+        raise OSError("disk full")
+    
+    monkeypatch.setattr('shutil.move', failing_move)
+    
+    result = FileOperator().execute_batch(operations)
+    
+    assert result.failed_count == 2
+    assert sorted(p.name for p in temp_dir.iterdir()) == ['file.txt']
+
+
+def test_execute_batch_skips_per_operation_mkdir(temp_dir, monkeypatch):
+    """测试批量执行时目录只创建一次"""
+    for i in range(5):
+        (temp_dir / f'file_{i}.txt').write_text(f'content {i}')
+    
+    operations = [
+        Operation(
+            type=OperationType.MOVE,
+            source=str(temp_dir / f'file_{i}.txt'),
+            target=str(temp_dir / 'moved' / f'file_{i}.txt')
+        )
+        for i in range(5)
+    ]
+    
+    mkdir_calls = []
+    original_mkdir = Path.mkdir
+    
+    def counting_mkdir(self, *args, **kwargs):
+        mkdir_calls.append(str(self))
+        return original_mkdir(self, *args, **kwargs)
+    
+    monkeypatch.setattr(Path, 'mkdir', counting_mkdir)
+    
+    result = FileOperator().execute_batch(operations)
+    
+    assert result.success_count == 5
+    assert mkdir_calls == [str(temp_dir / 'moved')]
+
+
+def test_execute_batch_progress_callback(temp_dir):
+    """测试批量执行的进度回调"""
+    for i in range(3):
+        (temp_dir / f'file_{i}.txt').write_text(f'content {i}')
+    
+    operations = [
+        Operation(
+            type=OperationType.MOVE,
+            source=str(temp_dir / f'file_{i}.txt'),
+            target=str(temp_dir / 'moved' / f'file_{i}.txt')
+        )
+        for i in range(3)
+    ]
+    operations.append(Operation(
+        type=OperationType.MOVE,
+        source=str(temp_dir / 'missing.txt'),
+        target=str(temp_dir / 'moved' / 'missing.txt')
+    ))
+    
+    progress = []
+    result = FileOperator().execute_batch(
+        operations,
+        progress_callback=lambda done, total, op: progress.append((done, total))
+    )
+    
+    assert result.failed_count == 1
+    assert progress == [(1, 4), (2, 4), (3, 4), (4, 4)]
@@ -65,3 +65,16 @@ def test_group_by_extension(temp_dir, sample_files):
     assert len(groups['.pdf']) == 2
     assert '.txt' in groups
     assert len(groups['.txt']) == 1
+
+
+def test_iter_scan_chunks(temp_dir, sample_files):
+    """测试增量扫描按块返回并报告进度"""
+    scanner = FileScanner()
+    progress = []
+    chunks = list(scanner.iter_scan(str(temp_dir), chunk_size=2, progress_callback=progress.append))
+    
+    assert all(len(chunk) <= 2 for chunk in chunks)
+    assert sum(len(chunk) for chunk in chunks) == len(sample_files)
+    assert len(progress) == len(chunks)
+    assert progress[-1]['files_done'] == len(sample_files)
+    assert progress[-1]['dirs_walked'] == 1
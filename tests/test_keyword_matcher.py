@@ -0,0 +1,34 @@
+"""测试多关键词匹配器"""
+
+import pytest
+
+from src.utils import KeywordMatcher, PDFReader
+from src.utils import keyword_matcher
+
+
+@pytest.mark.parametrize('use_automaton', [False, True])
+def test_keyword_matcher_finds_overlapping_keywords(use_automaton, monkeypatch):
+    """测试重叠和互为前缀的关键词都能命中，结果与逐个子串查找一致"""
+    if use_automaton:
+        pytest.importorskip('ahocorasick')
+        monkeypatch.setattr(keyword_matcher, 'AUTOMATON_MIN_KEYWORDS', 1)
+    categories = {
+        'doi': ['doi.org'],
+        'short': ['doi'],
+        'journal': ['journal', 'JOURNAL OF'],
+        'missing': ['abstract'],
+    }
+    matcher = KeywordMatcher(categories)
+    text = "Journal of Things, https://DOI.org/10.1000/x"
+
+    assert matcher.categories(text) == {'doi', 'short', 'journal'}
+    assert matcher.match(text) == {'doi': True, 'short': True, 'journal': True, 'missing': False}
+    assert matcher.any(text) and not matcher.any("nothing here")
+
+
+def test_document_keywords():
+    """测试文件名关键词检测"""
+    found = PDFReader._check_document_keywords("2024年度报告_invoice")
+
+    assert found['report'] and found['invoice']
+    assert not found['paper'] and not found['resume']
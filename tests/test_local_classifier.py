@@ -0,0 +1,80 @@
+"""测试本地预分类器"""
+
+from pathlib import Path
+
+from src.core.classifier import SmartClassifier
+from src.core.local_classifier import LocalClassifier, TfidfCentroidModel, extract_features
+from src.models import Operation, OperationType
+from src.safety import OperationLogger
+
+
+def move(source: str, folder: str) -> Operation:
+    """构造移动到源文件所在目录下子文件夹的操作"""
+    return Operation(
+        type=OperationType.MOVE, source=source,
+        target=str(Path(source).parent / folder / Path(source).name), reason='测试'
+    )
+
+
+def test_tfidf_centroid_model():
+    """测试按名称相似度预测类别，并给出相似度差"""
+    names = ['2023发票.pdf', '2024年3月发票.pdf', 'IMG_0001.jpg', 'IMG_0412.jpg']
+    model = TfidfCentroidModel().fit([extract_features(n) for n in names], ['财务', '财务', '照片', '照片'])
+
+    labels, similarity, margin = model.predict([extract_features('2022发票.pdf'), extract_features('???')])
+
+    assert labels == ['财务', None]
+    assert similarity[0] > 0.5 and margin[0] > 0.2
+    assert similarity[1] == 0
+
+
+def test_local_classifier_learns_from_operation_log(mock_ai_adapter, temp_dir, make_file):
+    """测试从已执行（未撤销）的操作中学习，只有把握不足的文件交给AI"""
+    logger = OperationLogger(str(temp_dir / 'logs'))
+    history = [
+        move('/old/2023发票.pdf', '财务'), move('/old/2024年3月发票.pdf', '财务'),
+        move('/old/IMG_0001.jpg', '照片'), move('/old/IMG_0412.jpg', '照片'),
+    ]
+    screenshots = [move('/old/IMG_2000.jpg', '截图'), move('/old/IMG_0999.jpg', '截图')]
+    undone = [move('/old/发票副本.pdf', '杂项'), move('/old/发票备份.pdf', '杂项')]
+    logger.log_operations(history + screenshots + undone, 'success', request='整理下载目录')
+    logger.log_operations(history[:2], 'success', request='按类型整理')
+    logger.log_operations(undone, 'reverted')
+
+    sent = []
+    original = mock_ai_adapter.generate_classification
+
+    def counting_classification(chunk, user_request, context):
+        sent.extend(f.name for f in chunk)
+        return original(chunk, user_request, context)
+
+    mock_ai_adapter.generate_classification = counting_classification
+    classifier = SmartClassifier(mock_ai_adapter, local_classifier=LocalClassifier(logger))
+    files = [make_file('/new/2025发票.pdf'), make_file('/new/IMG_2048.jpg'), make_file('/new/notes.txt')]
+
+    operations = classifier.classify_batch(files, "整理下载目录", {})
+
+    targets = {op.source: op.target for op in operations}
+    assert targets['/new/2025发票.pdf'] == str(Path('/new/财务/2025发票.pdf'))
+    assert sent == ['IMG_2048.jpg', 'notes.txt']
+    assert classifier.local_classifier.model("整理下载目录").labels == sorted(['截图', '照片', '财务'])
+    assert classifier.local_classifier.model("按类型整理").labels == ['财务']
+
+
+def test_execute_operations_logs_given_request(temp_dir):
+    """测试执行时传入的需求写入操作日志（API的控制器池中控制器不知道方案对应的需求）"""
+    from src.core import Controller
+    from src.utils import ConfigManager
+
+    (temp_dir / '2024发票.pdf').write_bytes(b'PDF')
+    controller = Controller(ConfigManager())
+    controller.logger = OperationLogger(str(temp_dir / 'logs'))
+    assert controller.current_request is None
+
+    controller.execute_operations(
+        [move(str(temp_dir / '2024发票.pdf'), '财务')], create_backup=False, user_request='整理下载目录'
+    )
+
+    entries = controller.logger.get_operations_since(1)
+    assert [e['request'] for e in entries] == ['整理下载目录']
+    assert (temp_dir / '财务' / '2024发票.pdf').exists()
@@ -0,0 +1,85 @@
+"""测试模拟LLM服务"""
+
+import pytest
+from src.ai.custom_adapter import CustomAPIAdapter
+from src.ai.local_adapter import LocalLLMAdapter
+from src.core.classification_scheduler import ClassificationScheduler
+from src.mock_llm import MockLLMServer, MockLLMSettings
+from src.models import FileInfo
+
+
+@pytest.fixture
+def mock_server():
+    """启动模拟LLM服务"""
+    with MockLLMServer(MockLLMSettings(seed=1)) as server:
+        yield server
+
+
+def test_custom_adapter_classification_via_mock(mock_server, sample_files):
+    """测试custom提供商通过模拟服务完成分类，文件ID被解析为完整路径"""
+    adapter = CustomAPIAdapter(
+        base_url=mock_server.openai_base_url,
+        api_key="mock",
+        model="mock-llm"
+    )
+    files = [FileInfo.from_path(f) for f in sample_files]
+
+    operations, failed = ClassificationScheduler(adapter).classify(files, "按类型整理", {})
+
+    assert not failed
+    assert {op['file'] for op in operations} == set(sample_files)
+    pdf = next(op for op in operations if op['file'].endswith('test.pdf'))
+    assert pdf['target'].endswith('文档/test.pdf')
+    assert mock_server.stats['scenarios']['classification'] == 1
+    assert mock_server.stats['prompt_tokens'] > 0
+
+
+def test_local_adapter_via_mock(mock_server, sample_files):
+    """测试local提供商通过模拟服务的Ollama接口完成分类"""
+    adapter = LocalLLMAdapter(base_url=mock_server.base_url, model="mock-llm")
+    files = [FileInfo.from_path(f) for f in sample_files]
+
+    result = adapter.generate_classification(files, "按类型整理", {})
+
+    assert len(result['operations']) == len(files)
+    assert all(op['file'].startswith('f') for op in result['operations'])
+
+
+def test_error_injection():
+    """测试按错误率注入错误"""
+    import requests
+
+    settings = MockLLMSettings(error_rate=1.0, error_status_codes=[429], retry_after_seconds=2)
+    with MockLLMServer(settings) as server:
+        response = requests.post(
+            f"{server.openai_base_url}/chat/completions",
+            json={"model": "mock-llm", "messages": [{"role": "user", "content": "你好"}]},
+            timeout=5
+        )
+
+    assert response.status_code == 429
+    assert response.headers['retry-after'] == '2'
+    assert server.stats['errors'] == 1
+
+
+def test_agent_react_script_via_mock(temp_dir, sample_files):
+    """测试Agent按ReAct脚本通过模拟服务执行工具调用"""
+    from src.langchain_integration.agent import FileOrganizerAgent
+
+    script = [
+        {'thought': '扫描目录', 'action': 'file_scanner', 'action_input': {'directory': '{directory}'}},
+        {'thought': '完成', 'final_answer': '已处理 {directory}'},
+    ]
+    with MockLLMServer(MockLLMSettings(react_script=script)) as server:
+        agent = FileOrganizerAgent(
+            'custom',
+            {'base_url': server.openai_base_url, 'api_key': 'mock', 'model': 'mock-llm'},
+            dry_run=True,
+            verbose=False,
+            agent_type='react'
+        )
+        result = agent.organize_files(str(temp_dir), "整理文件")
+
+    assert result['success']
+    assert f"已处理 {temp_dir}" in result['output']
+    assert server.stats['scenarios'] == {'react': 2}
@@ -2,7 +2,7 @@
 
 import pytest
 from pathlib import Path
-from src.models import FileInfo, Operation, OperationType, OperationResult
+from src.models import FileInfo, Operation, OperationType, OperationResult, ClassificationRule
 
 
 def test_file_info_from_path(temp_dir):
@@ -60,3 +60,13 @@ def test_operation_result():
     assert result.total == 10
     assert result.success_rate == 0.8
     assert str(result).startswith('OperationResult')
+
+
+def test_classification_rule_target_placeholders():
+    """测试规则目标只接受支持的占位符"""
+    assert ClassificationRule(description='照片', target='照片/{year}/{month}').target == '照片/{year}/{month}'
+    assert ClassificationRule(description='字面花括号', target='备份{{2024}}').target == '备份{{2024}}'
+
+    for target in ['备份{2024}', '{name}', '{year:>4}', '未闭合{']:
+        with pytest.raises(ValueError):
+            ClassificationRule(description='错误', target=target)
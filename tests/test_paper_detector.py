@@ -0,0 +1,98 @@
+"""测试论文规则预筛选"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from src.core import paper_detector
+from src.core.paper_detector import PaperPrePass, score_paper_text
+
+
+@pytest.fixture
+def fake_indicators(monkeypatch):
+    """按文件名返回固定的命中特征数（test.pdf 为论文，report.pdf 由参数决定）"""
+    counts = {'test.pdf': 5, 'report.pdf': 0}
+
+    def fake_check(file_path):
+        count = counts[Path(file_path).name]
+        return {'likely_paper': count >= 3, 'indicator_count': count, 'indicators_found': {'abstract': count > 0}}
+
+    monkeypatch.setattr(paper_detector, 'check_paper_indicators', fake_check)
+    return counts
+
+
+def test_score_paper_text():
+    """测试按关键词特征打分"""
+    text = "Abstract ... 1. Introduction ... Conclusion ... References ... doi:10.1000/xyz"
+
+    result = score_paper_text(text)
+
+    assert result['indicator_count'] == 5
+    assert result['likely_paper'] and result['confidence'] == 1.0
+    assert not score_paper_text("会议纪要：本周工作安排")['likely_paper']
+
+
+def test_prepass_moves_papers_without_llm(temp_dir, sample_files, fake_indicators):
+    """测试特征明确时直接移动论文，不调用LLM"""
+    from src.langchain_integration.agent import FileOrganizerAgent
+
+    agent = FileOrganizerAgent(
+        'custom',
+        {'base_url': 'http://127.0.0.1:9/v1', 'api_key': 'test', 'model': 'test'},
+        verbose=False,
+        paper_prepass={'max_workers': 1}
+    )
+    result = agent.organize_files(str(temp_dir), "整理文件")
+
+    assert result['success'] and '未调用LLM' in result['output']
+    assert result['prepass'] == {'pdf_count': 2, 'paper_count': 1, 'uncertain_count': 0, 'non_paper_count': 1}
+    assert (temp_dir / 'Papers' / 'test.pdf').exists()
+    assert (temp_dir / 'report.pdf').exists()
+
+
+def test_prepass_sends_only_uncertain_files_to_agent(temp_dir, sample_files, fake_indicators):
+    """测试只有特征不足的文件交给Agent确认"""
+    from src.langchain_integration.agent import FileOrganizerAgent
+
+    fake_indicators['report.pdf'] = 2
+    agent = FileOrganizerAgent(
+        'custom',
+        {'base_url': 'http://127.0.0.1:9/v1', 'api_key': 'test', 'model': 'test'},
+        verbose=False,
+        paper_prepass={'max_workers': 1}
+    )
+    prompts = []
+    agent._run_agent = lambda build_prompt: prompts.append(build_prompt(False)) or '已确认'
+    result = agent.organize_files(str(temp_dir), "整理文件")
+
+    assert result['prepass']['uncertain_count'] == 1
+    assert (temp_dir / 'Papers' / 'test.pdf').exists()
+    assert str(temp_dir / 'report.pdf') in prompts[0]
+    assert str(temp_dir / 'test.pdf') not in prompts[0]
+
+
+def test_prepass_scores_in_parallel(temp_dir, sample_files, fake_indicators):
+    """测试并行检测的结果与文件顺序一致，各次检测复用同一个线程池"""
+    prepass = PaperPrePass(max_workers=2)
+    paths = [str(temp_dir / 'test.pdf'), str(temp_dir / 'report.pdf')]
+
+    results = prepass.score_files(paths)
+    executor = prepass._executor
+
+    assert [r['indicator_count'] for r in results] == [5, 0]
+    assert [r['indicator_count'] for r in prepass.score_files(paths)] == [5, 0]
+    assert prepass._executor is executor
+    assert not isinstance(executor, ProcessPoolExecutor)
+
+
+def test_prepass_process_pool_uses_spawn():
+    """测试启用进程池时以spawn方式启动子进程（不在多线程进程中fork）"""
+    prepass = PaperPrePass(max_workers=2, use_processes=True)
+
+    executor = prepass._get_executor()
+
+    assert isinstance(executor, ProcessPoolExecutor)
+    assert executor._mp_context.get_start_method() == 'spawn'
+    assert prepass._get_executor() is executor
+    executor.shutdown()
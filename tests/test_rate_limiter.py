@@ -0,0 +1,105 @@
+"""测试AI请求限流与重试"""
+
+import asyncio
+import pytest
+from types import SimpleNamespace
+from src.ai.rate_limiter import (
+    ProviderGuard,
+    RateLimiter,
+    TokenBucket,
+    CircuitOpenError,
+    is_retryable,
+)
+
+
+class FakeAPIError(Exception):
+    """模拟带状态码的SDK异常"""
+
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        headers = {'retry-after': retry_after} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+
+def test_retry_on_rate_limit_then_succeed():
+    """测试429和5xx按退避重试后成功"""
+    guard = ProviderGuard('test', max_retries=3, base_delay=0.001, max_delay=0.01)
+    errors = [FakeAPIError(429, retry_after='0'), FakeAPIError(503)]
+
+    def flaky():
+        if errors:
+            raise errors.pop(0)
+        return 'ok'
+
+    assert guard.call(flaky) == 'ok'
+    assert guard.stats()['retries'] == 2
+    assert guard.breaker.state == 'closed'
+
+
+def test_non_retryable_error_raised_immediately():
+    """测试非临时性错误不重试"""
+    guard = ProviderGuard('test', max_retries=3, base_delay=0.001)
+    calls = []
+
+    def bad_request():
+        calls.append(1)
+        raise FakeAPIError(400)
+
+    with pytest.raises(FakeAPIError):
+        guard.call(bad_request)
+    assert len(calls) == 1
+    assert not is_retryable(FakeAPIError(401))
+
+
+def test_circuit_opens_after_consecutive_failures():
+    """测试连续失败后熔断并快速拒绝"""
+    guard = ProviderGuard('test', max_retries=0, failure_threshold=2, reset_timeout=60)
+
+    def down():
+        raise FakeAPIError(500)
+
+    for _ in range(2):
+        with pytest.raises(FakeAPIError):
+            guard.call(down)
+
+    with pytest.raises(CircuitOpenError):
+        guard.call(lambda: 'ok')
+    assert guard.stats()['circuit'] == 'open'
+
+
+def test_async_call_with_retry():
+    """测试异步调用的重试"""
+    guard = ProviderGuard('test', max_retries=2, base_delay=0.001, max_delay=0.01)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise FakeAPIError(529)
+        return 'ok'
+
+    assert asyncio.run(guard.acall(flaky)) == 'ok'
+    assert len(attempts) == 2
+
+
+def test_rate_limiter_waits_when_bucket_empty():
+    """测试令牌桶耗尽后需要等待"""
+    limiter = RateLimiter(requests_per_minute=60)  # 突发容量10个请求
+    waits = [limiter.reserve() for _ in range(11)]
+
+    assert all(w == 0 for w in waits[:10])
+    assert waits[10] > 0
+    assert limiter.reserve(blocking=False) is None
+
+
+def test_token_bucket_charges_full_amount():
+    """测试超过桶容量的请求全额扣除，后续请求等待透支部分补足"""
+    bucket = TokenBucket(rate_per_minute=600)  # 每秒10个，容量100
+    now = bucket.updated
+
+    assert bucket.wait_time(1000, now) == 0
+    bucket.take(1000, now)
+
+    assert bucket.tokens == -900
+    assert bucket.wait_time(10, now) == pytest.approx(91.0)
@@ -0,0 +1,157 @@
+"""测试本地规则引擎"""
+
+from pathlib import Path
+
+from src.core.classifier import SmartClassifier, ConversationManager
+from src.core.rule_engine import RuleEngine
+from src.core.rule_store import RuleStore
+from src.models import RuleAction
+
+
+def test_rule_engine_dispatch(make_file):
+    """测试扩展名、文件名正则、元数据、大小条件和目标占位符"""
+    engine = RuleEngine.from_config([
+        {'description': '相机照片', 'extensions': ['JPG'], 'name_pattern': r'^IMG_\d+', 'target': '照片/{year}/{month}'},
+        {'description': '大视频', 'extensions': ['.mp4'], 'min_size': 1000, 'target': '大文件'},
+        {'description': '长PDF', 'metadata': {'page_count': {'>=': 10}}, 'target': '书籍'},
+        {'description': '临时文件保持原位', 'name_keywords': ['~tmp'], 'action': 'keep', 'priority': 10},
+    ], include_builtin=False)
+    files = [
+        make_file('/d/IMG_0001.jpg'),
+        make_file('/d/holiday.jpg'),
+        make_file('/d/movie.mp4', size=5000),
+        make_file('/d/clip.mp4', size=10),
+        make_file('/d/book.pdf', metadata={'page_count': 300}),
+        make_file('/d/~tmp_IMG_0002.jpg'),
+    ]
+
+    operations, kept, unmatched = engine.classify(files, "整理文件")
+
+    assert {op.source: op.target for op in operations} == {
+        '/d/IMG_0001.jpg': str(Path('/d/照片/2024/03/IMG_0001.jpg')),
+        '/d/movie.mp4': str(Path('/d/大文件/movie.mp4')),
+        '/d/book.pdf': str(Path('/d/书籍/book.pdf')),
+    }
+    assert [f.name for f in kept] == ['~tmp_IMG_0002.jpg']
+    assert [f.name for f in unmatched] == ['holiday.jpg', 'clip.mp4']
+
+
+def test_builtin_rules_only_for_type_requests(mock_ai_adapter, make_file):
+    """测试按类型整理时内置规则解决全部文件，不调用AI"""
+    calls = []
+    original = mock_ai_adapter.generate_classification
+    mock_ai_adapter.generate_classification = lambda *args: calls.append(args) or original(*args)
+    classifier = SmartClassifier(mock_ai_adapter, rule_engine=RuleEngine.from_config())
+    files = [make_file('/d/a.pdf'), make_file('/d/b.png'), make_file('/d/c.xlsx')]
+
+    operations = classifier.classify_batch(files, "按文件类型整理", {})
+
+    assert not calls
+    assert sorted(Path(op.target).parent.name for op in operations) == ['图片', '文档', '表格']
+
+    classifier.classify_batch(files, "按项目整理", {})
+    assert len(calls) == 1
+
+    classifier.classify_batch(files, "organize my information files by project", {})
+    assert len(calls) == 2
+    assert len(classifier.classify_batch(files, "sort by file types", {})) == 3
+    assert len(calls) == 2
+
+
+def test_feedback_produces_executable_rules(mock_ai_adapter, make_file):
+    """测试从反馈中学习的规则直接用于后续分类"""
+    sent = []
+    original = mock_ai_adapter.generate_classification
+
+    def counting_classification(chunk, user_request, context):
+        sent.extend(f.name for f in chunk)
+        return original(chunk, user_request, context)
+
+    mock_ai_adapter.generate_classification = counting_classification
+    classifier = SmartClassifier(mock_ai_adapter)
+    classifier._learn_from_feedback("发票都放到 财务 文件夹，数字文件名的不是论文，把.psd文件放到设计稿")
+    files = [
+        make_file('/d/2024发票.pdf'),
+        make_file('/d/12345.pdf'),
+        make_file('/d/logo.psd'),
+        make_file('/d/notes.txt'),
+    ]
+
+    operations = classifier.classify_batch(files, "整理论文", {})
+
+    targets = {op.source: op.target for op in operations}
+    assert targets['/d/2024发票.pdf'] == str(Path('/d/财务/2024发票.pdf'))
+    assert targets['/d/logo.psd'] == str(Path('/d/设计稿/logo.psd'))
+    assert '/d/12345.pdf' not in targets
+    assert sent == ['notes.txt']
+    assert len(classifier.learned_rules) == 3
+
+    classifier.reset_learned_rules()
+    assert not classifier.learned_rules and not classifier.rule_engine.rules
+
+
+def test_feedback_without_target_is_only_a_hint(mock_ai_adapter, make_file):
+    """测试没有明确目标或否定的反馈只作为提示提供给AI，不生成移动规则"""
+    classifier = SmartClassifier(mock_ai_adapter)
+    classifier._learn_from_feedback("简历先别动。发票不要放到 财务 文件夹")
+
+    assert len(classifier.learned_rules) == 2
+    assert all(rule.action == RuleAction.HINT for rule in classifier.rule_engine.rules)
+    operations = classifier.classify_batch([make_file('/d/张三简历.pdf')], "整理文件", {})
+    assert operations[0].target == str(Path('/d/organized/张三简历.pdf'))
+
+
+def test_hint_rule_with_request_keywords_not_dispatched(make_file):
+    """测试需求关键词命中的提示规则同样不参与本地分类"""
+    engine = RuleEngine.from_config([
+        {'description': '论文交给AI判断', 'extensions': ['.pdf'], 'request_keywords': ['论文'], 'action': 'hint'},
+    ], include_builtin=False)
+
+    operations, kept, unmatched = engine.classify([make_file('/d/a.pdf')], "整理论文")
+
+    assert operations == [] and kept == []
+    assert [f.name for f in unmatched] == ['a.pdf']
+
+
+def test_rule_store_shares_learned_rules(mock_ai_adapter, temp_dir, make_file):
+    """测试学习的规则持久化后，新的分类器直接使用，其他分类器学习的规则也会生效"""
+    db_path = str(temp_dir / 'rules.db')
+    first = SmartClassifier(mock_ai_adapter, rule_engine=RuleEngine(store=RuleStore(db_path)))
+    first._learn_from_feedback("发票都放到 财务 文件夹")
+    first.reset_learned_rules()
+    assert first.learned_rules == ["文件名包含'发票'的文件应单独分类（移动到 财务）"]
+
+    second = SmartClassifier(mock_ai_adapter, rule_engine=RuleEngine(store=RuleStore(db_path)))
+    operations = second.classify_batch([make_file('/d/2024发票.pdf')], "整理文件", {})
+    assert operations[0].target == str(Path('/d/财务/2024发票.pdf'))
+
+    version = first.rule_engine.version
+    second._learn_from_feedback("把.psd文件放到设计稿")
+    operations = first.classify_batch([make_file('/d/logo.psd')], "整理文件", {})
+    assert first.rule_engine.version > version
+    assert operations[0].target == str(Path('/d/设计稿/logo.psd'))
+
+    first.rule_engine.forget_learned()
+    assert not second.learned_rules
+
+
+def test_conversation_history_persists(temp_dir):
+    """测试对话历史和反馈保存到规则存储，新的对话管理器加载最近的记录"""
+    store = RuleStore(str(temp_dir / 'rules.db'), history_limit=2)
+    manager = ConversationManager(store)
+    manager.add_interaction("整理论文", {'operations': []})
+    manager.add_interaction("按类型整理", {'operations': []})
+    manager.add_feedback("图片单独放")
+    manager.add_interaction("整理下载目录", {'operations': []})
+
+    history = ConversationManager(store).history
+    assert [h['user_input'] for h in history] == ["按类型整理", "整理下载目录"]
+    assert history[0]['feedback'] == "图片单独放"
+
+
+def test_rule_store_default_path_under_data_dir(isolated_data_dir):
+    """测试规则存储的相对路径位于用户数据目录下，而不是当前工作目录"""
+    store = RuleStore()
+    assert store.db_path == isolated_data_dir / 'rules' / 'rules.db'
+    assert store.db_path.exists()
+    store.close()
@@ -32,6 +32,26 @@ def test_operation_logger(temp_dir):
     assert recent_ops[0]['status'] == 'success'
 
 
+def test_operation_logger_batch(temp_dir):
+    """测试批量记录操作"""
+    logger = OperationLogger(str(temp_dir / 'logs'))
+    
+    operations = [
+        Operation(
+            type=OperationType.MOVE,
+            source=f'/source/file_{i}.txt',
+            target=f'/target/file_{i}.txt'
+        )
+        for i in range(3)
+    ]
+    
+    logger.log_operations(operations, 'success')
+    
+    recent_ops = logger.get_recent_operations(limit=10)
+    assert len(recent_ops) == 3
+    assert [op['source'] for op in recent_ops] == [op.source for op in operations]
+
+
 def test_backup_manager(temp_dir):
     """测试备份管理"""
     backup_dir = temp_dir / 'backups'
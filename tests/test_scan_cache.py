@@ -0,0 +1,99 @@
+"""测试扫描结果缓存"""
+
+import os
+from datetime import datetime, timedelta
+
+from src.api.services import scan_cache as scan_cache_module
+from src.api.services.scan_cache import ScanCache, estimate_files_size
+
+
+def make_entry(make_file, count: int, timestamp: datetime = None):
+    """构造包含 count 个文件的扫描结果"""
+    files = [make_file(f'/d/file_{i}.txt') for i in range(count)]
+    return {'directory': '/d', 'files': files, 'timestamp': timestamp or datetime.now(), 'stats': {'n': count}}
+
+
+def test_lru_spill_and_reload(temp_dir, make_file):
+    """测试超出内存预算时溢写最久未使用的结果，读取时重新载入"""
+    entry_size = estimate_files_size(make_entry(make_file, 10)['files'])
+    cache = ScanCache(max_memory_bytes=entry_size * 2, spill_dir=str(temp_dir))
+
+    for scan_id in ('a', 'b'):
+        cache.put(scan_id, make_entry(make_file, 10))
+    cache.get('a')
+    cache.put('c', make_entry(make_file, 10))
+
+    assert cache.stats()['memory_entries'] == 2
+    assert (temp_dir / 'b.json.gz').exists()
+    assert not list(temp_dir.glob('*.tmp'))
+
+    reloaded = cache.get('b')
+    assert [f.path for f in reloaded['files']] == [f'/d/file_{i}.txt' for i in range(10)]
+    assert reloaded['stats'] == {'n': 10}
+    assert not (temp_dir / 'b.json.gz').exists()
+    assert (temp_dir / 'a.json.gz').exists()
+    assert cache.memory_bytes <= cache.max_memory_bytes
+
+
+def test_oversized_entry_not_reparsed(temp_dir, make_file, monkeypatch):
+    """测试超出预算的结果保存在磁盘，最近使用的一个留在内存中不重复解析"""
+    cache = ScanCache(max_memory_bytes=100, spill_dir=str(temp_dir))
+    cache.put('big', make_entry(make_file, 5))
+    assert (temp_dir / 'big.json.gz').exists()
+    assert cache.memory_bytes == 0
+
+    # 模拟服务重启后的首次读取
+    cache = ScanCache(max_memory_bytes=100, spill_dir=str(temp_dir))
+    loads = []
+    original = ScanCache._load_spilled
+
+    def counting_load(self, scan_id):
+        loads.append(scan_id)
+        return original(self, scan_id)
+
+    monkeypatch.setattr(scan_cache_module.ScanCache, '_load_spilled', counting_load)
+
+    first = cache.get('big')
+    assert cache.get('big') is first
+    assert loads == ['big']
+    assert (temp_dir / 'big.json.gz').exists()
+
+    cache.delete('big')
+    assert cache.get('big') is None
+    assert not (temp_dir / 'big.json.gz').exists()
+
+
+def test_expire_memory_and_spilled(temp_dir, make_file):
+    """测试过期清理同时清除内存中和溢写的结果"""
+    entry_size = estimate_files_size(make_entry(make_file, 10)['files'])
+    cache = ScanCache(max_memory_bytes=entry_size, spill_dir=str(temp_dir))
+    old = datetime.now() - timedelta(hours=2)
+
+    cache.put('old_spilled', make_entry(make_file, 10, old))
+    cache.put('old_memory', make_entry(make_file, 10, old))
+    cache.put('fresh', make_entry(make_file, 1))
+
+    assert os.path.getmtime(temp_dir / 'old_spilled.json.gz') < datetime.now().timestamp() - 3600
+    assert cache.expire(3600) == 2
+    assert cache.get('old_spilled') is None and cache.get('old_memory') is None
+    assert cache.get('fresh') is not None
+
+
+def test_spill_runs_outside_lock(temp_dir, make_file, monkeypatch):
+    """测试溢写在锁外进行：写入期间可以读取正在溢写的结果"""
+    entry_size = estimate_files_size(make_entry(make_file, 10)['files'])
+    cache = ScanCache(max_memory_bytes=entry_size, spill_dir=str(temp_dir))
+    seen = []
+    original = ScanCache._write_spill
+
+    def reading_write(self, scan_id, entry):
+        seen.append(self.get(scan_id) is entry)
+        return original(self, scan_id, entry)
+
+    monkeypatch.setattr(scan_cache_module.ScanCache, '_write_spill', reading_write)
+
+    cache.put('a', make_entry(make_file, 10))
+    cache.put('b', make_entry(make_file, 10))
+
+    assert seen == [True]
+    assert (temp_dir / 'a.json.gz').exists()
@@ -0,0 +1,122 @@
+"""测试扫描服务：结果的分页、过滤和游标，流式扫描"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from src.api.services import scan_service as scan_service_module
+from src.api.services.scan_cache import ScanCache
+from src.api.services.scan_service import ScanService
+
+
+@pytest.fixture
+def service(temp_dir, make_file):
+    """缓存了一次扫描结果（10个文件）的扫描服务"""
+    service = ScanService()
+    service._scan_cache = ScanCache(spill_dir=str(temp_dir / 'spill'))
+    base = datetime(2024, 1, 1, 12, 0)
+    files = [
+        make_file(
+            str(Path('/d') / f"file_{i}{'.pdf' if i % 2 == 0 else '.txt'}"),
+            size=(i + 1) * 100, modified=base + timedelta(days=i)
+        )
+        for i in range(10)
+    ]
+    service._scan_cache.put('scan-1', {'directory': '/d', 'files': files, 'timestamp': base})
+    return service
+
+
+def test_query_pagination_and_cursor(service):
+    """测试 offset/limit 分页和游标续读"""
+    first = service.query_scan_files('scan-1', limit=4, sort_by='size', order='desc')
+
+    assert [f.size for f in first['files']] == [1000, 900, 800, 700]
+    assert first['total_files'] == first['total_matched'] == 10
+
+    second = service.query_scan_files('scan-1', limit=4, cursor=first['next_cursor'], sort_by='size', order='desc')
+    third = service.query_scan_files('scan-1', limit=4, cursor=second['next_cursor'], sort_by='size', order='desc')
+    assert [f.size for f in second['files']] == [600, 500, 400, 300]
+    assert [f.size for f in third['files']] == [200, 100]
+    assert third['next_cursor'] is None
+
+    with pytest.raises(ValueError):
+        service.query_scan_files('scan-1', cursor='not-a-cursor')
+    assert service.query_scan_files('missing') is None
+
+
+def test_query_filters(service):
+    """测试扩展名、大小、修改时间和文件名过滤（带时区的时间转换为本地时间比较）"""
+    result = service.query_scan_files(
+        'scan-1', extensions=['pdf'], min_size=200, max_size=900, name_pattern='FILE_*'
+    )
+    assert [f.name for f in result['files']] == ['file_2.pdf', 'file_4.pdf', 'file_6.pdf', 'file_8.pdf']
+
+    aware = datetime(2024, 1, 5, 12, 0).astimezone(timezone.utc)
+    result = service.query_scan_files('scan-1', modified_after=aware, modified_before=aware + timedelta(days=2))
+    assert [f.name for f in result['files']] == ['file_4.pdf', 'file_5.txt', 'file_6.pdf']
+
+
+def test_scan_endpoint_accepts_aware_timestamps(service, monkeypatch):
+    """测试接口接受带时区的时间参数"""
+    from fastapi.testclient import TestClient
+    from src.api.main import app
+
+    monkeypatch.setattr(scan_service_module, '_scan_service', service)
+    client = TestClient(app)
+
+    response = client.get('/api/v1/scan/scan-1', params={'modified_after': '2024-01-08T00:00:00Z', 'limit': 2})
+
+    assert response.status_code == 200
+    assert response.json()['total_matched'] >= 2
+    assert response.json()['next_cursor']
+
+
+def collect_stream(service, directory, **kwargs):
+    """收集流式扫描的全部事件（超时则说明流挂起）"""
+    async def collect():
+        return [event async for event in service.stream_scan(directory, **kwargs)]
+
+    return asyncio.run(asyncio.wait_for(collect(), timeout=10))
+
+
+def test_stream_scan_events(service, temp_dir, sample_files):
+    """测试流式扫描依次产生开始、文件块和完成事件，结果可按扫描ID查询"""
+    events = collect_stream(service, str(temp_dir), chunk_size=2)
+
+    types = [e['type'] for e in events]
+    assert types[0] == 'start' and types[-1] == 'complete'
+    assert sum(len(e['files']) for e in events if e['type'] == 'files') == len(sample_files)
+    scan_id = events[0]['scan_id']
+    assert service.query_scan_files(scan_id)['total_files'] == len(sample_files)
+
+
+def test_stream_scan_reports_producer_failure(service, temp_dir, monkeypatch):
+    """测试扫描任务未能启动时流以错误事件结束，而不是一直等待"""
+    async def rejecting_run_blocking(pool, func, *args, **kwargs):
+        raise RuntimeError("执行池已关闭")
+
+    monkeypatch.setattr(scan_service_module, 'run_blocking', rejecting_run_blocking)
+
+    events = collect_stream(service, str(temp_dir))
+
+    assert [e['type'] for e in events] == ['start', 'error']
+    assert '执行池已关闭' in json.dumps(events[-1], ensure_ascii=False)
+
+
+def test_stream_endpoint_ndjson(service, temp_dir, sample_files, monkeypatch):
+    """测试流式扫描接口按行返回 NDJSON 事件"""
+    from fastapi.testclient import TestClient
+    from src.api.main import app
+
+    monkeypatch.setattr(scan_service_module, '_scan_service', service)
+    client = TestClient(app)
+
+    response = client.post('/api/v1/scan/stream', json={'directory': str(temp_dir)})
+
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    assert events[0]['type'] == 'start' and events[-1]['type'] == 'complete'
+    assert client.post('/api/v1/scan/stream', json={'directory': str(temp_dir / 'missing')}).status_code == 404
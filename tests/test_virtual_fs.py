@@ -0,0 +1,102 @@
+"""测试虚拟文件系统"""
+
+import pytest
+from pathlib import Path
+from src.core.virtual_fs import VirtualFileSystem
+from src.core.file_operator import FileOperator
+from src.models import Operation, OperationType
+
+
+def test_detect_conflict_within_plan(make_file):
+    """测试方案内部的目标冲突"""
+    files = [make_file('/data/a/report.pdf'), make_file('/data/b/report.pdf')]
+    operations = [
+        Operation(type=OperationType.MOVE, source=f.path, target='/data/docs/report.pdf')
+        for f in files
+    ]
+
+    vfs = VirtualFileSystem(files)
+    result = vfs.simulate(operations)
+
+    assert result['success_count'] == 2
+    assert len(result['conflicts']) == 1
+    assert result['conflicts'][0]['resolved_target'] == str(Path('/data/docs/report_1.pdf'))
+    assert result['final_paths']['/data/b/report.pdf'] == str(Path('/data/docs/report_1.pdf'))
+    assert str(Path('/data/docs')) in result['created_dirs']
+
+
+def test_source_moved_by_earlier_operation(make_file):
+    """测试源文件已被之前的操作移走"""
+    files = [make_file('/data/a.txt')]
+    operations = [
+        Operation(type=OperationType.MOVE, source='/data/a.txt', target='/data/x/a.txt'),
+        Operation(type=OperationType.MOVE, source='/data/a.txt', target='/data/y/a.txt'),
+    ]
+
+    result = VirtualFileSystem(files).simulate(operations)
+
+    assert result['success_count'] == 1
+    assert result['has_errors'] is True
+    assert result['errors'][0]['index'] == 1
+
+
+def test_folder_created_by_later_operation(make_file):
+    """测试移动到由后续操作创建的文件夹"""
+    files = [make_file('/data/a.txt')]
+    operations = [
+        Operation(type=OperationType.MOVE, source='/data/a.txt', target='/data/new/a.txt'),
+        Operation(type=OperationType.CREATE_FOLDER, source='', target='/data/new'),
+    ]
+
+    result = VirtualFileSystem(files).simulate(operations)
+
+    assert result['success_count'] == 2
+    assert len(result['warnings']) == 1
+
+
+def test_bytes_by_volume(make_file):
+    """测试按卷统计数据迁移量"""
+    files = [make_file('/mnt/a/big.iso', size=1000), make_file('/mnt/a/small.txt', size=10)]
+    operations = [
+        Operation(type=OperationType.MOVE, source='/mnt/a/big.iso', target='/mnt/b/big.iso'),
+        Operation(type=OperationType.MOVE, source='/mnt/a/small.txt', target='/mnt/a/docs/small.txt'),
+    ]
+
+    vfs = VirtualFileSystem(files, mount_points=['/mnt/a', '/mnt/b'])
+    result = vfs.simulate(operations)
+
+    stats = result['bytes_by_volume']
+    assert stats[str(Path('/mnt/a'))]['bytes_out'] == 1000
+    assert stats[str(Path('/mnt/b'))]['bytes_in'] == 1000
+    assert stats[str(Path('/mnt/a'))]['bytes_moved'] == 10
+    assert result['cross_volume_bytes'] == 1000
+
+
+def test_dry_run_batch_uses_overlay(temp_dir):
+    """测试预演模式批量执行不修改磁盘且能发现冲突"""
+    sources = []
+    for name in ['one', 'two']:
+        folder = temp_dir / name
+        folder.mkdir()
+        source = folder / 'same.txt'
+        source.write_text(name)
+        sources.append(source)
+
+    operations = [
+        Operation(type=OperationType.MOVE, source=str(s), target=str(temp_dir / 'merged' / 'same.txt'))
+        for s in sources
+    ]
+    operations.append(
+        Operation(type=OperationType.MOVE, source=str(temp_dir / 'missing.txt'), target=str(temp_dir / 'x.txt'))
+    )
+
+    operator = FileOperator(dry_run=True)
+    result = operator.execute_batch(operations)
+
+    assert result.success_count == 2
+    assert result.failed_count == 1
+    assert all(s.exists() for s in sources)
+    assert not (temp_dir / 'merged').exists()
+
+    simulation = operator.simulate_operations(operations)
+    assert len(simulation['conflicts']) == 1